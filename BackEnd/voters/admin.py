@@ -1,6 +1,13 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Volunteer, Voter, AppSettings
+from django.db import transaction
+from django.db.models import Q
+from . import events as voter_events
+from .models import User, Ward, Volunteer, Household, Voter, VoterEvent, SlowQuery, AppSettings
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(User)
@@ -19,19 +26,27 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+@admin.register(Ward)
+class WardAdmin(admin.ModelAdmin):
+    """Wards of the panchayat; each ward gets its own voters partition on PostgreSQL"""
+    list_display = ['number', 'name', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['created_at']
+
+
 @admin.register(Volunteer)
 class VolunteerAdmin(admin.ModelAdmin):
     """Volunteer admin configuration"""
-    list_display = ['volunteer_id', 'name', 'get_username', 'level', 'parent_volunteer', 'is_active', 'created_at']
-    list_filter = ['level', 'is_active', 'created_at']
+    list_display = ['volunteer_id', 'name', 'get_username', 'ward', 'level', 'parent_volunteer', 'is_active', 'created_at']
+    list_filter = ['ward', 'level', 'is_active', 'created_at']
     search_fields = ['volunteer_id', 'name', 'user__username']
     readonly_fields = ['created_at', 'updated_at']
-    ordering = ['level', 'volunteer_id']
+    ordering = ['ward', 'level', 'volunteer_id']
     
     fieldsets = (
         ('Identification', {
-            'fields': ('volunteer_id', 'level'),
-            'description': 'Volunteer ID is globally unique and used to group voters and view stats'
+            'fields': ('ward', 'volunteer_id', 'level'),
+            'description': 'Volunteer ID is unique within the ward and used to group voters and view stats'
         }),
         ('Basic Information', {
             'fields': ('name',)
@@ -60,34 +75,101 @@ class VolunteerAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.select_related('parent_volunteer', 'user')
+        return qs.select_related('ward', 'parent_volunteer', 'user')
+
+
+@admin.register(Household)
+class HouseholdAdmin(admin.ModelAdmin):
+    """Households derived from voters' house details (see build_households)"""
+    list_display = ['house_no', 'house_name_en', 'house_name_ml', 'created_at']
+    search_fields = ['house_no', 'house_name_en', 'house_name_ml']
+    readonly_fields = ['key', 'house_no', 'house_name_en', 'house_name_ml', 'created_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+class VolunteerAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filter on a volunteer foreign key picked with the admin's autocomplete
+    widget (searching VolunteerAdmin.search_fields), instead of listing
+    every volunteer as a choice
+    """
+    template = 'admin/voters/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.field = model._meta.get_field(self.field_name)
+        self.title = self.field.verbose_name
+        self.parameter_name = f'{self.field_name}__id__exact'
+        self.admin_site = model_admin.admin_site
+        super().__init__(request, params, model, model_admin)
+        if self.value() is not None and not self.value().isdigit():
+            raise IncorrectLookupParameters(f'Invalid {self.parameter_name}')
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.filter(**{f'{self.field_name}_id': int(self.value())})
+        return queryset
+
+    def widget(self):
+        form_field = self.field.formfield(widget=AutocompleteSelect(self.field, self.admin_site), required=False)
+        return form_field.widget.render(
+            self.parameter_name, self.value(),
+            attrs={'class': 'voters-autocomplete-filter', 'data-filter-param': self.parameter_name, 'style': 'width: 100%'}
+        )
+
+    def choices(self, changelist):
+        yield {'selected': self.value() is not None, 'widget': self.widget()}
+
+
+class Level1VolunteerFilter(VolunteerAutocompleteFilter):
+    field_name = 'level1_volunteer'
+
+
+class Level2VolunteerFilter(VolunteerAutocompleteFilter):
+    field_name = 'level2_volunteer'
 
 
 @admin.register(Voter)
 class VoterAdmin(admin.ModelAdmin):
-    """Voter admin configuration"""
+    """
+    Voter admin configuration.
+
+    Kept fast on large tables: unfiltered page counts are estimated from
+    table statistics, volunteer filters use autocomplete, search is an
+    exact serial number or an indexed prefix of the SEC ID, names or house
+    name, and facet counts are off.
+    """
     list_display = [
         'serial_no', 'name_en', 'age', 'gender', 'party', 
         'has_voted', 'status', 'level1_volunteer', 'level2_volunteer'
     ]
     list_filter = [
-        'has_voted', 'party', 'status', 'gender', 'category',
-        'level1_volunteer', 'level2_volunteer'
+        'ward', 'has_voted', 'party', 'status', 'gender', 'category',
+        Level1VolunteerFilter, Level2VolunteerFilter
     ]
-    search_fields = [
-        'name_en', 'name_ml', 'sec_id', 'house_name_en', 
-        'house_name_ml', 'phone_number', 'serial_no'
-    ]
-    readonly_fields = ['created_at', 'updated_at']
+    search_fields = ['serial_no', 'sec_id', 'name_en', 'name_ml', 'house_name_en']
+    search_help_text = 'Exact serial number, or the start of a SEC ID, name or house name'
+    readonly_fields = ['household', 'created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
     
     fieldsets = (
         ('Basic Information', {
             'fields': (
-                'serial_no', 'sec_id', 'category',
+                'ward', 'serial_no', 'sec_id', 'category',
                 ('name_en', 'name_ml'),
                 ('guardian_name_en', 'guardian_name_ml'),
                 ('house_name_en', 'house_name_ml'),
-                'old_ward_house_no',
+                'old_ward_house_no', 'household',
                 'gender', 'age'
             )
         }),
@@ -112,29 +194,97 @@ class VoterAdmin(admin.ModelAdmin):
     actions = ['mark_as_voted', 'mark_as_not_voted']
     
     def mark_as_voted(self, request, queryset):
-        updated = queryset.update(has_voted=True)
+        updated = voter_events.set_voted(queryset, True, user=request.user, source='admin')
         self.message_user(request, f'{updated} voters marked as voted.')
     mark_as_voted.short_description = "Mark selected voters as voted"
     
     def mark_as_not_voted(self, request, queryset):
-        updated = queryset.update(has_voted=False)
+        updated = voter_events.set_voted(queryset, False, user=request.user, source='admin')
         self.message_user(request, f'{updated} voters marked as not voted.')
     mark_as_not_voted.short_description = "Mark selected voters as not voted"
     
+    def save_model(self, request, obj, form, change):
+        # Log tracked fields edited through the change form
+        changes = {}
+        if change:
+            changes = {
+                field: [voter_events.event_value(form.initial.get(field)), voter_events.field_value(obj, field)]
+                for field in form.changed_data if field in voter_events.TRACKED_FIELDS
+            }
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            voter_events.record(obj.id, changes, user=request.user, source='admin')
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Equality on serial_no and prefixes of sec_id, the names and the
+        # house name all use indexes (voters_*_prefix_idx); SEC IDs are
+        # stored upper case
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = (
+            Q(sec_id__startswith=term.upper())
+            | Q(name_en__istartswith=term)
+            | Q(name_ml__startswith=term)
+            | Q(house_name_en__istartswith=term)
+        )
+        if term.isdigit():
+            query |= Q(serial_no=int(term))
+        return queryset.filter(query), False
+    
+    @property
+    def media(self):
+        autocomplete = AutocompleteSelect(Voter._meta.get_field('level1_volunteer'), self.admin_site)
+        return super().media + autocomplete.media + forms.Media(js=['voters/admin/autocomplete_filter.js'])
+    
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.select_related('level1_volunteer', 'level2_volunteer')
 
 
+@admin.register(VoterEvent)
+class VoterEventAdmin(admin.ModelAdmin):
+    """Read-only view of the append-only voter change log"""
+    list_display = ['id', 'voter', 'source', 'user', 'changes', 'created_at']
+    list_filter = ['source', 'created_at']
+    search_fields = ['voter__serial_no', 'voter__sec_id', 'user__username']
+    list_select_related = ['voter', 'user']
+    list_per_page = 100
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Slow query fingerprints captured by voters.slow_queries"""
+    list_display = ['view', 'count', 'total_ms', 'max_ms', 'last_seen', 'explained_at']
+    list_filter = ['view']
+    search_fields = ['view', 'normalized_sql']
+    readonly_fields = [
+        'fingerprint', 'view', 'normalized_sql', 'sample_sql', 'sample_params',
+        'count', 'total_ms', 'max_ms', 'explain_plan', 'explained_at', 'first_seen', 'last_seen'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(AppSettings)
 class AppSettingsAdmin(admin.ModelAdmin):
-    """Application Settings admin - Singleton"""
-    list_display = ['voting_enabled', 'updated_at', 'updated_by']
+    """Application Settings admin - panchayat-wide defaults plus per-ward overrides"""
+    list_display = ['__str__', 'ward', 'voting_enabled', 'updated_at', 'updated_by']
     readonly_fields = ['updated_at']
     
     fieldsets = (
         ('Voting Control', {
-            'fields': ('voting_enabled',),
+            'fields': ('ward', 'voting_enabled'),
             'description': 'Enable this toggle on polling day to allow volunteers to mark voters as voted from the frontend.'
         }),
         ('Metadata', {
@@ -143,13 +293,19 @@ class AppSettingsAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_readonly_fields(self, request, obj=None):
+        # A row's scope is fixed once created
+        if obj is not None:
+            return self.readonly_fields + ['ward']
+        return self.readonly_fields
+    
     def has_add_permission(self, request):
-        # Only allow one instance
-        return not AppSettings.objects.exists()
+        # The defaults row is created on first load; add overrides for wards without one
+        return Ward.objects.filter(app_settings__isnull=True).exists()
     
     def has_delete_permission(self, request, obj=None):
-        # Prevent deletion
-        return False
+        # Ward overrides can be removed; the defaults cannot
+        return obj is not None and obj.ward_id is not None
     
     def save_model(self, request, obj, form, change):
         obj.updated_by = request.user
@@ -0,0 +1,125 @@
+"""
+Balanced Level 1 assignment.
+
+Within each Level 2 thara, voters are split across the supervisor's active
+Level 1 sub-volunteers. Households (see voters.households) are never split,
+and the split is contiguous in serial number order - the order of the voter
+list, which follows the streets - so each volunteer gets one stretch of the
+thara with roughly total / volunteers voters. The solver is a single pass over
+the thara's voters; the result is written with one UPDATE per
+(volunteer, batch) for voters whose assignment actually changes.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from . import events as voter_events
+from .cache import invalidate_voter_data
+from .models import Volunteer, Voter
+
+UPDATE_BATCH_SIZE = 5000
+
+
+def partition_households(households, volunteer_count):
+    """
+    Split an ordered list of (household, size) into volunteer_count contiguous
+    runs of roughly equal total size. Returns a run index per household.
+
+    A household goes to the run its midpoint falls in, so every run is within
+    half a household of its share.
+    """
+    total = sum(size for _, size in households)
+    if not total or volunteer_count < 1:
+        return []
+    runs = []
+    seen = 0
+    for _, size in households:
+        midpoint = seen + size / 2
+        runs.append(min(volunteer_count - 1, int(midpoint * volunteer_count / total)))
+        seen += size
+    return runs
+
+
+def plan_thara(level2_volunteer):
+    """
+    {voter id: (current level1 id, new level1 id)} for one thara, plus the
+    Level 1 volunteers used. Empty when the supervisor has no active Level 1s.
+    """
+    sub_volunteers = list(
+        level2_volunteer.sub_volunteers.filter(level='level1', is_active=True).order_by('volunteer_id')
+    )
+    if not sub_volunteers:
+        return {}, sub_volunteers
+
+    voters = (
+        Voter.objects.filter(level2_volunteer=level2_volunteer)
+        .exclude(status='deleted')
+        .order_by('serial_no', 'id')
+        .values_list('id', 'household_id', 'level1_volunteer_id')
+    )
+    # Households in order of their first member; voters without one stand alone
+    members = {}
+    current = {}
+    for voter_id, household_id, level1_id in voters:
+        key = household_id if household_id is not None else f'voter-{voter_id}'
+        members.setdefault(key, []).append(voter_id)
+        current[voter_id] = level1_id
+
+    households = [(key, len(voter_ids)) for key, voter_ids in members.items()]
+    runs = partition_households(households, len(sub_volunteers))
+
+    plan = {}
+    for (key, _), run in zip(households, runs):
+        new_id = sub_volunteers[run].id
+        for voter_id in members[key]:
+            plan[voter_id] = (current[voter_id], new_id)
+    return plan, sub_volunteers
+
+
+def apply_plan(plan):
+    """Write a plan with set-based updates; returns the number of voters moved"""
+    moves = defaultdict(list)
+    for voter_id, (old_id, new_id) in plan.items():
+        if old_id != new_id:
+            moves[(old_id, new_id)].append(voter_id)
+
+    moved = 0
+    now = timezone.now()
+    with transaction.atomic():
+        for (old_id, new_id), voter_ids in moves.items():
+            for start in range(0, len(voter_ids), UPDATE_BATCH_SIZE):
+                batch = voter_ids[start:start + UPDATE_BATCH_SIZE]
+                moved += Voter.objects.filter(id__in=batch).update(level1_volunteer_id=new_id, updated_at=now)
+            voter_events.record_many(voter_ids, {'level1_volunteer': [old_id, new_id]}, source='command')
+        if moved:
+            invalidate_voter_data()
+    return moved
+
+
+def balance_level1(level2_volunteers=None, dry_run=False):
+    """
+    Rebalance Level 1 assignments in the given Level 2 tharas (default: all
+    active). Returns one summary dict per thara.
+    """
+    if level2_volunteers is None:
+        level2_volunteers = Volunteer.objects.filter(level='level2', is_active=True)
+
+    summaries = []
+    for level2_volunteer in level2_volunteers.order_by('volunteer_id'):
+        plan, sub_volunteers = plan_thara(level2_volunteer)
+        loads = defaultdict(int)
+        for _, new_id in plan.values():
+            loads[new_id] += 1
+        moved = sum(1 for old_id, new_id in plan.values() if old_id != new_id)
+        if not dry_run and plan:
+            moved = apply_plan(plan)
+        summaries.append({
+            'level2_volunteer_id': level2_volunteer.id,
+            'level2_volunteer_name': level2_volunteer.name,
+            'voter_count': len(plan),
+            'moved_count': moved,
+            'level1_loads': [
+                {'id': volunteer.id, 'name': volunteer.name, 'voter_count': loads[volunteer.id]}
+                for volunteer in sub_volunteers
+            ],
+        })
+    return summaries
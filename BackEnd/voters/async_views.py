@@ -0,0 +1,237 @@
+"""
+Async variants of the read-heavy endpoints, used when serving over ASGI.
+
+These views await their database work so a slow dashboard or list request
+does not tie up a worker while it waits on Postgres; hundreds of polling clients
+can be held open by a handful of event-loop workers. They return exactly the
+same payloads as their DRF counterparts in views.py. Writes are delegated to
+the sync DRF views; the dashboard serves the same shared-cache snapshot
+(voters.dashboard) as the sync view.
+
+Each view does all of its database and cache work (throttling, lookups,
+queries, the dashboard snapshot) in one routers.db_sync_to_async call, on a
+small pool of threads that keep their connections, rather than through the
+async ORM methods: those use the worker's one shared sync thread, so
+concurrent requests would queue behind one another.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings as django_settings
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound, Throttled
+from rest_framework.filters import search_smart_split
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .filters import scope_voters_for_volunteer, scope_voters_for_ward, apply_voter_filters
+from . import dashboard, voter_store
+from .lookups import volunteer_for_user
+from .models import Voter, AppSettings
+from .routers import db_sync_to_async, read_from_replica
+from .serializers import VoterListSerializer
+from .throttling import client_ident, take_token
+from .views import VoterViewSet
+from .wards import request_ward
+
+
+def _json(data, status=200):
+    """JSON response rendered with DRF's encoder so payloads match the sync views"""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+async def _authenticated_user(request):
+    """Session user the way DRF's SessionAuthentication resolves it, or None"""
+    user = await request.auser()
+    if not user.is_authenticated or not user.is_active:
+        return None
+    return user
+
+
+def _not_authenticated():
+    return _json({'detail': 'Authentication credentials were not provided.'}, status=403)
+
+
+def _throttled(request, user, scope):
+    """429 response (as DRF renders Throttled) if the scope's buckets are empty, else None"""
+    allowed, wait = take_token(scope, client_ident(request, user))
+    if allowed:
+        return None
+    exc = Throttled(wait)
+    response = _json({'detail': exc.detail}, status=exc.status_code)
+    response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def _scoped_voters(user, params):
+    """Voters visible to the user (role-based, as in VoterViewSet.get_queryset)"""
+    queryset = Voter.objects.select_related('level1_volunteer', 'level2_volunteer')
+    volunteer = volunteer_for_user(user)
+    queryset = scope_voters_for_volunteer(queryset, volunteer)
+    if volunteer is None:
+        queryset = scope_voters_for_ward(queryset, request_ward(None, params))
+    return queryset
+
+
+@require_GET
+async def health_check(request):
+    """Health check endpoint for deployment platforms"""
+    return _json({
+        'status': 'healthy',
+        'service': django_settings.SERVICE_NAME
+    })
+
+
+def _app_settings(user, params):
+    volunteer = volunteer_for_user(user)
+    try:
+        ward = request_ward(volunteer, params)
+    except NotFound as exc:
+        return _json({'detail': exc.detail}, status=404)
+    settings = AppSettings.load(ward)
+    return _json({
+        'voting_enabled': settings.voting_enabled,
+        'updated_at': settings.updated_at
+    })
+
+
+@require_GET
+async def app_settings_view(request):
+    """Get application settings (a volunteer's own ward, or ?ward=<ward number>)"""
+    user = await request.auser()
+    return await db_sync_to_async(_app_settings)(user, request.GET)
+
+
+_voter_list_sync = VoterViewSet.as_view({'get': 'list', 'post': 'create'})
+
+
+def _voter_list(request, user):
+    throttled = _throttled(request, user, 'voters')
+    if throttled is not None:
+        return throttled
+
+    try:
+        queryset = apply_voter_filters(_scoped_voters(user, request.GET), request.GET)
+        # The columnar store, when enabled, selects and orders the voters
+        ids = voter_store.ids_for_user(user, request.GET)
+    except NotFound as exc:
+        return _json({'detail': exc.detail}, status=404)
+
+    # Search: every term must match at least one search field (SearchFilter semantics)
+    for term in search_smart_split(request.GET.get(api_settings.SEARCH_PARAM, '')):
+        term_query = Q()
+        for field in VoterViewSet.search_fields:
+            term_query |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(term_query)
+
+    # Ordering: only whitelisted fields, falling back to the default ordering
+    ordering = [
+        term.strip() for term in request.GET.get(api_settings.ORDERING_PARAM, '').split(',')
+        if term.strip().lstrip('-') in VoterViewSet.ordering_fields
+    ]
+    queryset = queryset.order_by(*(ordering or VoterViewSet.ordering))
+
+    # Page number pagination
+    page_size = api_settings.PAGE_SIZE
+    count = len(ids) if ids is not None else queryset.count()
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+    if page < 1 or (page > 1 and (page - 1) * page_size >= count):
+        return _json({'detail': 'Invalid page.'}, status=404)
+
+    offset = (page - 1) * page_size
+    if ids is not None:
+        page_ids = [int(voter_id) for voter_id in ids[offset:offset + page_size]]
+        page_voters = Voter.objects.select_related('level1_volunteer', 'level2_volunteer').in_bulk(page_ids)
+        voters = [page_voters[voter_id] for voter_id in page_ids if voter_id in page_voters]
+    else:
+        voters = list(queryset[offset:offset + page_size])
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    return _json({
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': VoterListSerializer(voters, many=True).data,
+    })
+
+
+@csrf_exempt
+@read_from_replica
+async def voter_list(request):
+    """Paginated voter list with the same search, filters and ordering as VoterViewSet.list"""
+    if request.method != 'GET':
+        # Creates go through the sync DRF view (which enforces CSRF itself)
+        return await sync_to_async(_voter_list_sync)(request)
+
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    return await db_sync_to_async(_voter_list)(request, user)
+
+
+def _voter_lookup(request, user):
+    throttled = _throttled(request, user, 'voters')
+    if throttled is not None:
+        return throttled
+
+    serial_no = request.GET.get('serial_no', '').strip()
+    if not serial_no.isdigit():
+        return _json({'message': 'A numeric serial_no is required'}, status=400)
+
+    try:
+        queryset = apply_voter_filters(_scoped_voters(user, request.GET), request.GET)
+    except NotFound as exc:
+        return _json({'detail': exc.detail}, status=404)
+    voter = queryset.filter(serial_no=int(serial_no)).first()
+    if voter is None:
+        return _json({'detail': 'Voter not found.'}, status=404)
+    return _json(VoterListSerializer(voter).data)
+
+
+@require_GET
+async def voter_lookup(request):
+    """Look up a single voter by exact serial number (data entry)"""
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    return await db_sync_to_async(_voter_lookup)(request, user)
+
+
+def _dashboard_stats(request, user):
+    throttled = _throttled(request, user, 'dashboard')
+    if throttled is not None:
+        return throttled
+
+    # Every ward, or one with ?ward=<ward number>
+    try:
+        ward = request_ward(None, request.GET)
+    except NotFound as exc:
+        return _json({'detail': exc.detail}, status=404)
+    return _json(dashboard.dashboard_snapshot(ward))
+
+
+@require_GET
+@read_from_replica
+async def dashboard_stats(request):
+    """Get overall dashboard statistics - Admin and Overview users only"""
+    user = await _authenticated_user(request)
+    if user is None:
+        return _not_authenticated()
+    if user.role not in ['admin', 'overview']:
+        return _json(
+            {'detail': 'Dashboard is only accessible to administrators and overview users.'},
+            status=403
+        )
+    return await db_sync_to_async(_dashboard_stats)(request, user)
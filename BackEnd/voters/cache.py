@@ -0,0 +1,211 @@
+"""
+Cross-worker cache invalidation helpers.
+
+Every gunicorn worker keeps hot objects in process memory. A version token
+per data set lives in the shared cache (settings.CACHES); writers replace the
+token and readers drop their in-process copy when the token they hold no
+longer matches. A token starts with the time it was issued, so readers can
+tell how recently the data set was written.
+"""
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from django.db import connection, transaction
+from .routers import primary_reads, replica_may_lag
+
+
+def _version_key(name):
+    return f'version:{name}'
+
+
+def _new_version():
+    return f'{time.time():.3f}-{uuid.uuid4().hex}'
+
+
+def version_issued_at(version):
+    """Wall-clock time a version token was issued (0 for tokens without one)"""
+    try:
+        return float(str(version).split('-', 1)[0])
+    except ValueError:
+        return 0.0
+
+
+def get_version(name):
+    """Current version token for a data set, creating one if missing"""
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        # add() keeps the first token if several workers race here
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Invalidate every worker's copy of a data set"""
+    version = _new_version()
+    cache.set(_version_key(name), version, None)
+    return version
+
+
+class _VersionBumps:
+    """on_commit callback bumping a set of version names once each"""
+
+    def __init__(self):
+        self.names = set()
+
+    def __call__(self):
+        for name in self.names:
+            bump_version(name)
+
+
+def bump_versions_on_commit(names):
+    """Bump versions once the current transaction commits (once per name per transaction)"""
+    names = set(names)
+    if not names:
+        return
+    if connection.in_atomic_block:
+        for _, callback, _ in connection.run_on_commit:
+            if isinstance(callback, _VersionBumps):
+                callback.names |= names
+                return
+    bump = _VersionBumps()
+    bump.names |= names
+    transaction.on_commit(bump)
+
+
+class ProcessCache:
+    """
+    A single value cached in process memory and validated against a shared
+    version token. Within `ttl` seconds of the last check the value is served
+    without touching the shared cache or the database.
+    """
+
+    def __init__(self, version_name, ttl):
+        self.version_name = version_name
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def peek(self):
+        """The cached value if it was validated within the TTL, else None"""
+        if self._value is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._value
+        return None
+
+    def get(self, loader):
+        """Return the cached value, calling loader() when it is stale"""
+        value = self.peek()
+        if value is not None:
+            return value
+
+        version = get_version(self.version_name)
+        with self._lock:
+            if self._value is not None and version == self._version:
+                self._checked_at = time.monotonic()
+                return self._value
+        # The loader runs outside the lock: it may write, and a write calls
+        # invalidate(). A load racing an invalidation keeps the older token,
+        # so the next check reloads.
+        value = loader()
+        with self._lock:
+            self._value = value
+            self._version = version
+            self._checked_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        """Drop this process's copy and tell the other workers to drop theirs"""
+        with self._lock:
+            self._value = None
+            self._version = None
+        bump_version(self.version_name)
+
+
+# Version of voter/volunteer data; bumped on every voter or volunteer write.
+# Each ward also has its own version so a write in one ward keeps the other
+# wards' cached results.
+VOTER_DATA = 'voter_data'
+
+
+def voter_data_version(ward=None):
+    """Version name of the voter data for a ward (None = all wards)"""
+    return VOTER_DATA if ward is None else f'{VOTER_DATA}:{ward.id}'
+
+
+class _VoterDataBump:
+    """on_commit callback bumping the voter data versions a transaction touched"""
+
+    def __init__(self):
+        self.ward_ids = set()
+        self.all_wards = False
+
+    def add(self, ward_id):
+        if ward_id is None:
+            self.all_wards = True
+        else:
+            self.ward_ids.add(ward_id)
+
+    def __call__(self):
+        ward_ids = self.ward_ids
+        if self.all_wards:
+            from .wards import all_ward_ids
+            ward_ids = ward_ids | set(all_ward_ids())
+        bump_version(VOTER_DATA)
+        for ward_id in ward_ids:
+            bump_version(f'{VOTER_DATA}:{ward_id}')
+
+
+def invalidate_voter_data(ward_id=None):
+    """
+    Invalidate caches derived from a ward's voter data (None = every ward)
+    once the current transaction commits
+    """
+    # One bump per transaction however many voters it writes
+    if connection.in_atomic_block:
+        for _, callback, _ in connection.run_on_commit:
+            if isinstance(callback, _VoterDataBump):
+                callback.add(ward_id)
+                return
+    bump = _VoterDataBump()
+    bump.add(ward_id)
+    transaction.on_commit(bump)
+
+
+
+def invalidate_derived_caches():
+    """
+    Rebuild the caches that follow voter writes incrementally, after a bulk
+    write from a command: knock lists and volunteer stats are patched from
+    voter events, which these writes do not record, and the workers' voter
+    stores apply only rows whose updated_at moved (save(update_fields=...)
+    leaves it unchanged). Each is rebuilt on its next read.
+    """
+    from . import knock_list, volunteer_stats, voter_store
+    knock_list.invalidate_all()
+    volunteer_stats.invalidate_all()
+    voter_store.invalidate_all()
+
+
+def cached_by_version(name, key, builder, timeout=300):
+    """
+    Shared-cache value keyed by the current version of a data set: every
+    worker reuses it until the data set's version is bumped. It is built on
+    the view's read alias (the replica for read_from_replica views), except
+    shortly after the bump, while the replica may not have applied the write
+    behind it yet: then it is built from the primary.
+    """
+    version = get_version(name)
+    cache_key = f'{key}:{version}'
+    value = cache.get(cache_key)
+    if value is None:
+        if replica_may_lag(version_issued_at(version)):
+            with primary_reads():
+                value = builder()
+        else:
+            value = builder()
+        cache.set(cache_key, value, timeout)
+    return value
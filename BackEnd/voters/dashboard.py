@@ -0,0 +1,104 @@
+"""
+Dashboard statistics snapshot.
+
+The dashboard payload is built from a handful of grouped queries and kept in
+the shared cache per ward, keyed by that ward's voter data version, so every
+worker (sync or async) serves the same snapshot until a voter in the ward
+changes. voters.warmup renders it before the workers fork, so the first
+dashboard poll after a restart does not pay for the build. With the voter
+store enabled the counts come from its arrays instead of the database.
+"""
+from django.db.models import Count
+from . import voter_store
+from .cache import cached_by_version, voter_data_version
+from .filters import scope_voters_for_ward
+from .models import Volunteer, Voter
+from .serializers import DashboardStatsSerializer
+from .stats import VOTER_COUNT_AGGREGATES, grouped_counts_queryset, percentage, volunteer_stats_row
+from .wards import ward_key
+
+SNAPSHOT_TIMEOUT = 300
+
+
+def _database_counts(ward):
+    """(totals, voted per party, voters per status, per-volunteer counts by level) from grouped queries"""
+    ward_voters = scope_voters_for_ward(Voter.objects.all(), ward)
+    # Deleted voters are left out of the totals
+    active_voters = ward_voters.exclude(status='deleted')
+    totals = active_voters.aggregate(**VOTER_COUNT_AGGREGATES)
+    party_counts = dict(
+        ward_voters.filter(has_voted=True).order_by()
+        .values_list('party').annotate(count=Count('id'))
+    )
+    status_counts = dict(ward_voters.order_by().values_list('status').annotate(count=Count('id')))
+    level_counts = {}
+    for level in ('level1', 'level2'):
+        field = f'{level}_volunteer'
+        assigned = active_voters.filter(**{f'{field}__isnull': False})
+        level_counts[level] = {row[field]: row for row in grouped_counts_queryset(assigned, field)}
+    return totals, party_counts, status_counts, level_counts
+
+
+def _store_counts(store, ward):
+    """The same figures as _database_counts, from the worker's columnar voter store"""
+    ward_voters = store.scope_mask(None, ward)
+    active_voters = ward_voters & (store.columns['status'] != store.code('status', 'deleted'))
+    totals = store.voter_counts(active_voters)
+    party_counts = store.value_counts(ward_voters & store.columns['has_voted'], 'party')
+    status_counts = store.value_counts(ward_voters, 'status')
+    level_counts = {
+        level: store.grouped_voter_counts(active_voters, f'{level}_volunteer_id')
+        for level in ('level1', 'level2')
+    }
+    return totals, party_counts, status_counts, level_counts
+
+
+def _volunteer_level_stats(level, counts, ward):
+    """Dashboard rows for all active volunteers of a level"""
+    volunteers = Volunteer.objects.filter(level=level, is_active=True)
+    if ward is not None:
+        volunteers = volunteers.filter(ward=ward)
+    return [volunteer_stats_row(volunteer, counts.get(volunteer.id)) for volunteer in volunteers]
+
+
+def build_dashboard(ward=None):
+    """Serialized dashboard statistics for a ward (None = every ward)"""
+    store = voter_store.get_store()
+    if store is not None:
+        totals, party_counts, status_counts, level_counts = _store_counts(store, ward)
+    else:
+        totals, party_counts, status_counts, level_counts = _database_counts(ward)
+
+    party_stats = {
+        party_code: {'name': party_name, 'voted_count': party_counts.get(party_code, 0)}
+        for party_code, party_name in Voter.PARTY_CHOICES
+    }
+    status_stats = {
+        status_code: {'name': status_name, 'count': status_counts.get(status_code, 0)}
+        for status_code, status_name in Voter.STATUS_CHOICES
+        if status_code != 'deleted'  # Don't show deleted in status stats
+    }
+
+    data = {
+        'total_voters': totals['total'],
+        'voted_count': totals['voted'],
+        'not_voted_count': totals['total'] - totals['voted'],
+        'voting_percentage': percentage(totals['voted'], totals['total']),
+        'male_total': totals['male_total'],
+        'female_total': totals['female_total'],
+        'male_voted': totals['male_voted'],
+        'female_voted': totals['female_voted'],
+        'party_stats': party_stats,
+        'status_stats': status_stats,
+        'level1_volunteer_stats': _volunteer_level_stats('level1', level_counts['level1'], ward),
+        'level2_volunteer_stats': _volunteer_level_stats('level2', level_counts['level2'], ward),
+    }
+    return dict(DashboardStatsSerializer(data).data)
+
+
+def dashboard_snapshot(ward=None):
+    """The ward's dashboard statistics, rebuilt after its voter data changes"""
+    return cached_by_version(
+        voter_data_version(ward), f'dashboard_stats:{ward_key(ward)}',
+        lambda: build_dashboard(ward), timeout=SNAPSHOT_TIMEOUT
+    )
@@ -0,0 +1,153 @@
+"""
+Turnout by age band x gender x party, ward-wide and per Level 2 thara.
+
+Age bands are given by their lower edges (e.g. 18, 30, 45, 60 gives <18,
+18-29, 30-44, 45-59 and 60+). With the columnar voter store the counts are
+a vectorized binning (np.searchsorted) and one bincount over its arrays;
+without it they come from a single GROUP BY query with the band as a CASE
+expression. The result is cached in the shared cache by the ward's voter
+data version, so polling clients only pay for it once per change.
+"""
+from collections import defaultdict
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from . import voter_store
+from .cache import cached_by_version, voter_data_version
+from .filters import scope_voters_for_ward
+from .models import Volunteer, Voter
+from .stats import percentage
+from .wards import ward_key
+
+DEFAULT_AGE_EDGES = [18, 30, 45, 60]
+MAX_AGE_EDGES = 12
+SNAPSHOT_TIMEOUT = 300
+
+
+def parse_age_edges(value):
+    """Lower band edges from '18,30,45,60' (default when empty); raises ValueError"""
+    if not value:
+        return list(DEFAULT_AGE_EDGES)
+    try:
+        edges = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError('Age edges must be whole numbers, e.g. 18,30,45,60')
+    if not edges or len(edges) > MAX_AGE_EDGES:
+        raise ValueError(f'Give between 1 and {MAX_AGE_EDGES} age edges')
+    if any(edge < 0 or edge > 150 for edge in edges):
+        raise ValueError('Age edges must be between 0 and 150')
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise ValueError('Age edges must be strictly increasing')
+    return edges
+
+
+def age_bands(edges):
+    """Band descriptions; band i holds ages in [edges[i-1], edges[i])"""
+    bands = [{'key': f'<{edges[0]}', 'min': None, 'max': edges[0] - 1}]
+    for low, high in zip(edges, edges[1:]):
+        bands.append({'key': f'{low}-{high - 1}', 'min': low, 'max': high - 1})
+    bands.append({'key': f'{edges[-1]}+', 'min': edges[-1], 'max': None})
+    return bands
+
+
+def _database_cells(ward, edges):
+    """[(level2 volunteer id or None, band, gender, party, total, voted)] from one grouped query"""
+    band = Case(
+        *[When(age__lt=edge, then=Value(index)) for index, edge in enumerate(edges)],
+        default=Value(len(edges)),
+        output_field=IntegerField(),
+    )
+    voters = scope_voters_for_ward(Voter.objects.exclude(status='deleted'), ward)
+    rows = (
+        voters.order_by()
+        .annotate(band=band)
+        .values_list('level2_volunteer_id', 'band', 'gender', 'party')
+        .annotate(total=Count('id'), voted=Count('id', filter=Q(has_voted=True)))
+    )
+    return list(rows)
+
+
+def _store_cells(store, ward, edges):
+    """The same cells as _database_cells, binned over the columnar voter store"""
+    np = voter_store.np
+    columns = store.columns
+    mask = store.scope_mask(None, ward) & (columns['status'] != store.code('status', 'deleted'))
+    bands = np.searchsorted(np.asarray(edges), columns['age'][mask], side='right')
+    level2_ids, level2_index = np.unique(columns['level2_volunteer_id'][mask], return_inverse=True)
+    genders = [None] + [code for code, _ in Voter.GENDER_CHOICES]
+    parties = [None] + [code for code, _ in Voter.PARTY_CHOICES]
+
+    # One flat index per (thara, band, gender, party) cell
+    shape = (len(level2_ids), len(edges) + 1, len(genders), len(parties))
+    cell = np.ravel_multi_index(
+        (level2_index, bands, columns['gender'][mask], columns['party'][mask]), shape
+    )
+    size = int(np.prod(shape))
+    totals = np.bincount(cell, minlength=size)
+    voted = np.bincount(cell[columns['has_voted'][mask]], minlength=size)
+
+    cells = []
+    for index in np.flatnonzero(totals):
+        thara, band, gender, party = np.unravel_index(index, shape)
+        level2_id = int(level2_ids[thara])
+        cells.append((
+            level2_id or None, int(band), genders[gender], parties[party],
+            int(totals[index]), int(voted[index]),
+        ))
+    return cells
+
+
+def _breakdown(counts, bands):
+    """Sorted rows from {(band, gender, party): [total, voted]}"""
+    gender_order = {code: index for index, (code, _) in enumerate(Voter.GENDER_CHOICES)}
+    party_order = {code: index for index, (code, _) in enumerate(Voter.PARTY_CHOICES)}
+    rows = []
+    for (band, gender, party), (total, voted) in sorted(
+        counts.items(),
+        key=lambda item: (item[0][0], gender_order.get(item[0][1], 99), party_order.get(item[0][2], 99)),
+    ):
+        rows.append({
+            'age_band': bands[band]['key'],
+            'gender': gender,
+            'party': party,
+            'total': total,
+            'voted': voted,
+            'voting_percentage': percentage(voted, total),
+        })
+    return rows
+
+
+def build_demographics(ward, edges):
+    store = voter_store.get_store()
+    cells = _store_cells(store, ward, edges) if store is not None else _database_cells(ward, edges)
+    bands = age_bands(edges)
+
+    ward_counts = defaultdict(lambda: [0, 0])
+    thara_counts = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for level2_id, band, gender, party, total, voted in cells:
+        for counts in (ward_counts, thara_counts[level2_id]):
+            counts[(band, gender, party)][0] += total
+            counts[(band, gender, party)][1] += voted
+
+    tharas = Volunteer.objects.filter(level='level2', is_active=True).order_by('volunteer_id')
+    if ward is not None:
+        tharas = tharas.filter(ward=ward)
+    return {
+        'age_bands': bands,
+        'breakdown': _breakdown(ward_counts, bands),
+        'level2_volunteers': [
+            {
+                'id': volunteer.id,
+                'volunteer_id': volunteer.volunteer_id,
+                'name': volunteer.name,
+                'breakdown': _breakdown(thara_counts.get(volunteer.id, {}), bands),
+            }
+            for volunteer in tharas
+        ],
+    }
+
+
+def demographics(ward, edges):
+    """build_demographics() cached until the ward's voter data changes"""
+    return cached_by_version(
+        voter_data_version(ward), f"demographics:{ward_key(ward)}:{'-'.join(map(str, edges))}",
+        lambda: build_demographics(ward, edges), timeout=SNAPSHOT_TIMEOUT
+    )
@@ -0,0 +1,202 @@
+"""
+Duplicate voter detection (`python manage.py find_duplicate_voters`).
+
+Comparing every voter with every other is out of the question at 500k
+voters, so candidates are found by blocking: each voter gets a few keys
+(normalized name + guardian, the name's sorted tokens + age band, house name
++ first name token, and the Malayalam name + guardian) and only voters
+sharing a key are compared. Oversized blocks (very common names) are
+skipped rather than exploding into millions of pairs.
+
+Candidate pairs are scored in a process pool: name, guardian and house
+similarity (the better of the English and Malayalam spellings), plus age
+and gender agreement, weighted into a 0-1 score. The module imports models
+only inside functions so pool workers can import it without Django set up.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+# Weights of the per-field similarities in the score
+WEIGHTS = {'name': 0.35, 'guardian': 0.25, 'house': 0.2, 'age': 0.1, 'gender': 0.1}
+
+# Age difference at which the age similarity reaches 0
+MAX_AGE_GAP = 10
+
+AGE_BAND_YEARS = 5
+
+PAIRS_PER_TASK = 20000
+
+FIELDS = [
+    'id', 'ward_id', 'serial_no', 'sec_id', 'name_en', 'name_ml', 'guardian_name_en',
+    'guardian_name_ml', 'house_name_en', 'house_name_ml', 'age', 'gender',
+]
+
+_SPACES = re.compile(r'\s+')
+# Zero-width joiners vary between Malayalam keyboards for the same spelling
+_ZERO_WIDTH = re.compile('[\u200b\u200c\u200d\ufeff]')
+
+
+def normalize_name(name):
+    """'K.  Raman Nair ' -> 'k raman nair'; Malayalam is NFC-normalized without joiners"""
+    name = unicodedata.normalize('NFC', name or '')
+    name = _ZERO_WIDTH.sub('', name).lower()
+    name = ''.join(ch if ch.isalnum() or unicodedata.category(ch).startswith('M') else ' ' for ch in name)
+    return _SPACES.sub(' ', name).strip()
+
+
+def voter_record(row):
+    """Normalized comparison record from a values_list row (FIELDS order)"""
+    from .households import normalize_house_name
+
+    voter_id, ward_id, serial_no, sec_id, name_en, name_ml, guardian_en, guardian_ml, house_en, house_ml, age, gender = row
+    return {
+        'id': voter_id,
+        'ward_id': ward_id,
+        'serial_no': serial_no,
+        'sec_id': (sec_id or '').strip().upper(),
+        'name_en': name_en,
+        'name': normalize_name(name_en),
+        'name_ml': normalize_name(name_ml),
+        'guardian': normalize_name(guardian_en),
+        'guardian_ml': normalize_name(guardian_ml),
+        'house': normalize_house_name(house_en),
+        'house_ml': normalize_name(house_ml),
+        'age': age,
+        'gender': gender,
+    }
+
+
+def blocking_keys(record):
+    """Keys under which a voter is compared with others"""
+    keys = set()
+    name, guardian = record['name'], record['guardian']
+    if name:
+        tokens = name.split()
+        sorted_name = ' '.join(sorted(tokens))
+        if guardian:
+            keys.add(('name_guardian', name, guardian))
+        # Overlapping bands so ages a year or two apart still share a key
+        age = record['age'] or 0
+        for band in {age // AGE_BAND_YEARS, (age + AGE_BAND_YEARS // 2) // AGE_BAND_YEARS}:
+            keys.add(('name_age', sorted_name, band))
+        if record['house']:
+            keys.add(('house_first_name', record['house'], tokens[0]))
+    if record['name_ml'] and record['guardian_ml']:
+        keys.add(('name_guardian_ml', record['name_ml'], record['guardian_ml']))
+    return keys
+
+
+def candidate_pairs(records, max_block=200):
+    """
+    ({(id, id)} of voters sharing a blocking key, number of blocks skipped
+    for being larger than max_block)
+    """
+    blocks = defaultdict(list)
+    for record in records.values():
+        for key in blocking_keys(record):
+            blocks[key].append(record['id'])
+
+    pairs = set()
+    skipped = 0
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block:
+            skipped += 1
+            continue
+        members.sort()
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((first, second))
+    return pairs, skipped
+
+
+def similarity(first, second):
+    if not first or not second:
+        return None
+    if first == second:
+        return 1.0
+    matcher = SequenceMatcher(None, first, second, autojunk=False)
+    # quick_ratio is an upper bound of ratio and far cheaper
+    if matcher.quick_ratio() < 0.5:
+        return matcher.quick_ratio()
+    return matcher.ratio()
+
+
+def _best(*scores):
+    scores = [score for score in scores if score is not None]
+    return max(scores) if scores else 0.0
+
+
+def score_pair(first, second):
+    """(score, {field: similarity}) of two voter records"""
+    parts = {
+        'name': _best(similarity(first['name'], second['name']), similarity(first['name_ml'], second['name_ml'])),
+        'guardian': _best(
+            similarity(first['guardian'], second['guardian']),
+            similarity(first['guardian_ml'], second['guardian_ml'])
+        ),
+        'house': _best(similarity(first['house'], second['house']), similarity(first['house_ml'], second['house_ml'])),
+        'age': max(0.0, 1 - abs((first['age'] or 0) - (second['age'] or 0)) / MAX_AGE_GAP),
+        'gender': 1.0 if first['gender'] == second['gender'] else 0.0,
+    }
+    return sum(WEIGHTS[field] * value for field, value in parts.items()), parts
+
+
+def score_pairs(task):
+    """Worker: [(score, first id, second id, parts)] at or above min_score"""
+    pairs, records, min_score = task
+    matches = []
+    for first_id, second_id in pairs:
+        score, parts = score_pair(records[first_id], records[second_id])
+        if score >= min_score:
+            matches.append((score, first_id, second_id, parts))
+    return matches
+
+
+def _tasks(pairs, records, min_score):
+    pairs = sorted(pairs)
+    for start in range(0, len(pairs), PAIRS_PER_TASK):
+        chunk = pairs[start:start + PAIRS_PER_TASK]
+        needed = {voter_id for pair in chunk for voter_id in pair}
+        # Each task carries only the records it compares
+        yield chunk, {voter_id: records[voter_id] for voter_id in needed}, min_score
+
+
+def load_records(queryset):
+    """{voter id: record} for a voter queryset"""
+    rows = queryset.order_by().values_list(*FIELDS).iterator(chunk_size=5000)
+    return {row[0]: voter_record(row) for row in rows}
+
+
+def find_duplicates(queryset=None, min_score=0.85, max_block=200, workers=None):
+    """
+    Ranked likely duplicates among the queryset's voters (default: every
+    voter not marked deleted), highest score first.
+
+    Returns (matches, stats): each match is (score, first record, second
+    record, {field: similarity}); stats has voters, pairs and skipped_blocks.
+    """
+    from .models import Voter
+
+    if queryset is None:
+        queryset = Voter.objects.exclude(status='deleted')
+    records = load_records(queryset)
+    pairs, skipped = candidate_pairs(records, max_block)
+
+    matches = []
+    tasks = _tasks(pairs, records, min_score)
+    if workers == 1 or len(pairs) <= PAIRS_PER_TASK:
+        for task in tasks:
+            matches.extend(score_pairs(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(score_pairs, tasks):
+                matches.extend(result)
+
+    matches.sort(key=lambda match: (-match[0], match[1], match[2]))
+    stats = {'voters': len(records), 'pairs': len(pairs), 'skipped_blocks': skipped}
+    return [(score, records[first], records[second], parts) for score, first, second, parts in matches], stats
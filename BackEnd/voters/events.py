@@ -0,0 +1,181 @@
+"""
+Buffered writer for the VoterEvent change log.
+
+Changes recorded during a transaction are held in a per-thread buffer and
+written with a single bulk_create once the transaction commits, so auditing
+costs at most one INSERT per request however many voters it touches, and
+never runs inside the write transaction that booth agents are waiting on.
+
+Delta sync pages through the log by id. Ids are allocated before commit, so
+a batch can become visible after one with a higher id; settled_events()
+hands out only events older than SETTLE_SECONDS, by which time every lower
+id has committed, so a client's cursor never passes an event it has not seen.
+"""
+import datetime
+import logging
+import threading
+from collections import defaultdict
+from django.db import models, transaction
+from django.utils import timezone
+from .cache import invalidate_voter_data
+
+logger = logging.getLogger(__name__)
+
+# Voter fields whose changes are logged
+TRACKED_FIELDS = [
+    'status', 'party', 'has_voted', 'time_voted', 'phone_number', 'notes',
+    'level1_volunteer', 'level2_volunteer',
+]
+
+# Seconds an event may take from its created_at to becoming visible
+SETTLE_SECONDS = 5
+
+_buffer = threading.local()
+
+# Callables run with each batch of events once it is written (see subscribe)
+_subscribers = []
+
+
+def event_value(value):
+    """JSON-safe representation of a field value"""
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def field_value(voter, field):
+    """Current value of a tracked field on a voter (FKs as ids)"""
+    if field in ('level1_volunteer', 'level2_volunteer'):
+        return getattr(voter, f'{field}_id')
+    return event_value(getattr(voter, field))
+
+
+def diff_changes(voter, new_values):
+    """{field: [old, new]} for tracked fields in new_values that differ from voter"""
+    changes = {}
+    for field, new_value in new_values.items():
+        if field not in TRACKED_FIELDS:
+            continue
+        old = field_value(voter, field)
+        new = event_value(new_value)
+        if old != new:
+            changes[field] = [old, new]
+    return changes
+
+
+class _EventBatch:
+    """Events queued in one transaction, flushed by its on_commit callback"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self):
+        from .models import VoterEvent
+
+        try:
+            VoterEvent.objects.bulk_create(self.events, batch_size=1000)
+        except Exception:
+            # Auditing must never fail the write it describes
+            logger.exception('Failed to write %d voter events', len(self.events))
+        for subscriber in _subscribers:
+            try:
+                subscriber(self.events)
+            except Exception:
+                logger.exception('Voter event subscriber %r failed', subscriber)
+
+
+def settled_events(queryset, since):
+    """
+    Events of queryset after id `since` that precede every event still
+    inside the settle window (the first unsettled id is the cursor's limit)
+    """
+    from .models import VoterEvent
+
+    settled_before = timezone.now() - datetime.timedelta(seconds=SETTLE_SECONDS)
+    queryset = queryset.filter(id__gt=since)
+    unsettled = (
+        VoterEvent.objects.filter(id__gt=since, created_at__gt=settled_before)
+        .order_by('id').values_list('id', flat=True).first()
+    )
+    if unsettled is not None:
+        queryset = queryset.filter(id__lt=unsettled)
+    return queryset
+
+
+def subscribe(callback):
+    """Call callback(events) after every committed batch of voter events"""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def _queue(events):
+    connection = transaction.get_connection()
+    batch = getattr(_buffer, 'batch', None)
+    # Reuse the batch only while its flush is still pending in this transaction;
+    # Django drops the callback (and so the batch) if the transaction rolls back
+    if (
+        batch is not None
+        and connection.in_atomic_block
+        and any(callback is batch for _, callback, _ in connection.run_on_commit)
+    ):
+        batch.events.extend(events)
+        return
+
+    batch = _EventBatch()
+    batch.events.extend(events)
+    _buffer.batch = batch
+    # Runs immediately when not inside a transaction
+    transaction.on_commit(batch)
+
+
+def record(voter_id, changes, user=None, source='api'):
+    """Queue an event; it is written when the current transaction commits"""
+    record_many([voter_id], changes, user=user, source=source)
+
+
+def record_many(voter_ids, changes, user=None, source='bulk'):
+    """Queue the same change for many voters"""
+    from .models import VoterEvent
+
+    if not changes or not voter_ids:
+        return
+    if user is not None and not user.is_authenticated:
+        user = None
+    _queue([
+        VoterEvent(voter_id=voter_id, user=user, source=source, changes=changes)
+        for voter_id in voter_ids
+    ])
+
+
+def set_voted(queryset, has_voted, user=None, source='bulk'):
+    """
+    Set has_voted and time_voted on the voters whose status changes (one
+    UPDATE), log a change event for each and invalidate their wards' caches.
+    Returns the number of voters updated; a repeated mark keeps the original
+    time_voted.
+    """
+    now = timezone.now()
+    time_voted = now if has_voted else None
+    queryset = queryset.exclude(has_voted=has_voted)
+    with transaction.atomic():
+        changed = list(queryset.values_list('id', 'ward_id', 'time_voted'))
+        # updated_at moves the voter store's watermark past these rows
+        updated = queryset.update(has_voted=has_voted, time_voted=time_voted, updated_at=now)
+        # Voters sharing a previous time_voted share one change dict
+        by_previous_time = defaultdict(list)
+        for voter_id, _, previous_time in changed:
+            by_previous_time[previous_time].append(voter_id)
+        for previous_time, voter_ids in by_previous_time.items():
+            record_many(
+                voter_ids,
+                {
+                    'has_voted': [not has_voted, has_voted],
+                    'time_voted': [event_value(previous_time), event_value(time_voted)],
+                },
+                user=user, source=source
+            )
+        for ward_id in {ward_id for _, ward_id, _ in changed}:
+            invalidate_voter_data(ward_id)
+    return updated
@@ -0,0 +1,143 @@
+"""
+Voter roll export to XLSX.
+
+write_roll() reads voters through a server-side cursor (QuerySet.iterator)
+into an openpyxl write-only workbook, which spools every row to disk as it
+is appended, so memory stays flat however large the roll is. Volunteer and
+ward names come from small dicts instead of joins. Used by
+`python manage.py export_voters` and the admin-only /api/export/voters/.
+"""
+import re
+import time
+from django.utils import timezone
+from .models import Volunteer, Voter, Ward
+try:
+    import openpyxl
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+except ImportError:
+    openpyxl = None
+
+CHUNK_SIZE = 2000
+
+# (header, Voter field) in sheet order
+COLUMNS = [
+    ('Ward', 'ward_id'),
+    ('Serial No.', 'serial_no'),
+    ('SEC ID No.', 'sec_id'),
+    ('Name (English)', 'name_en'),
+    ('Name (Malayalam)', 'name_ml'),
+    ("Guardian's Name (English)", 'guardian_name_en'),
+    ("Guardian's Name (Malayalam)", 'guardian_name_ml'),
+    ('Old Ward/House No.', 'old_ward_house_no'),
+    ('House Name (English)', 'house_name_en'),
+    ('House Name (Malayalam)', 'house_name_ml'),
+    ('Gender', 'gender'),
+    ('Age', 'age'),
+    ('Status', 'status'),
+    ('Party', 'party'),
+    ('Voted', 'has_voted'),
+    ('Time Voted', 'time_voted'),
+    ('Phone', 'phone_number'),
+    ('Level 2 In-charge', 'level2_volunteer_id'),
+    ('Level 1 In-charge', 'level1_volunteer_id'),
+    ('Notes', 'notes'),
+]
+
+_SHEET_TITLE_INVALID = re.compile(r'[\[\]:*?/\\]')
+
+# Leading characters that make a spreadsheet treat text as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def _plain_text(value):
+    """Free text as an inert cell value: control characters dropped, formulas quoted"""
+    if not value:
+        return value
+    # Control characters in free text would make openpyxl refuse the row
+    value = ILLEGAL_CHARACTERS_RE.sub('', value)
+    # openpyxl stores any string starting with '=' as a formula
+    if value.startswith(_FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+
+def _sheet_title(title, used):
+    """Valid, unique worksheet title (31 characters at most)"""
+    title = _SHEET_TITLE_INVALID.sub(' ', title).strip()[:31] or 'Sheet'
+    candidate, suffix = title, 2
+    while candidate.lower() in used:
+        candidate = f'{title[:31 - len(str(suffix)) - 1]} {suffix}'
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _converters(volunteer_names, ward_numbers):
+    """Per-column functions turning a values_list value into a cell value"""
+    labels = {
+        'gender': dict(Voter.GENDER_CHOICES),
+        'status': dict(Voter.STATUS_CHOICES),
+        'party': dict(Voter.PARTY_CHOICES),
+    }
+
+    def local_time(value):
+        # Excel has no time zones
+        return timezone.localtime(value).replace(tzinfo=None) if value else None
+
+    converters = []
+    for _, field in COLUMNS:
+        if field == 'ward_id':
+            converters.append(ward_numbers.get)
+        elif field in labels:
+            converters.append(labels[field].get)
+        elif field in ('level1_volunteer_id', 'level2_volunteer_id'):
+            converters.append(lambda value: _plain_text(volunteer_names.get(value, '')))
+        elif field == 'has_voted':
+            converters.append(lambda value: 'Yes' if value else 'No')
+        elif field == 'time_voted':
+            converters.append(local_time)
+        elif field in ('serial_no', 'age'):
+            converters.append(lambda value: value)
+        else:
+            converters.append(_plain_text)
+    return converters
+
+
+def write_roll(target, voters, split_by_thara=False):
+    """
+    Write a voter queryset to an XLSX file (path or binary file object),
+    in ward and serial number order; split_by_thara puts each Level 2
+    volunteer's voters on their own sheet. Returns (rows, seconds).
+    """
+    start = time.perf_counter()
+    volunteers = list(Volunteer.objects.using(voters.db).values_list('id', 'volunteer_id', 'name'))
+    volunteer_names = {volunteer_id: name for volunteer_id, _, name in volunteers}
+    thara_titles = {volunteer_id: f'{number} {name}' for volunteer_id, number, name in volunteers}
+    ward_numbers = dict(Ward.objects.using(voters.db).values_list('id', 'number'))
+    converters = _converters(volunteer_names, ward_numbers)
+    headers = [header for header, _ in COLUMNS]
+    fields = [field for _, field in COLUMNS]
+    level2_index = fields.index('level2_volunteer_id')
+
+    ordering = ['ward_id', 'serial_no']
+    if split_by_thara:
+        ordering.insert(0, 'level2_volunteer_id')
+    rows = voters.order_by(*ordering).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    used_titles = set()
+    sheet = None
+    thara = None
+    count = 0
+    for row in rows:
+        if sheet is None or (split_by_thara and row[level2_index] != thara):
+            thara = row[level2_index]
+            title = thara_titles.get(thara, 'Unassigned') if split_by_thara else 'Voters'
+            sheet = workbook.create_sheet(_sheet_title(title, used_titles))
+            sheet.append(headers)
+        sheet.append([convert(value) for convert, value in zip(converters, row)])
+        count += 1
+    if sheet is None:
+        workbook.create_sheet('Voters').append(headers)
+    workbook.save(target)
+    return count, time.perf_counter() - start
@@ -0,0 +1,78 @@
+"""
+Voter queryset filtering shared by the sync DRF views and the async read views
+"""
+
+# Query parameters read by apply_voter_filters
+VOTER_FILTER_PARAMS = (
+    'has_voted', 'party', 'status', 'level1_volunteer', 'level2_volunteer',
+    'household', 'gender', 'min_age', 'max_age',
+)
+
+
+def scope_voters_for_ward(queryset, ward):
+    """Restrict voters to a ward (None = all wards)"""
+    if ward is None:
+        return queryset
+    return queryset.filter(ward_id=ward.id)
+
+
+def scope_voters_for_volunteer(queryset, volunteer):
+    """Restrict voters to those assigned to the given volunteer (None = no restriction)"""
+    if volunteer is None:
+        return queryset
+    # Volunteers only have voters in their own ward; saying so prunes the
+    # query to that ward's partition
+    if volunteer.level == 'level1':
+        # Level 1 sees only their assigned voters
+        return queryset.filter(ward_id=volunteer.ward_id, level1_volunteer=volunteer)
+    elif volunteer.level == 'level2':
+        # Level 2 sees all voters assigned to them
+        return queryset.filter(ward_id=volunteer.ward_id, level2_volunteer=volunteer)
+    return queryset
+
+
+def apply_voter_filters(queryset, params):
+    """Apply the voter list query parameters (has_voted, party, status, volunteers, household, gender, age)"""
+    # Filter by voting status
+    has_voted = params.get('has_voted')
+    if has_voted is not None:
+        queryset = queryset.filter(has_voted=has_voted.lower() == 'true')
+
+    # Filter by party
+    party = params.get('party')
+    if party:
+        queryset = queryset.filter(party=party)
+
+    # Filter by status
+    voter_status = params.get('status')
+    if voter_status:
+        queryset = queryset.filter(status=voter_status)
+
+    # Filter by volunteer
+    level1_volunteer = params.get('level1_volunteer')
+    if level1_volunteer:
+        queryset = queryset.filter(level1_volunteer_id=level1_volunteer)
+
+    level2_volunteer = params.get('level2_volunteer')
+    if level2_volunteer:
+        queryset = queryset.filter(level2_volunteer_id=level2_volunteer)
+
+    household = params.get('household')
+    if household:
+        queryset = queryset.filter(household_id=household)
+
+    # Filter by gender
+    gender = params.get('gender')
+    if gender:
+        queryset = queryset.filter(gender=gender)
+
+    # Filter by age range
+    min_age = params.get('min_age')
+    if min_age:
+        queryset = queryset.filter(age__gte=min_age)
+
+    max_age = params.get('max_age')
+    if max_age:
+        queryset = queryset.filter(age__lte=max_age)
+
+    return queryset
@@ -0,0 +1,122 @@
+"""
+Household index.
+
+Voters only carry free-text house details, so households are derived by
+grouping voters on a ward + normalized house number + house name key. The full
+pass (`python manage.py build_households`) and the incremental pass run by
+import_voters share assign_households(): keys are computed in Python,
+missing Household rows are bulk-created and only voters whose household
+changed are written, in bulk_update batches.
+"""
+import re
+from django.db import transaction
+from django.utils import timezone
+from . import knock_list
+from .cache import invalidate_voter_data
+from .models import Household, Voter
+
+BATCH_SIZE = 1000
+
+_SPACES = re.compile(r'\s+')
+_SEPARATOR = re.compile(r'\s*([/-])\s*')
+_LEADING_ZEROS = re.compile(r'\b0+(?=\d)')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def normalize_house_no(house_no):
+    """'012 / 34 ' -> '12/34'"""
+    house_no = _SPACES.sub(' ', (house_no or '').strip().upper())
+    house_no = _SEPARATOR.sub(r'\1', house_no)
+    return _LEADING_ZEROS.sub('', house_no)
+
+
+def normalize_house_name(house_name):
+    """'Thekkedath  (H).' -> 'thekkedath h'"""
+    house_name = _PUNCTUATION.sub(' ', (house_name or '').lower())
+    return _SPACES.sub(' ', house_name).strip()
+
+
+def household_key(ward_id, house_no, house_name):
+    """Grouping key for a voter's house, or None when both house parts are blank"""
+    house_no = normalize_house_no(house_no)
+    house_name = normalize_house_name(house_name)
+    if not house_no and not house_name:
+        return None
+    # House numbers repeat across wards
+    return f'{ward_id}|{house_no}|{house_name}'[:300]
+
+
+def _chunks(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _changed_voters(rows, keys, household_ids):
+    """(voter id, new household id) for voters whose household differs"""
+    changed = []
+    for voter_id, _, _, _, _, household_id in rows:
+        key = keys[voter_id]
+        new_id = household_ids[key] if key is not None else None
+        if new_id != household_id:
+            changed.append((voter_id, new_id))
+    return changed
+
+
+def assign_households(voters=None, dry_run=False):
+    """
+    Link voters (a queryset, default all) to their Household, creating missing
+    households. Returns (households created, voters reassigned).
+    """
+    if voters is None:
+        voters = Voter.objects.all()
+    rows = list(voters.order_by().values_list(
+        'id', 'ward_id', 'old_ward_house_no', 'house_name_en', 'house_name_ml', 'household_id'
+    ))
+
+    keys = {}
+    details = {}
+    for voter_id, ward_id, house_no, house_name_en, house_name_ml, _ in rows:
+        key = household_key(ward_id, house_no, house_name_en)
+        keys[voter_id] = key
+        if key is not None and key not in details:
+            details[key] = Household(
+                key=key,
+                house_no=normalize_house_no(house_no),
+                house_name_en=(house_name_en or '').strip(),
+                house_name_ml=(house_name_ml or '').strip(),
+            )
+
+    household_ids = {}
+    for chunk in _chunks(details):
+        household_ids.update(Household.objects.filter(key__in=chunk).values_list('key', 'id'))
+    missing = [household for key, household in details.items() if key not in household_ids]
+
+    if dry_run:
+        # New households have no id yet; any voter keyed to one will move
+        pending = {household.key: -1 for household in missing}
+        return len(missing), len(_changed_voters(rows, keys, {**household_ids, **pending}))
+
+    with transaction.atomic():
+        # ignore_conflicts: a concurrent import may have created the same key
+        Household.objects.bulk_create(missing, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for chunk in _chunks([household.key for household in missing]):
+            household_ids.update(Household.objects.filter(key__in=chunk).values_list('key', 'id'))
+
+        changed = _changed_voters(rows, keys, household_ids)
+        now = timezone.now()
+        for chunk in _chunks(changed):
+            Voter.objects.bulk_update(
+                [Voter(id=voter_id, household_id=new_id, updated_at=now) for voter_id, new_id in chunk],
+                ['household', 'updated_at'],
+            )
+        if changed:
+            invalidate_voter_data()
+            transaction.on_commit(knock_list.invalidate_all)
+    return len(missing), len(changed)
+
+
+def remove_empty_households():
+    """Delete households no voter belongs to any more"""
+    deleted, _ = Household.objects.filter(members__isnull=True).delete()
+    return deleted
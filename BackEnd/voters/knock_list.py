@@ -0,0 +1,172 @@
+"""
+Knock lists: a volunteer's supporters who have not voted yet, grouped by
+household and ordered for walking.
+
+The list for a volunteer is built from the database once and kept in the
+shared cache. Marks arriving during polling do not rebuild it: every
+committed batch of voter events (see voters.events.subscribe) removes the
+marked voters from the cached lists they appear in, so a read is a single
+cache get. A list is rewritten under a short lock key. When another writer
+holds the lock (nothing waits for it on the booth agent's request), or the
+list is missing (a read may be building it from rows that predate the
+mark), the volunteer's list version is bumped instead so the next read
+rebuilds. Changes that can add voters back or move them
+(un-marking, party, status or volunteer changes) bump the affected
+volunteers' list versions too.
+"""
+import re
+from collections import defaultdict
+from django.core.cache import cache
+from django.utils import timezone
+from .cache import get_version, bump_version
+from .filters import scope_voters_for_volunteer
+from .models import Voter
+
+LIST_TIMEOUT = 60 * 60
+
+# A list rewrite holds its lock this long at most
+LOCK_TIMEOUT = 10
+
+# Changes that can add a voter to, or move a voter between, knock lists
+REBUILD_FIELDS = ['party', 'status', 'level1_volunteer', 'level2_volunteer']
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def _list_version(volunteer_id):
+    return f'knock_list:{volunteer_id}'
+
+
+def _list_key(volunteer_id, party):
+    return (
+        f'knock_list:{volunteer_id}:{party}:'
+        f'{get_version(_list_version(volunteer_id))}:{get_version("knock_list")}'
+    )
+
+
+def walking_order(house_no):
+    """Natural sort key for a house number: '9/2' < '10/1' < '10/12'"""
+    return [int(part) if part.isdigit() else part for part in _DIGITS.split(house_no or '')]
+
+
+def build_knock_list(volunteer, party='ldf'):
+    """Not-voted active voters of a party assigned to the volunteer, by household"""
+    voters = (
+        scope_voters_for_volunteer(Voter.objects.all(), volunteer)
+        .filter(party=party, status='active', has_voted=False)
+        .order_by('serial_no')
+        .values(
+            'id', 'serial_no', 'name_en', 'name_ml', 'age', 'gender', 'phone_number',
+            'old_ward_house_no', 'house_name_en', 'house_name_ml', 'household_id',
+        )
+    )
+
+    households = {}
+    for voter in voters:
+        # Voters not yet indexed into a household stand alone
+        key = voter['household_id'] or f"voter-{voter['id']}"
+        household = households.get(key)
+        if household is None:
+            household = households[key] = {
+                'household_id': voter['household_id'],
+                'house_no': voter['old_ward_house_no'],
+                'house_name_en': voter['house_name_en'],
+                'house_name_ml': voter['house_name_ml'],
+                'voters': [],
+            }
+        household['voters'].append({
+            field: voter[field]
+            for field in ('id', 'serial_no', 'name_en', 'name_ml', 'age', 'gender', 'phone_number')
+        })
+
+    ordered = sorted(
+        households.values(),
+        key=lambda household: (walking_order(household['house_no']), household['voters'][0]['serial_no'])
+    )
+    return {'households': ordered, 'built_at': timezone.now().isoformat()}
+
+
+def get_knock_list(volunteer, party='ldf'):
+    """The volunteer's knock list with voters marked since it was built removed"""
+    key = _list_key(volunteer.id, party)
+    knock_list = cache.get(key)
+    if knock_list is None:
+        knock_list = build_knock_list(volunteer, party)
+        cache.set(key, knock_list, LIST_TIMEOUT)
+
+    households = knock_list['households']
+    return {
+        'built_at': knock_list['built_at'],
+        'remaining_count': sum(len(household['voters']) for household in households),
+        'household_count': len(households),
+        'households': households,
+    }
+
+
+def _acquire(key):
+    """Take the rewrite lock of a cached list without waiting (cache.add is atomic on Redis)"""
+    return cache.add(f'{key}:lock', True, LOCK_TIMEOUT)
+
+
+def _drop_voted(voter_ids):
+    """Remove marked voters from the cached knock lists that hold them"""
+    lists = defaultdict(set)
+    for voter_id, level1_id, level2_id, party in Voter.objects.filter(id__in=voter_ids).values_list(
+        'id', 'level1_volunteer_id', 'level2_volunteer_id', 'party'
+    ):
+        for volunteer_id in (level1_id, level2_id):
+            if volunteer_id is not None:
+                lists[(volunteer_id, party)].add(voter_id)
+
+    for (volunteer_id, party), marked in lists.items():
+        key = _list_key(volunteer_id, party)
+        if not _acquire(key):
+            bump_version(_list_version(volunteer_id))
+            continue
+        try:
+            knock_list = cache.get(key)
+            if knock_list is None:
+                bump_version(_list_version(volunteer_id))
+                continue
+            households = []
+            for household in knock_list['households']:
+                remaining = [voter for voter in household['voters'] if voter['id'] not in marked]
+                if remaining:
+                    households.append(dict(household, voters=remaining))
+            cache.set(key, dict(knock_list, households=households), LIST_TIMEOUT)
+        finally:
+            cache.delete(f'{key}:lock')
+
+
+def apply_events(events):
+    """Patch knock lists for a committed batch of voter events"""
+    voted = set()
+    unvoted = set()
+    rebuild = set()
+    volunteer_ids = set()
+    for event in events:
+        has_voted = event.changes.get('has_voted')
+        if has_voted is not None:
+            (voted if has_voted[1] else unvoted).add(event.voter_id)
+        if any(field in event.changes for field in REBUILD_FIELDS):
+            rebuild.add(event.voter_id)
+        for field in ('level1_volunteer', 'level2_volunteer'):
+            if field in event.changes:
+                volunteer_ids.update(event.changes[field])
+
+    if voted:
+        _drop_voted(voted)
+
+    rebuild |= unvoted
+    if rebuild:
+        for level1_id, level2_id in Voter.objects.filter(id__in=rebuild).values_list(
+            'level1_volunteer_id', 'level2_volunteer_id'
+        ):
+            volunteer_ids.update((level1_id, level2_id))
+        for volunteer_id in volunteer_ids - {None}:
+            bump_version(_list_version(volunteer_id))
+
+
+def invalidate_all():
+    """Rebuild every knock list on its next read (e.g. after households change)"""
+    bump_version('knock_list')
@@ -0,0 +1,34 @@
+"""
+Per-process volunteer map.
+
+Every voter list, lookup and settings request first finds the requesting
+user's volunteer profile to scope itself. Volunteers change a handful of
+times per election, so each worker keeps them all in memory (loaded at fork
+by voters.warmup) and revalidates against a shared version like
+AppSettings; a save or delete of any volunteer bumps it.
+"""
+from django.conf import settings
+from .cache import ProcessCache
+from .models import Volunteer
+
+_volunteer_cache = ProcessCache('volunteer_map', settings.APP_SETTINGS_CACHE_TTL)
+
+
+def _load_volunteers():
+    return {volunteer.user_id: volunteer for volunteer in Volunteer.objects.all()}
+
+
+def volunteer_map():
+    """{user id: Volunteer} for every volunteer"""
+    return _volunteer_cache.get(_load_volunteers)
+
+
+def volunteer_for_user(user):
+    """The user's volunteer profile, or None for admin and overview users"""
+    if user is None or not user.is_authenticated:
+        return None
+    return volunteer_map().get(user.pk)
+
+
+def invalidate_volunteers():
+    _volunteer_cache.invalidate()
@@ -2,7 +2,9 @@ import csv
 import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from voters.cache import invalidate_derived_caches
 from voters.models import Voter, Volunteer, User
+from voters.wards import get_ward
 
 
 class Command(BaseCommand):
@@ -15,6 +17,11 @@ class Command(BaseCommand):
             default='TharaList/TharaList.csv',
             help='Path to TharaList CSV file (relative to project root or absolute path)'
         )
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Ward number (optional when there is only one ward)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -24,6 +31,13 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         dry_run = options['dry_run']
+        ward = get_ward(options['ward'])
+        if ward is None:
+            self.stdout.write(self.style.ERROR(
+                f"Ward {options['ward']} not found" if options['ward'] is not None
+                else 'Specify the ward with --ward <number>'
+            ))
+            return
 
         # If relative path, make it relative to project root
         if not os.path.isabs(csv_file):
@@ -60,7 +74,7 @@ class Command(BaseCommand):
             username = f'th{thara_no:02d}'
             try:
                 user = User.objects.get(username=username)
-                volunteer = Volunteer.objects.get(user=user, level='level2')
+                volunteer = Volunteer.objects.get(user=user, level='level2', ward=ward)
                 level2_volunteers[thara_no] = volunteer
                 self.stdout.write(f'  Found volunteer: {username} - {volunteer.name}')
             except (User.DoesNotExist, Volunteer.DoesNotExist):
@@ -98,7 +112,7 @@ class Command(BaseCommand):
 
                     # Get the voter
                     try:
-                        voter = Voter.objects.get(serial_no=serial_no)
+                        voter = Voter.objects.get(ward=ward, serial_no=serial_no)
                     except Voter.DoesNotExist:
                         self.stdout.write(
                             self.style.WARNING(f'Skipping serial {serial_no}: Voter not found in database')
@@ -128,6 +142,8 @@ class Command(BaseCommand):
                         self.style.ERROR(f'Error assigning voter {serial_no}: {str(e)}')
                     )
 
+        invalidate_derived_caches()
+
         # Summary
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 50))
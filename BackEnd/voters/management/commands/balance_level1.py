@@ -0,0 +1,71 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from voters.assignment import balance_level1
+from voters.models import Volunteer
+from voters.wards import get_ward
+
+
+class Command(BaseCommand):
+    help = (
+        'Split the voters of each Level 2 thara across its active Level 1 volunteers, '
+        'balanced by voter count and keeping households together'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--thara',
+            type=int,
+            action='append',
+            default=[],
+            help='Volunteer ID of a Level 2 volunteer to rebalance (repeatable, default: all; IDs are per ward)'
+        )
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Only rebalance tharas of this ward number (default: all wards)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the resulting loads without making changes'
+        )
+
+    def handle(self, *args, **options):
+        level2_volunteers = Volunteer.objects.filter(level='level2', is_active=True)
+        if options['ward'] is not None:
+            ward = get_ward(options['ward'])
+            if ward is None:
+                raise CommandError(f"Ward {options['ward']} not found")
+            level2_volunteers = level2_volunteers.filter(ward=ward)
+        if options['thara']:
+            level2_volunteers = level2_volunteers.filter(volunteer_id__in=options['thara'])
+            if not level2_volunteers.exists():
+                raise CommandError(f"No active Level 2 volunteers with volunteer ID {options['thara']}")
+
+        start = time.perf_counter()
+        summaries = balance_level1(level2_volunteers, dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Level 1 Balance Summary'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes were made'))
+
+        for summary in summaries:
+            self.stdout.write('')
+            self.stdout.write(
+                f"{summary['level2_volunteer_name']}: {summary['voter_count']} voters, "
+                f"{summary['moved_count']} reassigned"
+            )
+            if not summary['level1_loads']:
+                self.stdout.write(self.style.WARNING('  No active Level 1 volunteers - skipped'))
+            for load in summary['level1_loads']:
+                self.stdout.write(f"  {load['name']}: {load['voter_count']}")
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS(
+            f"Reassigned: {sum(s['moved_count'] for s in summaries)} voters in {elapsed:.2f}s"
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -0,0 +1,84 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, close_old_connections
+from voters.models import Voter, AppSettings
+
+
+class Command(BaseCommand):
+    help = 'Benchmark request latency with and without persistent database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of simulated requests per run (default: 200)'
+        )
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=None,
+            help='CONN_MAX_AGE to use for the pooled run (default: value from settings, or 60)'
+        )
+
+    def handle(self, *args, **options):
+        num_requests = options['requests']
+        pooled_max_age = options['conn_max_age']
+        if pooled_max_age is None:
+            pooled_max_age = connection.settings_dict.get('CONN_MAX_AGE') or 60
+
+        original_max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+
+        self.stdout.write(f'Simulating {num_requests} requests per run against {connection.vendor}...')
+
+        try:
+            results = [
+                ('Without pooling (CONN_MAX_AGE=0)', self.run(num_requests, 0)),
+                (f'With pooling (CONN_MAX_AGE={pooled_max_age})', self.run(num_requests, pooled_max_age)),
+            ]
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original_max_age
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Request Latency (ms)'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        for label, timings in results:
+            self.stdout.write(label)
+            self.stdout.write(
+                f'  mean {statistics.mean(timings):.2f}  '
+                f'p50 {self.percentile(timings, 50):.2f}  '
+                f'p95 {self.percentile(timings, 95):.2f}  '
+                f'p99 {self.percentile(timings, 99):.2f}'
+            )
+
+        baseline = statistics.mean(results[0][1])
+        pooled = statistics.mean(results[1][1])
+        if pooled > 0:
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {baseline / pooled:.1f}x'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def run(self, num_requests, conn_max_age):
+        """Time the connection lifecycle Django runs around every request"""
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+        timings = []
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            # request_started / request_finished both call close_old_connections
+            close_old_connections()
+            AppSettings.load()
+            Voter.objects.filter(has_voted=True).exists()
+            close_old_connections()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def percentile(self, values, pct):
+        """Nearest-rank percentile"""
+        ordered = sorted(values)
+        index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
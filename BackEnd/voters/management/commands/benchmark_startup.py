@@ -0,0 +1,144 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from .load_test import Client
+
+# What a booth agent's and an admin's first page load asks for
+ENDPOINTS = [
+    ('app_settings', '/api/settings/'),
+    ('voter_list', '/api/voters/?page=1'),
+    ('voter_lookup', '/api/voters/lookup/?serial_no=1'),
+    ('dashboard_stats', '/api/dashboard/stats/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn cold (GUNICORN_WARMUP=False) and warm (preloaded app, per-worker '
+        'warm-up) and measure how long after launch the first requests are answered and '
+        'when every endpoint answers under --threshold-ms. Uses the database in .env.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, required=True, help='Admin or overview user to log in as')
+        parser.add_argument('--password', type=str, required=True, help='Password for --username')
+        parser.add_argument('--port', type=int, default=8765, help='Port for the benchmark server (default: 8765)')
+        parser.add_argument('--workers', type=int, default=3, help='Gunicorn workers (default: 3)')
+        parser.add_argument('--runs', type=int, default=3, help='Starts per mode (default: 3)')
+        parser.add_argument('--asgi', action='store_true', help='Serve voting_tracker.asgi with uvicorn workers')
+        parser.add_argument('--threshold-ms', type=float, default=50.0, help='Latency counted as fast (default: 50)')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Seconds to wait per start (default: 60)')
+        parser.add_argument('--server-log', type=str, default=os.devnull, help='File for the gunicorn output')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.url = f"http://127.0.0.1:{options['port']}"
+        results = {'cold': [], 'warm': []}
+        for run in range(options['runs']):
+            for mode in results:
+                self.stdout.write(f"Run {run + 1}/{options['runs']}: {mode} start...")
+                results[mode].append(self.measure(warm=(mode == 'warm')))
+        self.report(results)
+
+    def start_server(self, warm):
+        options = self.options
+        if options['asgi']:
+            command = ['voting_tracker.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker']
+        else:
+            command = ['voting_tracker.wsgi:application']
+        env = {
+            **os.environ,
+            'GUNICORN_WARMUP': str(warm),
+            'GUNICORN_BIND': f"127.0.0.1:{options['port']}",
+            'GUNICORN_WORKERS': str(options['workers']),
+            # Repeated rounds must not run into the dashboard budget
+            'THROTTLE_ENABLED': 'False',
+        }
+        log = open(options['server_log'], 'ab')
+        try:
+            return subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', *command, '-c', 'python:voting_tracker.gunicorn_conf'],
+                cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+            )
+        finally:
+            log.close()
+
+    def measure(self, warm):
+        """Seconds until ready and until fast, and first-response latency (ms) per endpoint"""
+        options = self.options
+        start = time.perf_counter()
+        process = self.start_server(warm)
+        deadline = start + options['timeout']
+        try:
+            probe = Client(self.url, options['timeout'])
+            while True:
+                if process.poll() is not None:
+                    raise CommandError(f"gunicorn exited with {process.returncode} (see --server-log)")
+                if time.perf_counter() > deadline:
+                    raise CommandError(f"No response from {self.url} within {options['timeout']:.0f}s")
+                status, _, _ = probe.request('GET', '/api/health/')
+                if status == 200:
+                    break
+                time.sleep(0.05)
+            ready = time.perf_counter() - start
+
+            # One client per worker, each request sent by all of them at once,
+            # so every worker answers its first request
+            clients = [Client(self.url, options['timeout']) for _ in range(options['workers'])]
+            with ThreadPoolExecutor(len(clients)) as pool:
+                if not all(pool.map(lambda client: client.login(options['username'], options['password']), clients)):
+                    raise CommandError(f"Login failed for {options['username']}")
+                first = {}
+                while time.perf_counter() < deadline:
+                    slowest = {}
+                    for name, path in ENDPOINTS:
+                        responses = list(pool.map(lambda client: client.request('GET', path), clients))
+                        # 404 on lookup is an unknown serial, not a failure
+                        failed = [
+                            status for status, _, _ in responses
+                            if status != 200 and not (name == 'voter_lookup' and status == 404)
+                        ]
+                        if failed:
+                            raise CommandError(f'{path} returned {failed[0]}')
+                        slowest[name] = max(elapsed for _, _, elapsed in responses) * 1000
+                    if not first:
+                        first = slowest
+                    if max(slowest.values()) <= options['threshold_ms']:
+                        return {'ready': ready, 'fast': time.perf_counter() - start, 'first': first}
+            return {'ready': ready, 'fast': None, 'first': first}
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def report(self, results):
+        names = [name for name, _ in ENDPOINTS]
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Startup Benchmark (median of runs)'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        for mode, runs in results.items():
+            fast = [run['fast'] for run in runs if run['fast'] is not None]
+            self.stdout.write(f'{mode}:')
+            self.stdout.write(f"  ready after:      {self.median([run['ready'] for run in runs]):.2f}s")
+            for name in names:
+                self.stdout.write(f"  first {name + ':':<17}{self.median([run['first'][name] for run in runs]):.0f}ms")
+            if fast:
+                self.stdout.write(
+                    f"  all under {self.options['threshold_ms']:.0f}ms after: {self.median(fast):.2f}s "
+                    f"({len(fast)}/{len(runs)} runs)"
+                )
+            else:
+                self.stdout.write(f"  never all under {self.options['threshold_ms']:.0f}ms within the timeout")
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def median(self, values):
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
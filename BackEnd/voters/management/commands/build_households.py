@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand
+from voters.households import assign_households, remove_empty_households
+from voters.models import Household
+
+
+class Command(BaseCommand):
+    help = 'Group voters into households by normalized house number and house name'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing'
+        )
+        parser.add_argument(
+            '--keep-empty',
+            action='store_true',
+            help='Keep households that no longer have any voters'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        created, reassigned = assign_households(dry_run=options['dry_run'])
+        removed = 0
+        if not options['dry_run'] and not options['keep_empty']:
+            removed = remove_empty_households()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN - no changes written'))
+        self.stdout.write(self.style.SUCCESS(f'Households created: {created}'))
+        self.stdout.write(self.style.SUCCESS(f'Voters reassigned: {reassigned}'))
+        self.stdout.write(self.style.SUCCESS(f'Empty households removed: {removed}'))
+        self.stdout.write(self.style.SUCCESS(f'Total households: {Household.objects.count()}'))
+        self.stdout.write(self.style.SUCCESS(f'Time: {elapsed:.2f}s'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -0,0 +1,332 @@
+import csv
+import os
+import re
+import time
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from voters import events as voter_events
+from voters.cache import invalidate_voter_data
+from voters.models import Voter
+from voters.wards import get_ward
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Fields a spreadsheet may update. All are in the voter event log, so knock
+# lists and volunteer stats follow the changes without a full rebuild.
+# Voting and volunteer assignment have their own paths (booth API,
+# assign_volunteers) and cannot be set here.
+UPDATABLE_FIELDS = ['status', 'party', 'phone_number', 'notes']
+
+# Columns that can identify the voter within the ward
+KEY_FIELDS = ['serial_no', 'sec_id']
+
+# Normalized header -> field, besides the field names themselves
+HEADER_ALIASES = {
+    'serial': 'serial_no',
+    'serial_number': 'serial_no',
+    'sl_no': 'serial_no',
+    'sec_id_no': 'sec_id',
+    'phone': 'phone_number',
+    'mobile': 'phone_number',
+    'mobile_no': 'phone_number',
+    'mobile_number': 'phone_number',
+    'note': 'notes',
+    'remarks': 'notes',
+}
+
+PHONE_RE = re.compile(r'^\+?[0-9]{6,14}$')
+
+
+def normalize_header(header):
+    return re.sub(r'[^a-z0-9]+', '_', str(header or '').strip().lower()).strip('_')
+
+
+def cell_text(value):
+    """Cell value as stripped text ('' when empty); whole floats lose the .0"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def choice_lookup(choices):
+    """Case-insensitive {code or label: code}"""
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+        lookup[normalize_header(label)] = code
+    return lookup
+
+
+CHOICES = {
+    'status': choice_lookup(Voter.STATUS_CHOICES),
+    'party': choice_lookup(Voter.PARTY_CHOICES),
+}
+
+
+def clean_value(field, text):
+    """Validated model value for a non-empty cell; raises ValidationError"""
+    if field in CHOICES:
+        value = CHOICES[field].get(text.lower())
+        if value is None:
+            raise ValidationError(f'unknown {field} {text!r}')
+    elif field == 'phone_number':
+        value = re.sub(r'[\s-]', '', text)
+        if not PHONE_RE.match(value):
+            raise ValidationError(f'invalid phone number {text!r}')
+    else:
+        value = text
+    return Voter._meta.get_field(field).clean(value, None)
+
+
+def read_rows(path, sheet):
+    """Yield the file's rows (header first) as tuples, without loading it whole"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        if openpyxl is None:
+            raise CommandError('openpyxl is not installed. Install it with: pip install openpyxl')
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+
+
+class Command(BaseCommand):
+    help = (
+        'Update voter fields (' + ', '.join(UPDATABLE_FIELDS) + ') from a CSV or XLSX file '
+        'keyed by serial number or SEC ID. Only changed values are written, in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='CSV or XLSX file with a header row')
+        parser.add_argument('--sheet', type=str, help='XLSX sheet name (default: first sheet)')
+        parser.add_argument(
+            '--map',
+            action='append',
+            default=[],
+            metavar='COLUMN=FIELD',
+            help='Map a header to a field, e.g. "Mobile No=phone_number" (repeatable). '
+                 'Headers matching a field name or a common alias are mapped automatically.'
+        )
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Ward number (optional when there is only one ward)'
+        )
+        parser.add_argument(
+            '--clear-empty',
+            action='store_true',
+            help='Empty phone_number/notes cells clear the value (default: leave it unchanged)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per UPDATE (default: 1000)')
+        parser.add_argument('--show', type=int, default=50, help='Changes to print (default: 50)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be done without making changes'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+        ward = get_ward(options['ward'])
+        if ward is None:
+            raise CommandError(
+                f"Ward {options['ward']} not found" if options['ward'] is not None
+                else 'Specify the ward with --ward <number>'
+            )
+        dry_run = options['dry_run']
+        start = time.perf_counter()
+
+        rows = read_rows(path, options['sheet'])
+        header = next(rows, None)
+        if header is None:
+            raise CommandError(f'{path} is empty')
+        key_field, key_index, columns = self.map_columns(header, options['map'])
+        self.stdout.write(
+            f'Updating {", ".join(field for _, field in columns)} in {ward}, '
+            f'matching rows on {key_field}'
+        )
+
+        updates, errors, duplicates, row_count = self.read_updates(
+            rows, key_field, key_index, columns, options['clear_empty']
+        )
+        read_time = time.perf_counter() - start
+        self.stdout.write(f'Read {row_count} rows in {read_time:.1f}s')
+
+        # Current values of the ward's voters in one query
+        fields = [field for _, field in columns]
+        positions = {field: position for position, field in enumerate(fields, start=2)}
+        current = {
+            row[0]: row for row in
+            Voter.objects.filter(ward=ward).order_by().values_list(key_field, 'id', *fields).iterator(chunk_size=5000)
+        }
+        changes = {}
+        not_found = []
+        for key, new_values in updates.items():
+            row = current.get(key)
+            if row is None:
+                not_found.append(key)
+                continue
+            diff = {
+                field: [row[positions[field]], value]
+                for field, value in new_values.items()
+                if row[positions[field]] != value
+            }
+            if diff:
+                changes[row[1]] = (key, diff)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+        shown = 0
+        for voter_id, (key, diff) in changes.items():
+            if shown >= options['show']:
+                self.stdout.write(f'  ... and {len(changes) - shown} more')
+                break
+            described = ', '.join(f'{field}: {old!r} -> {new!r}' for field, (old, new) in diff.items())
+            self.stdout.write(f'  {key_field} {key}: {described}')
+            shown += 1
+
+        if changes and not dry_run:
+            self.apply(ward, changes, options['batch_size'])
+
+        field_counts = defaultdict(int)
+        for _, diff in changes.values():
+            for field in diff:
+                field_counts[field] += 1
+        elapsed = time.perf_counter() - start
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Bulk Update Summary'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes were made'))
+        self.stdout.write(self.style.SUCCESS(f'Rows read: {row_count}'))
+        self.stdout.write(self.style.SUCCESS(f'Voters {"to update" if dry_run else "updated"}: {len(changes)}'))
+        for field in fields:
+            self.stdout.write(f'  {field}: {field_counts[field]}')
+        self.stdout.write(f'Unchanged: {len(updates) - len(changes) - len(not_found)}')
+        if duplicates:
+            self.stdout.write(self.style.WARNING(f'Repeated {key_field} (last row wins): {duplicates}'))
+        if not_found:
+            self.stdout.write(self.style.WARNING(f'Not found in {ward}: {len(not_found)}'))
+            self.stdout.write(self.style.WARNING(f'{sorted(not_found)[:50]}'))
+        if errors:
+            self.stdout.write(self.style.ERROR(f'Rows skipped: {len(errors)}'))
+            for line, message in errors[:50]:
+                self.stdout.write(self.style.ERROR(f'  Row {line}: {message}'))
+        self.stdout.write(self.style.SUCCESS(f'Time: {elapsed:.1f}s ({row_count / max(elapsed, 1e-6):.0f} rows/s)'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+        if dry_run:
+            self.stdout.write('')
+            self.stdout.write(self.style.WARNING('To apply these changes, run without --dry-run flag'))
+
+    def map_columns(self, header, mappings):
+        """(key field, key column index, [(column index, field)]) from the header and --map options"""
+        explicit = {}
+        for mapping in mappings:
+            column, sep, field = mapping.rpartition('=')
+            if not sep or field not in UPDATABLE_FIELDS + KEY_FIELDS:
+                raise CommandError(
+                    f'Invalid --map {mapping!r}: use COLUMN=FIELD with FIELD one of '
+                    f'{", ".join(KEY_FIELDS + UPDATABLE_FIELDS)}'
+                )
+            explicit[normalize_header(column)] = field
+
+        key_field = None
+        columns = []
+        for index, name in enumerate(header):
+            normalized = normalize_header(name)
+            field = explicit.get(normalized) or HEADER_ALIASES.get(normalized, normalized)
+            if field in KEY_FIELDS:
+                # serial_no wins when both key columns are present
+                if key_field is None or field == 'serial_no':
+                    key_field, key_index = field, index
+            elif field in UPDATABLE_FIELDS:
+                if field in (mapped for _, mapped in columns):
+                    raise CommandError(f'More than one column maps to {field}')
+                columns.append((index, field))
+            elif normalized:
+                self.stdout.write(self.style.WARNING(f'Ignoring column {name!r}'))
+
+        if key_field is None:
+            raise CommandError(f'No serial_no or sec_id column in the header: {list(header)}')
+        if not columns:
+            raise CommandError(f'No column maps to an updatable field ({", ".join(UPDATABLE_FIELDS)})')
+        return key_field, key_index, columns
+
+    def read_updates(self, rows, key_field, key_index, columns, clear_empty):
+        """
+        ({key: {field: value}}, [(row number, error)], repeated keys, rows read)
+        for the data rows; a row with any invalid value is skipped whole.
+        """
+        updates = {}
+        errors = []
+        duplicates = 0
+        row_count = 0
+        for line, row in enumerate(rows, start=2):
+            if not any(cell_text(value) for value in row):
+                continue
+            row_count += 1
+            key = cell_text(row[key_index]) if key_index < len(row) else ''
+            if key_field == 'serial_no':
+                if not key.isdigit():
+                    errors.append((line, f'invalid serial number {key!r}'))
+                    continue
+                key = int(key)
+            elif not key:
+                errors.append((line, 'missing sec_id'))
+                continue
+            else:
+                key = key.upper()
+
+            values = {}
+            try:
+                for index, field in columns:
+                    text = cell_text(row[index]) if index < len(row) else ''
+                    if text:
+                        values[field] = clean_value(field, text)
+                    elif clear_empty and field in ('phone_number', 'notes'):
+                        values[field] = None
+            except ValidationError as e:
+                errors.append((line, '; '.join(e.messages)))
+                continue
+            if key in updates:
+                duplicates += 1
+            updates[key] = values
+        return updates, errors, duplicates, row_count
+
+    def apply(self, ward, changes, batch_size):
+        """Write the changes with bulk_update, one statement per batch of voters changing the same fields"""
+        now = timezone.now()
+        groups = defaultdict(list)
+        for voter_id, (_, diff) in changes.items():
+            groups[tuple(sorted(diff))].append((voter_id, diff))
+
+        # Filtering on the ward keeps each UPDATE on the ward's partition
+        ward_voters = Voter.objects.filter(ward=ward)
+        with transaction.atomic():
+            for fields, members in groups.items():
+                voters = [
+                    Voter(id=voter_id, updated_at=now, **{field: new for field, (_, new) in diff.items()})
+                    for voter_id, diff in members
+                ]
+                ward_voters.bulk_update(voters, list(fields) + ['updated_at'], batch_size=batch_size)
+                for voter_id, diff in members:
+                    voter_events.record(voter_id, diff, source='command')
+            invalidate_voter_data(ward.id)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from voters import exports
+from voters.models import Voter
+from voters.routers import REPLICA_DB_ALIAS, replica_configured
+from voters.wards import get_ward
+
+
+class Command(BaseCommand):
+    help = (
+        'Export the voter roll with party, status, voting and volunteer fields to an XLSX '
+        'file, optionally with one sheet per Level 2 thara'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='XLSX file to write (e.g. voters.xlsx)')
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Only export this ward (default: every ward)'
+        )
+        parser.add_argument('--by-thara', action='store_true', help='One sheet per Level 2 volunteer')
+        parser.add_argument('--include-deleted', action='store_true', help="Also export voters with status 'deleted'")
+
+    def handle(self, *args, **options):
+        if exports.openpyxl is None:
+            raise CommandError('openpyxl is not installed. Install it with: pip install openpyxl')
+
+        # A read-only scan of the whole roll; keep it off the primary when possible
+        using = REPLICA_DB_ALIAS if replica_configured() else 'default'
+        voters = Voter.objects.using(using)
+        if not options['include_deleted']:
+            voters = voters.exclude(status='deleted')
+        if options['ward'] is not None:
+            ward = get_ward(options['ward'])
+            if ward is None:
+                raise CommandError(f"Ward {options['ward']} not found")
+            voters = voters.filter(ward=ward)
+
+        self.stdout.write(f"Exporting voters to {options['path']}...")
+        rows, elapsed = exports.write_roll(options['path'], voters, split_by_thara=options['by_thara'])
+
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS(f"Export written: {options['path']}"))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS(f'Voters: {rows}'))
+        self.stdout.write(self.style.SUCCESS(f'Time: {elapsed:.1f}s ({rows / max(elapsed, 1e-6):.0f} rows/s)'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -0,0 +1,109 @@
+import csv
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from voters.duplicates import WEIGHTS, find_duplicates
+from voters.models import Voter, Ward
+from voters.routers import REPLICA_DB_ALIAS, replica_configured
+from voters.wards import get_ward
+
+
+class Command(BaseCommand):
+    help = (
+        'Find voters listed more than once (same person, different SEC ID), within a ward '
+        'or across wards, and print them ranked by similarity'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Only compare voters of this ward (default: every ward, including across wards)'
+        )
+        parser.add_argument('--cross-ward', action='store_true', help='Only report pairs from different wards')
+        parser.add_argument('--min-score', type=float, default=0.85, help='Lowest score reported, 0-1 (default: 0.85)')
+        parser.add_argument(
+            '--max-block',
+            type=int,
+            default=200,
+            help='Skip blocking keys shared by more voters than this (default: 200)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Scoring processes (default: CPU count)'
+        )
+        parser.add_argument('--limit', type=int, default=100, help='Pairs to print (default: 100)')
+        parser.add_argument('--csv', type=str, help='Also write every pair found to this CSV file')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['min_score'] <= 1:
+            raise CommandError('--min-score must be between 0 and 1')
+        start = time.perf_counter()
+
+        # A read-only scan of the whole roll; keep it off the primary when possible
+        using = REPLICA_DB_ALIAS if replica_configured() else 'default'
+        voters = Voter.objects.using(using).exclude(status='deleted')
+        if options['ward'] is not None:
+            ward = get_ward(options['ward'])
+            if ward is None:
+                raise CommandError(f"Ward {options['ward']} not found")
+            voters = voters.filter(ward=ward)
+
+        self.stdout.write('Comparing voters...')
+        matches, stats = find_duplicates(
+            voters, min_score=options['min_score'], max_block=options['max_block'], workers=options['workers']
+        )
+        if options['cross_ward']:
+            matches = [match for match in matches if match[1]['ward_id'] != match[2]['ward_id']]
+        ward_numbers = dict(Ward.objects.using(using).values_list('id', 'number'))
+
+        for rank, (score, first, second, parts) in enumerate(matches[:options['limit']], start=1):
+            self.stdout.write(
+                f"{rank:>4}. {score:.3f}  {self.describe(first, ward_numbers)}  <->  {self.describe(second, ward_numbers)}"
+            )
+            self.stdout.write('        ' + ', '.join(f'{field} {parts[field]:.2f}' for field in WEIGHTS))
+        if len(matches) > options['limit']:
+            self.stdout.write(f"  ... and {len(matches) - options['limit']} more")
+
+        if options['csv']:
+            self.write_csv(options['csv'], matches, ward_numbers)
+
+        elapsed = time.perf_counter() - start
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Duplicate Voter Summary'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS(f"Voters compared: {stats['voters']}"))
+        self.stdout.write(self.style.SUCCESS(f"Candidate pairs scored: {stats['pairs']}"))
+        self.stdout.write(self.style.SUCCESS(f"Likely duplicates (score >= {options['min_score']}): {len(matches)}"))
+        same_sec_id = sum(1 for _, first, second, _ in matches if first['sec_id'] and first['sec_id'] == second['sec_id'])
+        if same_sec_id:
+            self.stdout.write(self.style.WARNING(f'  with the same SEC ID: {same_sec_id}'))
+        if stats['skipped_blocks']:
+            self.stdout.write(self.style.WARNING(
+                f"Blocks over --max-block skipped: {stats['skipped_blocks']} (raise it to compare them)"
+            ))
+        self.stdout.write(self.style.SUCCESS(f'Time: {elapsed:.1f}s'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def describe(self, record, ward_numbers):
+        return f"[W{ward_numbers.get(record['ward_id'])} #{record['serial_no']} {record['sec_id']}] {record['name_en']}"
+
+    def write_csv(self, path, matches, ward_numbers):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ['score']
+                + [f'{side}_{column}' for side in ('first', 'second') for column in ('ward', 'serial_no', 'sec_id', 'name_en', 'id')]
+                + list(WEIGHTS)
+            )
+            for score, first, second, parts in matches:
+                row = [f'{score:.3f}']
+                for record in (first, second):
+                    row += [ward_numbers.get(record['ward_id']), record['serial_no'], record['sec_id'], record['name_en'], record['id']]
+                writer.writerow(row + [f'{parts[field]:.2f}' for field in WEIGHTS])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(matches)} pairs to {path}'))
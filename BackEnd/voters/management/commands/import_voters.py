@@ -2,7 +2,10 @@ import csv
 import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from voters.models import Voter
+from voters.cache import invalidate_derived_caches
+from voters.households import assign_households
+from voters.models import Voter, Ward
+from voters.wards import get_ward
 
 
 class Command(BaseCommand):
@@ -21,10 +24,21 @@ class Command(BaseCommand):
             default=r'D:\Hemang\Election\Chuduvalathur Ward List\VotersList_Ward14_ml.csv',
             help='Path to Malayalam CSV file'
         )
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Ward number the list belongs to (created if missing; optional when there is only one ward)'
+        )
+        parser.add_argument(
+            '--ward-name',
+            type=str,
+            default='',
+            help='Name for a ward created by this import'
+        )
         parser.add_argument(
             '--clear',
             action='store_true',
-            help='Clear existing voters before import'
+            help="Clear the ward's existing voters before import"
         )
 
     def handle(self, *args, **options):
@@ -42,10 +56,26 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Proceeding with English file only'))
             ml_file = None
 
+        # Resolve the ward
+        if options['ward'] is not None:
+            ward, ward_created = Ward.objects.get_or_create(
+                number=options['ward'],
+                defaults={'name': options['ward_name'] or f"Ward {options['ward']}"}
+            )
+            if ward_created:
+                self.stdout.write(self.style.SUCCESS(f'Created {ward}'))
+        else:
+            ward = get_ward()
+            if ward is None:
+                self.stdout.write(self.style.ERROR('Specify the ward with --ward <number>'))
+                return
+        self.stdout.write(f'Importing into {ward}')
+
         # Clear existing voters if requested
         if clear_existing:
-            count = Voter.objects.count()
-            Voter.objects.all().delete()
+            ward_voters = Voter.objects.filter(ward=ward)
+            count = ward_voters.count()
+            ward_voters.delete()
             self.stdout.write(self.style.WARNING(f'Deleted {count} existing voters'))
 
         # Read English CSV
@@ -68,6 +98,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('No voters found in English CSV file!'))
             return
 
+        imported_ids = []
         with transaction.atomic():
             for serial_no, en_data in en_voters.items():
                 try:
@@ -109,6 +140,7 @@ class Command(BaseCommand):
                     
                     # Create or update voter
                     voter, created = Voter.objects.update_or_create(
+                        ward=ward,
                         sec_id=sec_id,
                         defaults={
                             'serial_no': serial_no,
@@ -125,6 +157,7 @@ class Command(BaseCommand):
                         }
                     )
                     
+                    imported_ids.append(voter.id)
                     if created:
                         created_count += 1
                     else:
@@ -139,10 +172,16 @@ class Command(BaseCommand):
                         self.style.ERROR(f'Error processing voter {serial_no}: {str(e)}')
                     )
 
+            # Keep the household index in step with the imported house details
+            households_created, _ = assign_households(Voter.objects.filter(id__in=imported_ids))
+
+        invalidate_derived_caches()
+
         # Summary
         self.stdout.write(self.style.SUCCESS('\n=== Import Summary ==='))
         self.stdout.write(self.style.SUCCESS(f'Created: {created_count}'))
         self.stdout.write(self.style.SUCCESS(f'Updated: {updated_count}'))
+        self.stdout.write(self.style.SUCCESS(f'New households: {households_created}'))
         if error_count > 0:
             self.stdout.write(self.style.ERROR(f'Errors: {error_count}'))
         self.stdout.write(self.style.SUCCESS(f'Total: {created_count + updated_count}'))
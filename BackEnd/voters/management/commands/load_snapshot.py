@@ -0,0 +1,81 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from voters import knock_list, lookups, snapshot, volunteer_stats, voter_store, wards
+from voters.cache import invalidate_voter_data
+from voters.models import AppSettings
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace users, volunteers, households, voters and app settings with the contents of a '
+        'snapshot written by dump_snapshot, then verify the restored tables against its checksums'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Snapshot file to restore')
+        parser.add_argument(
+            '--yes',
+            action='store_true',
+            help='Do not ask for confirmation before replacing the existing data'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only verify the snapshot file checksums, without restoring'
+        )
+
+    def handle(self, *args, **options):
+        if snapshot.np is None:
+            raise CommandError('NumPy is required: pip install numpy')
+
+        start = time.perf_counter()
+        try:
+            header, tables = snapshot.read(options['path'])
+        except (OSError, snapshot.SnapshotError) as e:
+            raise CommandError(str(e))
+        read_time = time.perf_counter() - start
+
+        self.stdout.write(f"Snapshot from {header['created_at']}, checksums OK:")
+        for table in header['tables']:
+            self.stdout.write(f"  {table['table']}: {table['rows']} rows")
+        if options['check']:
+            return
+
+        dependents = snapshot.dependent_tables()
+        if not options['yes']:
+            self.stdout.write(self.style.WARNING(
+                'This replaces all existing users, volunteers and voters and clears '
+                f"{', '.join(dependents)}."
+            ))
+            if input('Type "yes" to continue: ').strip().lower() != 'yes':
+                raise CommandError('Restore cancelled')
+
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                snapshot.restore(header, tables)
+                mismatched = snapshot.verify(header)
+                if mismatched:
+                    raise CommandError(
+                        f"Restored data does not match the snapshot checksums for {', '.join(mismatched)}; "
+                        'rolled back'
+                    )
+                # Wards first: the voter data bump reads the ward list
+                transaction.on_commit(wards.invalidate_cache)
+                invalidate_voter_data()
+                transaction.on_commit(lookups.invalidate_volunteers)
+                transaction.on_commit(AppSettings.invalidate_cache)
+                transaction.on_commit(knock_list.invalidate_all)
+                transaction.on_commit(volunteer_stats.invalidate_all)
+                transaction.on_commit(voter_store.invalidate_all)
+        except snapshot.SnapshotError as e:
+            raise CommandError(str(e))
+        restore_time = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Snapshot restored and verified'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(f"Cleared: {', '.join(dependents)}")
+        self.stdout.write(self.style.SUCCESS(f'Read: {read_time:.2f}s, restore + verify: {restore_time:.2f}s'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
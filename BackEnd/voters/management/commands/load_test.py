@@ -0,0 +1,234 @@
+import http.cookiejar
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Client:
+    """Minimal session client (cookies + CSRF) for one simulated user"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None):
+        """Return (status, parsed JSON or None, seconds)"""
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+        request = urllib.request.Request(f'{self.base_url}{path}', data=body, method=method)
+        request.add_header('Content-Type', 'application/json')
+        request.add_header('Referer', self.base_url + '/')
+        if method != 'GET':
+            request.add_header('X-CSRFToken', self.csrf_token())
+
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            return 0, None, time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+
+        try:
+            parsed = json.loads(payload) if payload else None
+        except ValueError:
+            parsed = None
+        return status, parsed, elapsed
+
+    def login(self, username, password):
+        self.request('GET', '/api/auth/csrf/')
+        status, _, _ = self.request('POST', '/api/auth/login/', {'username': username, 'password': password})
+        return status == 200
+
+
+class Results:
+    """Thread-safe latency and status samples per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, endpoint, status, elapsed):
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((status, elapsed))
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a polling-day traffic mix against a running server: booth agents doing '
+        'serial lookups + mark-voted, Level 1 volunteers polling voter lists and admins '
+        'refreshing the dashboard. Mark-voted writes change data - use a staging database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://127.0.0.1:8000', help='Server base URL')
+        parser.add_argument('--duration', type=int, default=60, help='Test duration in seconds (default: 60)')
+        parser.add_argument('--booth-agents', type=int, default=5, help='Number of booth agents (default: 5)')
+        parser.add_argument('--volunteers', type=int, default=20, help='Number of Level 1 volunteers (default: 20)')
+        parser.add_argument('--dashboards', type=int, default=2, help='Number of admin dashboards (default: 2)')
+        parser.add_argument(
+            '--booth-login', action='append', default=[],
+            help='username:password for booth agents (repeatable, cycled across agents)'
+        )
+        parser.add_argument(
+            '--volunteer-login', action='append', default=[],
+            help='username:password for Level 1 volunteers (repeatable, cycled)'
+        )
+        parser.add_argument(
+            '--dashboard-login', action='append', default=[],
+            help='username:password for admin/overview users (repeatable, cycled)'
+        )
+        parser.add_argument('--serial-range', type=str, default='1-1500', help='Serial numbers booth agents enter (default: 1-1500)')
+        parser.add_argument('--agent-think', type=float, default=2.0, help='Seconds between booth entries (default: 2)')
+        parser.add_argument('--list-interval', type=float, default=120.0, help='Seconds between volunteer list polls (default: 120)')
+        parser.add_argument('--dashboard-interval', type=float, default=30.0, help='Seconds between dashboard refreshes (default: 30)')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds (default: 30)')
+        parser.add_argument('--no-writes', action='store_true', help='Booth agents only look up voters, without marking them')
+
+    def handle(self, *args, **options):
+        self.options = options
+        try:
+            low, high = (int(part) for part in options['serial_range'].split('-'))
+        except ValueError:
+            raise CommandError('--serial-range must look like 1-1500')
+        self.serials = list(range(low, high + 1))
+        random.shuffle(self.serials)
+        self.serial_lock = threading.Lock()
+
+        roles = [
+            ('booth agent', options['booth_agents'], options['booth_login'], self.run_booth_agent),
+            ('volunteer', options['volunteers'], options['volunteer_login'], self.run_volunteer),
+            ('dashboard', options['dashboards'], options['dashboard_login'], self.run_dashboard),
+        ]
+        for label, count, logins, _ in roles:
+            if count and not logins:
+                raise CommandError(f'{count} {label}(s) requested but no --{label.split()[0]}-login given')
+
+        self.results = Results()
+        self.deadline = time.monotonic() + options['duration']
+
+        threads = []
+        for label, count, logins, target in roles:
+            for index in range(count):
+                username, _, password = logins[index % len(logins)].partition(':')
+                threads.append(threading.Thread(target=self.run_user, args=(target, username, password), daemon=True))
+
+        self.stdout.write(
+            f"Running {options['booth_agents']} booth agents, {options['volunteers']} volunteers and "
+            f"{options['dashboards']} dashboards against {options['url']} for {options['duration']}s..."
+        )
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report(time.monotonic() - start)
+
+    def run_user(self, target, username, password):
+        client = Client(self.options['url'], self.options['timeout'])
+        start = time.perf_counter()
+        logged_in = client.login(username, password)
+        self.results.add('login', 200 if logged_in else 401, time.perf_counter() - start)
+        if logged_in:
+            target(client)
+
+    def sleep(self, seconds):
+        """Sleep up to the deadline; False once the test is over"""
+        remaining = self.deadline - time.monotonic()
+        time.sleep(max(0, min(seconds, remaining)))
+        return time.monotonic() < self.deadline
+
+    def next_serial(self):
+        with self.serial_lock:
+            if not self.serials:
+                return None
+            return self.serials.pop()
+
+    def run_booth_agent(self, client):
+        """Serial lookups followed by mark-voted, like DataEntryPage"""
+        while time.monotonic() < self.deadline:
+            serial_no = self.next_serial()
+            if serial_no is None:
+                return
+            status, voter, elapsed = client.request('GET', f'/api/voters/lookup/?serial_no={serial_no}')
+            self.results.add('voter_lookup', status, elapsed)
+            if (
+                status == 200 and voter is not None and not self.options['no_writes']
+                and not voter['has_voted'] and voter['status'] == 'active'
+            ):
+                status, _, elapsed = client.request('PATCH', f"/api/voters/{voter['id']}/", {'has_voted': True})
+                self.results.add('mark_voted', status, elapsed)
+            if not self.sleep(random.expovariate(1 / self.options['agent_think'])):
+                return
+
+    def run_volunteer(self, client):
+        """Voter list polling, like VotersPage"""
+        if not self.sleep(random.uniform(0, self.options['list_interval'])):
+            return
+        while True:
+            params = urllib.parse.urlencode(random.choice([
+                {'page': 1},
+                {'page': 1, 'has_voted': 'false'},
+                {'page': 1, 'has_voted': 'false', 'party': 'ldf'},
+            ]))
+            status, _, elapsed = client.request('GET', f'/api/voters/?{params}')
+            self.results.add('voter_list', status, elapsed)
+            if not self.sleep(self.options['list_interval']):
+                return
+
+    def run_dashboard(self, client):
+        """Dashboard refreshes, like DashboardPage"""
+        if not self.sleep(random.uniform(0, self.options['dashboard_interval'])):
+            return
+        while True:
+            status, _, elapsed = client.request('GET', '/api/dashboard/stats/')
+            self.results.add('dashboard_stats', status, elapsed)
+            if not self.sleep(self.options['dashboard_interval']):
+                return
+
+    def percentile(self, ordered, pct):
+        """Nearest-rank percentile of a sorted list"""
+        index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def report(self, elapsed):
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(f'Load Test Results ({elapsed:.0f}s)'))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(
+            f"{'endpoint':<16}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'max ms':>9}{'errors':>9}"
+        )
+        for endpoint, samples in sorted(self.results.samples.items()):
+            latencies = sorted(sample[1] * 1000 for sample in samples)
+            # 404 on lookup is an unknown serial, not a server error
+            errors = sum(
+                1 for status, _ in samples
+                if status == 0 or status >= 500 or (status >= 400 and not (endpoint == 'voter_lookup' and status == 404))
+            )
+            self.stdout.write(
+                f'{endpoint:<16}{len(samples):>9}{len(samples) / elapsed:>8.1f}'
+                f'{self.percentile(latencies, 50):>9.1f}{self.percentile(latencies, 95):>9.1f}'
+                f'{self.percentile(latencies, 99):>9.1f}{latencies[-1]:>9.1f}'
+                f'{errors / len(samples):>8.1%}'
+            )
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        total = sum(len(samples) for samples in self.results.samples.values())
+        self.stdout.write(self.style.SUCCESS(f'Total: {total} requests, {total / elapsed:.1f} req/s'))
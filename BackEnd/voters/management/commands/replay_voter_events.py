@@ -0,0 +1,137 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from voters import events as voter_events
+from voters.cache import invalidate_voter_data
+from voters.models import Voter, VoterEvent
+
+
+class Command(BaseCommand):
+    help = 'Replay the voter change log to restore tracking fields as of a point in time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--until',
+            type=str,
+            default=None,
+            help='Replay events up to this ISO timestamp (default: now)'
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            default=0,
+            help='Only replay events with an id greater than this (e.g. events since a snapshot)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Voters written per bulk_update batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be done without making changes'
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.now()
+        if options['until']:
+            until = parse_datetime(options['until'])
+            if until is None:
+                raise CommandError(f"Invalid --until timestamp: {options['until']}")
+            if timezone.is_naive(until):
+                until = timezone.make_aware(until)
+        dry_run = options['dry_run']
+
+        # Fold the log into every field's value as of `until`, per voter
+        self.stdout.write(f'Reading events to restore voters as of {until.isoformat()}...')
+        target = {}
+        event_count = 0
+        events = (
+            VoterEvent.objects.filter(id__gt=options['after_id'], created_at__lte=until)
+            .order_by('id')
+            .values_list('voter_id', 'changes')
+        )
+        for voter_id, changes in events.iterator(chunk_size=5000):
+            event_count += 1
+            fields = target.setdefault(voter_id, {})
+            for field, (old, new) in changes.items():
+                if field in voter_events.TRACKED_FIELDS:
+                    fields[field] = new
+
+        # Undo what changed only after `until`: a field with no event up to
+        # then takes the old value of its first later event
+        later_events = (
+            VoterEvent.objects.filter(id__gt=options['after_id'], created_at__gt=until)
+            .order_by('id')
+            .values_list('voter_id', 'changes')
+        )
+        for voter_id, changes in later_events.iterator(chunk_size=5000):
+            event_count += 1
+            fields = target.setdefault(voter_id, {})
+            for field, (old, new) in changes.items():
+                if field in voter_events.TRACKED_FIELDS:
+                    fields.setdefault(field, old)
+
+        self.stdout.write(f'Read {event_count} events for {len(target)} voters')
+        if not target:
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        updated_count = 0
+        missing_count = 0
+        voter_ids = list(target)
+        with transaction.atomic():
+            for start in range(0, len(voter_ids), options['batch_size']):
+                batch_ids = voter_ids[start:start + options['batch_size']]
+                voters = Voter.objects.in_bulk(batch_ids)
+                missing_count += len(batch_ids) - len(voters)
+
+                changed_voters = []
+                changed_fields = set()
+                for voter_id, voter in voters.items():
+                    changes = voter_events.diff_changes(voter, target[voter_id])
+                    if not changes:
+                        continue
+                    for field, (old, new) in changes.items():
+                        self.apply_value(voter, field, new)
+                        changed_fields.add(field)
+                    changed_voters.append(voter)
+                    if dry_run:
+                        self.stdout.write(f'  Voter {voter.serial_no}: {changes}')
+                    else:
+                        voter_events.record(voter_id, changes, source='command')
+
+                if changed_voters and not dry_run:
+                    Voter.objects.bulk_update(changed_voters, list(changed_fields) + ['updated_at'])
+                    invalidate_voter_data()
+                updated_count += len(changed_voters)
+
+            if dry_run:
+                transaction.set_rollback(True)
+
+        # Summary
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS('Replay Summary'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes were made'))
+        self.stdout.write(self.style.SUCCESS(f'Voters restored: {updated_count}'))
+        if missing_count:
+            self.stdout.write(self.style.WARNING(f'Voters no longer in database: {missing_count}'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def apply_value(self, voter, field, value):
+        """Set a logged (JSON) value back on the model"""
+        if field in ('level1_volunteer', 'level2_volunteer'):
+            setattr(voter, f'{field}_id', value)
+        elif field == 'time_voted':
+            voter.time_voted = parse_datetime(value) if value else None
+        else:
+            setattr(voter, field, value)
+        voter.updated_at = timezone.now()
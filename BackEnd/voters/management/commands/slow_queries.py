@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.db.models.functions import NullIf
+from voters.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = 'List the slowest query fingerprints captured by the slow query middleware'
+
+    ORDERINGS = {
+        'total': '-total_ms',
+        'count': '-count',
+        'max': '-max_ms',
+        'mean': 'mean',
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of fingerprints to show (default: 20)'
+        )
+        parser.add_argument(
+            '--order-by',
+            type=str,
+            default='total',
+            choices=list(self.ORDERINGS),
+            help='Rank by total time, count, max or mean time (default: total)'
+        )
+        parser.add_argument(
+            '--view',
+            type=str,
+            default=None,
+            help='Only show queries whose calling view contains this text (e.g. dashboard_stats)'
+        )
+        parser.add_argument(
+            '--show-plan',
+            action='store_true',
+            help='Print the sampled EXPLAIN (ANALYZE, BUFFERS) plan for each query'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete all captured slow queries'
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.WARNING(f'Deleted {deleted} slow query fingerprints'))
+            return
+
+        queries = SlowQuery.objects.annotate(mean=F('total_ms') / NullIf(F('count'), 0))
+        if options['view']:
+            queries = queries.filter(view__icontains=options['view'])
+        ordering = self.ORDERINGS[options['order_by']]
+        if ordering == 'mean':
+            queries = queries.order_by(F('mean').desc(nulls_last=True))
+        else:
+            queries = queries.order_by(ordering)
+        queries = list(queries[:options['limit']])
+
+        if not queries:
+            self.stdout.write(self.style.SUCCESS('No slow queries captured'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+        self.stdout.write(self.style.SUCCESS(f'Top {len(queries)} slow queries by {options["order_by"]}'))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+        for rank, query in enumerate(queries, start=1):
+            self.stdout.write('')
+            self.stdout.write(self.style.WARNING(
+                f'#{rank} {query.view}: {query.count}x, total {query.total_ms:.0f} ms, '
+                f'mean {query.mean_ms:.1f} ms, max {query.max_ms:.1f} ms'
+            ))
+            self.stdout.write(f'  {query.normalized_sql[:400]}')
+            self.stdout.write(f'  Last seen: {query.last_seen:%Y-%m-%d %H:%M:%S}  Fingerprint: {query.fingerprint[:12]}')
+            if options['show_plan']:
+                if query.explain_plan:
+                    self.stdout.write(f'  Plan (sampled {query.explained_at:%Y-%m-%d %H:%M:%S}):')
+                    for line in query.explain_plan.splitlines():
+                        self.stdout.write(f'    {line}')
+                else:
+                    self.stdout.write('  No plan sampled (non-SELECT or non-Postgres database)')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -1,7 +1,9 @@
 import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from voters.cache import invalidate_derived_caches
 from voters.models import Voter
+from voters.wards import get_ward
 try:
     import openpyxl
 except ImportError:
@@ -43,6 +45,11 @@ class Command(BaseCommand):
             choices=['ldf', 'udf', 'bjp', 'other', 'unknown'],
             help='Party to assign to voters (default: ldf)'
         )
+        parser.add_argument(
+            '--ward',
+            type=int,
+            help='Ward number (optional when there is only one ward)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -61,6 +68,13 @@ class Command(BaseCommand):
         cell_range = options['range']
         party = options['party']
         dry_run = options['dry_run']
+        ward = get_ward(options['ward'])
+        if ward is None:
+            self.stdout.write(self.style.ERROR(
+                f"Ward {options['ward']} not found" if options['ward'] is not None
+                else 'Specify the ward with --ward <number>'
+            ))
+            return
 
         # If relative path, make it relative to project root
         if not os.path.isabs(excel_file):
@@ -102,7 +116,7 @@ class Command(BaseCommand):
         with transaction.atomic():
             for serial_no in sorted(serial_numbers):
                 try:
-                    voter = Voter.objects.get(serial_no=serial_no)
+                    voter = Voter.objects.get(ward=ward, serial_no=serial_no)
                     
                     if not dry_run:
                         old_party = voter.party
@@ -131,6 +145,8 @@ class Command(BaseCommand):
                         self.style.WARNING(f'  Serial {serial_no}: Voter not found in database')
                     )
 
+        invalidate_derived_caches()
+
         # Summary
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -0,0 +1,317 @@
+"""
+Per-endpoint performance metrics in Prometheus text format.
+
+MetricsMiddleware records, per route (URL name): request counts by method and
+status, a latency histogram, DB query count and DB time (an execute wrapper
+on every connection, see install_query_hook) and serializer time. Each gunicorn worker keeps its
+counters in memory and periodically snapshots them to its own file under
+settings.METRICS_DIR (on /dev/shm, i.e. shared memory, by default);
+/api/metrics/ sums the snapshots of all workers. The gunicorn master (see
+voting_tracker/gunicorn_conf.py) clears the directory when it starts and
+folds each exited worker's file into worker-retired.json, so the directory
+does not grow with worker restarts.
+"""
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'http_requests_total': ('counter', 'HTTP requests by route, method and status'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by route'),
+    'db_queries_total': ('counter', 'Database queries executed by route'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by route'),
+    'serializer_duration_seconds_total': ('counter', 'Time spent serializing responses by route'),
+    'slow_queries_total': ('counter', 'Queries over SLOW_QUERY_THRESHOLD_MS by calling view'),
+    'throttled_requests_total': ('counter', 'Requests rejected by throttling, by scope and empty bucket'),
+}
+
+
+class MetricsRegistry:
+    """In-process counters and histograms, snapshotted to a per-worker file"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self.histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 3))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(LATENCY_BUCKETS)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(series)] for (name, labels), series in self.histograms.items()],
+            }
+
+    def flush(self, force=False):
+        """Write this worker's snapshot (at most once per METRICS_FLUSH_INTERVAL)"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'worker-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+
+registry = MetricsRegistry()
+
+# [serializer seconds, nesting depth] for the request being handled; a
+# context variable so concurrent async requests do not share it
+_serializer_state = ContextVar('serializer_state', default=None)
+
+
+class serializer_timer:
+    """Accumulate serializer time for the current request (outermost call only)"""
+
+    def __enter__(self):
+        self.state = _serializer_state.get()
+        if self.state is not None:
+            if self.state[1] == 0:
+                self.start = time.perf_counter()
+            self.state[1] += 1
+        return self
+
+    def __exit__(self, *exc):
+        if self.state is not None:
+            self.state[1] -= 1
+            if self.state[1] == 0:
+                self.state[0] += time.perf_counter() - self.start
+        return False
+
+
+def install_query_hook(hook):
+    """
+    Add an execute wrapper to every connection of every alias, in every
+    thread: async views query from sync_to_async threads, which have their
+    own connections, and reads may go to the replica. Hooks find the
+    request they belong to through a context variable, which asgiref copies
+    into those threads.
+    """
+    def add(connection, **kwargs):
+        if hook not in connection.execute_wrappers:
+            connection.execute_wrappers.append(hook)
+
+    connection_created.connect(add, weak=False, dispatch_uid=f'{hook.__module__}.{hook.__qualname__}')
+    for connection in connections.all(initialized_only=True):
+        add(connection)
+
+
+class _QueryTimer:
+    """Queries run and their duration for one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+_query_timer = ContextVar('query_timer', default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    query_timer = _query_timer.get()
+    if query_timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        query_timer.duration += time.perf_counter() - start
+        query_timer.count += 1
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+def _record(request, response, elapsed, query_timer, serializer_state):
+    route = _route(request)
+    registry.inc('http_requests_total', {
+        'route': route, 'method': request.method, 'status': str(response.status_code)
+    })
+    registry.observe('http_request_duration_seconds', {'route': route}, elapsed)
+    registry.inc('db_queries_total', {'route': route}, query_timer.count)
+    registry.inc('db_query_duration_seconds_total', {'route': route}, query_timer.duration)
+    registry.inc('serializer_duration_seconds_total', {'route': route}, serializer_state[0])
+    registry.flush()
+
+
+class MetricsMiddleware:
+    """Record per-route latency, DB and serializer metrics for every request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_query_hook(_time_query)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        query_timer = _QueryTimer()
+        serializer_state = [0.0, 0]
+        tokens = _query_timer.set(query_timer), _serializer_state.set(serializer_state)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_timer.reset(tokens[0])
+            _serializer_state.reset(tokens[1])
+        _record(request, response, time.perf_counter() - start, query_timer, serializer_state)
+        return response
+
+    async def __acall__(self, request):
+        query_timer = _QueryTimer()
+        serializer_state = [0.0, 0]
+        tokens = _query_timer.set(query_timer), _serializer_state.set(serializer_state)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_timer.reset(tokens[0])
+            _serializer_state.reset(tokens[1])
+        _record(request, response, time.perf_counter() - start, query_timer, serializer_state)
+        return response
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _add_snapshot(counters, histograms, snapshot):
+    for name, labels, value in snapshot['counters']:
+        key = (name, tuple(tuple(label) for label in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, series in snapshot['histograms']:
+        key = (name, tuple(tuple(label) for label in labels))
+        merged = histograms.setdefault(key, [0] * len(series))
+        for index, value in enumerate(series):
+            merged[index] += value
+
+
+def _merge_snapshots():
+    """Sum the snapshots written by every worker"""
+    counters = {}
+    histograms = {}
+    if not os.path.isdir(settings.METRICS_DIR):
+        return counters, histograms
+    for filename in os.listdir(settings.METRICS_DIR):
+        if not filename.startswith('worker-') or not filename.endswith('.json'):
+            continue
+        snapshot = _read_snapshot(os.path.join(settings.METRICS_DIR, filename))
+        if snapshot is not None:
+            _add_snapshot(counters, histograms, snapshot)
+    return counters, histograms
+
+
+def clear_snapshots():
+    """
+    Remove every snapshot in METRICS_DIR. The gunicorn master calls this on
+    start, so totals restart with the service instead of carrying files of
+    workers from earlier runs or deployments.
+    """
+    if not os.path.isdir(settings.METRICS_DIR):
+        return
+    for filename in os.listdir(settings.METRICS_DIR):
+        if filename.startswith('worker-'):
+            try:
+                os.remove(os.path.join(settings.METRICS_DIR, filename))
+            except OSError:
+                pass
+
+
+def retire_snapshot(pid):
+    """
+    Fold an exited worker's snapshot into worker-retired.json and remove its
+    file (gunicorn master, on child exit). Totals stay monotonic and the
+    directory holds one file per live worker plus the retired sum.
+    """
+    path = os.path.join(settings.METRICS_DIR, f'worker-{pid}.json')
+    snapshot = _read_snapshot(path)
+    if snapshot is None:
+        return
+    retired_path = os.path.join(settings.METRICS_DIR, 'worker-retired.json')
+    counters = {}
+    histograms = {}
+    for existing in (_read_snapshot(retired_path), snapshot):
+        if existing is not None:
+            _add_snapshot(counters, histograms, existing)
+    tmp_path = f'{retired_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), series] for (name, labels), series in histograms.items()],
+        }, f)
+    os.replace(tmp_path, retired_path)
+    os.remove(path)
+
+
+def _format_labels(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+
+
+def render_prometheus():
+    """All workers' metrics in Prometheus text exposition format"""
+    registry.flush(force=True)
+    counters, histograms = _merge_snapshots()
+
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+    for name in names:
+        metric_type, help_text = METRIC_HELP.get(name, ('counter', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f'{name}{{{_format_labels(labels)}}} {value}')
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), series):
+                cumulative += count
+                bucket_labels = _format_labels(labels + (('le', bound),))
+                lines.append(f'{name}_bucket{{{bucket_labels}}} {cumulative}')
+            lines.append(f'{name}_sum{{{_format_labels(labels)}}} {series[-2]}')
+            lines.append(f'{name}_count{{{_format_labels(labels)}}} {series[-1]}')
+    return '\n'.join(lines) + '\n'
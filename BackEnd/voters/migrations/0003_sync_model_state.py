@@ -0,0 +1,128 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Model changes that predate the voter event log and were never migrated
+    # (volunteer name, time_voted, dropped volunteer fields). Replaces the
+    # migration first committed under this number, so databases that applied
+    # it keep their history.
+    replaces = [
+        ("voters", "0003_alter_volunteer_unique_together_volunteer_name_and_more"),
+    ]
+
+    dependencies = [
+        ("voters", "0002_alter_volunteer_options_volunteer_volunteer_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="volunteer",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="volunteer",
+            name="name",
+            field=models.CharField(
+                default="",
+                help_text="Volunteer name (English only)",
+                max_length=200,
+                verbose_name="Name",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="voter",
+            name="time_voted",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Timestamp when voter was marked as voted",
+                null=True,
+                verbose_name="Time Voted",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="role",
+            field=models.CharField(
+                choices=[
+                    ("admin", "Admin"),
+                    ("overview", "Overview User"),
+                    ("level1", "Level 1 Volunteer"),
+                    ("level2", "Level 2 Volunteer"),
+                ],
+                default="level2",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="volunteer",
+            name="level",
+            field=models.CharField(
+                choices=[("level1", "Level 1"), ("level2", "Level 2")],
+                help_text="Level 1 = Bottom, Level 2 = Supervisor",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="volunteer",
+            name="parent_volunteer",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Level 2 Volunteer (only for Level 1 volunteers)",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="sub_volunteers",
+                to="voters.volunteer",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="volunteer",
+            name="user",
+            field=models.OneToOneField(
+                help_text="Linked user account for login",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="volunteer_profile",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="volunteer",
+            name="volunteer_id",
+            field=models.IntegerField(
+                help_text="Unique ID to group voters and view stats/dashboard",
+                unique=True,
+                verbose_name="Volunteer ID",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("active", "Active"),
+                    ("out_of_station", "Out of Station"),
+                    ("deceased", "Deceased"),
+                    ("postal_vote", "Postal Vote"),
+                    ("deleted", "Deleted"),
+                ],
+                default="active",
+                max_length=20,
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="volunteer",
+            name="name_en",
+        ),
+        migrations.RemoveField(
+            model_name="volunteer",
+            name="name_ml",
+        ),
+        migrations.RemoveField(
+            model_name="volunteer",
+            name="phone_number",
+        ),
+    ]
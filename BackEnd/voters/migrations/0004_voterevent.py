@@ -0,0 +1,75 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0003_alter_volunteer_unique_together_volunteer_name_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoterEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("api", "API Update"),
+                            ("bulk", "Bulk Update"),
+                            ("admin", "Admin"),
+                            ("command", "Management Command"),
+                        ],
+                        default="api",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "changes",
+                    models.JSONField(help_text="Changed fields as {field: [old, new]}"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="voter_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "voter",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="events",
+                        to="voters.voter",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "voter_events",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["voter", "id"], name="voter_event_voter_i_f5815c_idx"
+                    )
+                ],
+            },
+        ),
+    ]
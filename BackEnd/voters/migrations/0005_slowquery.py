@@ -0,0 +1,66 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0004_voterevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="SHA-1 of the normalized SQL", max_length=40
+                    ),
+                ),
+                (
+                    "view",
+                    models.CharField(
+                        help_text="Calling view and query parameter combination",
+                        max_length=200,
+                    ),
+                ),
+                ("normalized_sql", models.TextField()),
+                (
+                    "sample_sql",
+                    models.TextField(
+                        help_text="Most recent slow instance (with placeholders)"
+                    ),
+                ),
+                ("sample_params", models.JSONField(blank=True, null=True)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("explain_plan", models.TextField(blank=True)),
+                ("explained_at", models.DateTimeField(blank=True, null=True)),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Slow queries",
+                "db_table": "slow_queries",
+                "ordering": ["-total_ms"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="slowquery",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "view"), name="unique_slow_query_per_view"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0005_slowquery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Household",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Normalized house number and house name",
+                        max_length=300,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "house_no",
+                    models.CharField(max_length=50, verbose_name="Old Ward/House No."),
+                ),
+                (
+                    "house_name_en",
+                    models.CharField(
+                        max_length=200, verbose_name="House Name (English)"
+                    ),
+                ),
+                (
+                    "house_name_ml",
+                    models.CharField(
+                        blank=True,
+                        max_length=200,
+                        verbose_name="House Name (Malayalam)",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "households",
+                "ordering": ["house_no", "house_name_en"],
+            },
+        ),
+        migrations.AddField(
+            model_name="voter",
+            name="household",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Derived from house number and house name",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="members",
+                to="voters.household",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["level1_volunteer", "household"],
+                name="voters_level1__2b72bd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["level2_volunteer", "household"],
+                name="voters_level2__e9e1b5_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0006_household"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Ward",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.IntegerField(unique=True, verbose_name="Ward No.")),
+                ("name", models.CharField(blank=True, max_length=200)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "wards",
+                "ordering": ["number"],
+            },
+        ),
+        migrations.AlterField(
+            model_name="volunteer",
+            name="volunteer_id",
+            field=models.IntegerField(
+                help_text="Unique ID (within the ward) to group voters and view stats/dashboard",
+                verbose_name="Volunteer ID",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="household",
+            name="key",
+            field=models.CharField(
+                help_text="Ward, normalized house number and house name",
+                max_length=300,
+                unique=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="sec_id",
+            field=models.CharField(max_length=50, verbose_name="SEC ID No."),
+        ),
+        migrations.AddField(
+            model_name="appsettings",
+            name="ward",
+            field=models.OneToOneField(
+                blank=True,
+                help_text="Leave empty for the panchayat-wide defaults",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="app_settings",
+                to="voters.ward",
+            ),
+        ),
+        migrations.AddField(
+            model_name="volunteer",
+            name="ward",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="volunteers",
+                to="voters.ward",
+            ),
+        ),
+        migrations.AddField(
+            model_name="voter",
+            name="ward",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="voters",
+                to="voters.ward",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="volunteer",
+            constraint=models.UniqueConstraint(
+                fields=("ward", "volunteer_id"), name="unique_volunteer_id_per_ward"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="voter",
+            constraint=models.UniqueConstraint(
+                fields=("ward", "sec_id"), name="unique_voter_sec_id_per_ward"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.core.management.color import no_style
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+# The deployment was single-ward until now
+EXISTING_WARD_NUMBER = 14
+
+
+def assign_existing_ward(apps, schema_editor):
+    Ward = apps.get_model('voters', 'Ward')
+    Voter = apps.get_model('voters', 'Voter')
+    Volunteer = apps.get_model('voters', 'Volunteer')
+    Household = apps.get_model('voters', 'Household')
+    AppSettings = apps.get_model('voters', 'AppSettings')
+
+    if Voter.objects.exists() or Volunteer.objects.exists():
+        ward, _ = Ward.objects.get_or_create(
+            number=EXISTING_WARD_NUMBER, defaults={'name': f'Ward {EXISTING_WARD_NUMBER}'}
+        )
+        Voter.objects.filter(ward__isnull=True).update(ward=ward)
+        Volunteer.objects.filter(ward__isnull=True).update(ward=ward)
+        # Household keys are now prefixed with the ward id
+        Household.objects.update(key=Substr(Concat(Value(f'{ward.id}|'), 'key'), 1, 300))
+
+    # The singleton settings row was saved with an explicit pk of 1; move the
+    # id sequence past it before per-ward rows are added
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [AppSettings]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0007_ward"),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_existing_ward, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0008_assign_existing_ward"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="volunteer",
+            name="ward",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="volunteers",
+                to="voters.ward",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="ward",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="voters",
+                to="voters.ward",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# PostgreSQL only: rebuild the voters table as PARTITION BY LIST (ward_id)
+# with one partition per ward (see voters/partitions.py). Other databases
+# keep the plain table.
+
+
+def _rebuild_voters(apps, schema_editor, partitioned):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    Voter = apps.get_model('voters', 'Voter')
+    Ward = apps.get_model('voters', 'Ward')
+    quote = schema_editor.quote_name
+    execute = schema_editor.execute
+
+    execute('ALTER TABLE voters RENAME TO voters_old')
+    if partitioned:
+        execute('CREATE TABLE voters (LIKE voters_old INCLUDING DEFAULTS) PARTITION BY LIST (ward_id)')
+        for ward_id in Ward.objects.values_list('id', flat=True):
+            execute(f'CREATE TABLE voters_ward_{ward_id} PARTITION OF voters FOR VALUES IN ({ward_id})')
+    else:
+        execute('CREATE TABLE voters (LIKE voters_old INCLUDING DEFAULTS)')
+    # Copy before indexing; dropping the old table also drops its id
+    # sequence and frees its index and constraint names
+    execute('INSERT INTO voters SELECT * FROM voters_old')
+    execute('DROP TABLE voters_old')
+
+    if partitioned:
+        # Identity columns are not supported on partitioned tables before
+        # PostgreSQL 17; an owned sequence works everywhere
+        execute('CREATE SEQUENCE voters_id_seq OWNED BY voters.id')
+        execute("ALTER TABLE voters ALTER COLUMN id SET DEFAULT nextval('voters_id_seq')")
+        # Unique constraints on a partitioned table must include the partition key
+        execute('ALTER TABLE voters ADD CONSTRAINT voters_pkey PRIMARY KEY (id, ward_id)')
+    else:
+        execute('ALTER TABLE voters ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        execute('ALTER TABLE voters ADD CONSTRAINT voters_pkey PRIMARY KEY (id)')
+    execute(
+        "SELECT setval(pg_get_serial_sequence('voters', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM voters"
+    )
+
+    # Foreign keys and their indexes (ward_id is the partition key, every
+    # partition holds one value)
+    for field in Voter._meta.concrete_fields:
+        if not field.is_relation:
+            continue
+        column = field.column
+        target = field.related_model._meta.db_table
+        execute(
+            f'ALTER TABLE voters ADD CONSTRAINT {quote(f"voters_{column}_fk")} FOREIGN KEY ({quote(column)}) '
+            f'REFERENCES {quote(target)} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        if not (partitioned and column == 'ward_id'):
+            execute(f'CREATE INDEX {quote(f"voters_{column}_idx")} ON voters ({quote(column)})')
+
+    # Meta indexes and constraints keep their migration names
+    for index in Voter._meta.indexes:
+        schema_editor.add_index(Voter, index)
+    for constraint in Voter._meta.constraints:
+        schema_editor.add_constraint(Voter, constraint)
+
+
+def partition_voters(apps, schema_editor):
+    _rebuild_voters(apps, schema_editor, partitioned=True)
+
+
+def unpartition_voters(apps, schema_editor):
+    _rebuild_voters(apps, schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0009_ward_required"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_voters, unpartition_voters),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0010_partition_voters"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="voter",
+            name="voters_sec_id_3a65f5_idx",
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["sec_id"],
+                name="voters_sec_id_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
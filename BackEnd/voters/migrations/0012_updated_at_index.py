@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0011_sec_id_prefix_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["updated_at"], name="voters_updated_at_idx"),
+        ),
+    ]
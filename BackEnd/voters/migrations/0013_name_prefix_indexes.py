@@ -0,0 +1,52 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:48
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voters", "0012_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name_en", models.TextField()
+                        )
+                    ),
+                    name="text_pattern_ops",
+                ),
+                name="voters_name_en_prefix_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["name_ml"],
+                name="voters_name_ml_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "house_name_en", models.TextField()
+                        )
+                    ),
+                    name="text_pattern_ops",
+                ),
+                name="voters_house_en_prefix_idx",
+            ),
+        ),
+    ]
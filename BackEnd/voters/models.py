@@ -1,6 +1,10 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.db import models, transaction
+from django.db.models.functions import Cast, Upper
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from .cache import ProcessCache
 
 
 class User(AbstractUser):
@@ -22,6 +26,23 @@ class User(AbstractUser):
         return f"{self.username} ({self.get_role_display()})"
 
 
+class Ward(models.Model):
+    """
+    A ward of the panchayat. Voters and volunteers belong to one ward; on
+    PostgreSQL every ward has its own partition of the voters table.
+    """
+    number = models.IntegerField(unique=True, verbose_name="Ward No.")
+    name = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'wards'
+        ordering = ['number']
+    
+    def __str__(self):
+        return self.name or f"Ward {self.number}"
+
+
 class Volunteer(models.Model):
     """
     Volunteer model for Level 1 (bottom) and Level 2 (supervisors) volunteers
@@ -33,10 +54,14 @@ class Volunteer(models.Model):
         ('level2', 'Level 2'),
     ]
     
+    ward = models.ForeignKey(
+        Ward,
+        on_delete=models.PROTECT,
+        related_name='volunteers'
+    )
     volunteer_id = models.IntegerField(
         verbose_name="Volunteer ID",
-        help_text="Unique ID to group voters and view stats/dashboard",
-        unique=True
+        help_text="Unique ID (within the ward) to group voters and view stats/dashboard"
     )
     user = models.OneToOneField(
         User, 
@@ -69,6 +94,9 @@ class Volunteer(models.Model):
     class Meta:
         db_table = 'volunteers'
         ordering = ['level', 'volunteer_id']
+        constraints = [
+            models.UniqueConstraint(fields=['ward', 'volunteer_id'], name='unique_volunteer_id_per_ward'),
+        ]
     
     def __str__(self):
         return f"{self.get_level_display()} - ID {self.volunteer_id}: {self.name}"
@@ -80,6 +108,29 @@ class Volunteer(models.Model):
         super().save(*args, **kwargs)
 
 
+class Household(models.Model):
+    """
+    A house derived from voters' free-text house number and house name.
+    Built and kept up to date by voters.households (not edited by hand).
+    """
+    key = models.CharField(
+        max_length=300,
+        unique=True,
+        help_text="Ward, normalized house number and house name"
+    )
+    house_no = models.CharField(max_length=50, verbose_name="Old Ward/House No.")
+    house_name_en = models.CharField(max_length=200, verbose_name="House Name (English)")
+    house_name_ml = models.CharField(max_length=200, verbose_name="House Name (Malayalam)", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'households'
+        ordering = ['house_no', 'house_name_en']
+    
+    def __str__(self):
+        return f"{self.house_no} {self.house_name_en}".strip()
+
+
 class Voter(models.Model):
     """Voter model based on CSV data structure"""
     STATUS_CHOICES = [
@@ -109,6 +160,12 @@ class Voter(models.Model):
         ('deletion', 'Deletion'),
     ]
     
+    ward = models.ForeignKey(
+        Ward,
+        on_delete=models.PROTECT,
+        related_name='voters'
+    )
+    
     # CSV Fields
     serial_no = models.IntegerField(verbose_name="Serial No.")
     name_en = models.CharField(max_length=200, verbose_name="Name (English)")
@@ -120,8 +177,16 @@ class Voter(models.Model):
     house_name_ml = models.CharField(max_length=200, verbose_name="House Name (Malayalam)", blank=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
     age = models.IntegerField()
-    sec_id = models.CharField(max_length=50, unique=True, verbose_name="SEC ID No.")
+    sec_id = models.CharField(max_length=50, verbose_name="SEC ID No.")
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='existing')
+    household = models.ForeignKey(
+        Household,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='members',
+        help_text="Derived from house number and house name"
+    )
     
     # Additional Tracking Fields
     level1_volunteer = models.ForeignKey(
@@ -157,11 +222,30 @@ class Voter(models.Model):
         db_table = 'voters'
         ordering = ['serial_no']
         indexes = [
-            models.Index(fields=['sec_id']),
+            # Pattern ops serve both equality and prefix (LIKE 'SEC03%') lookups
+            models.Index(fields=['sec_id'], name='voters_sec_id_prefix_idx', opclasses=['varchar_pattern_ops']),
+            # Admin name search: istartswith compares UPPER(col::text) LIKE 'X%'
+            models.Index(
+                OpClass(Upper(Cast('name_en', models.TextField())), name='text_pattern_ops'),
+                name='voters_name_en_prefix_idx',
+            ),
+            models.Index(fields=['name_ml'], name='voters_name_ml_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(
+                OpClass(Upper(Cast('house_name_en', models.TextField())), name='text_pattern_ops'),
+                name='voters_house_en_prefix_idx',
+            ),
             models.Index(fields=['serial_no']),
             models.Index(fields=['has_voted']),
             models.Index(fields=['party']),
             models.Index(fields=['status']),
+            models.Index(fields=['level1_volunteer', 'household']),
+            models.Index(fields=['level2_volunteer', 'household']),
+            # Delta reads of the per-worker voter store (voters/voter_store.py)
+            models.Index(fields=['updated_at'], name='voters_updated_at_idx'),
+        ]
+        constraints = [
+            # Unique constraints on a partitioned table must include the partition key
+            models.UniqueConstraint(fields=['ward', 'sec_id'], name='unique_voter_sec_id_per_ward'),
         ]
     
     def __str__(self):
@@ -173,8 +257,96 @@ class Voter(models.Model):
         return self.level2_volunteer or self.level1_volunteer
 
 
+class VoterEvent(models.Model):
+    """
+    Append-only change log for voter tracking fields.
+    One row per changed voter per write, with field deltas as {field: [old, new]}.
+    Rows are never updated; the log is ordered by id for delta sync and replay.
+    """
+    SOURCE_CHOICES = [
+        ('api', 'API Update'),
+        ('bulk', 'Bulk Update'),
+        ('admin', 'Admin'),
+        ('command', 'Management Command'),
+    ]
+    
+    # No DB constraint so history survives voter deletion without rewriting rows
+    voter = models.ForeignKey(
+        Voter,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='events'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='voter_events'
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='api')
+    changes = models.JSONField(help_text="Changed fields as {field: [old, new]}")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        db_table = 'voter_events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['voter', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"Voter {self.voter_id}: {', '.join(self.changes)} ({self.get_source_display()})"
+
+
+class SlowQuery(models.Model):
+    """
+    Normalized fingerprint of a slow SQL query per calling view, with
+    aggregate timings and a sampled EXPLAIN (ANALYZE, BUFFERS) plan.
+    Written out-of-band by voters.slow_queries.
+    """
+    fingerprint = models.CharField(max_length=40, help_text="SHA-1 of the normalized SQL")
+    view = models.CharField(max_length=200, help_text="Calling view and query parameter combination")
+    normalized_sql = models.TextField()
+    sample_sql = models.TextField(help_text="Most recent slow instance (with placeholders)")
+    sample_params = models.JSONField(null=True, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    explain_plan = models.TextField(blank=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'slow_queries'
+        ordering = ['-total_ms']
+        constraints = [
+            models.UniqueConstraint(fields=['fingerprint', 'view'], name='unique_slow_query_per_view'),
+        ]
+        verbose_name_plural = 'Slow queries'
+    
+    def __str__(self):
+        return f"{self.view}: {self.count}x, {self.total_ms:.0f} ms total"
+    
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0
+
+
 class AppSettings(models.Model):
-    """Global application settings - Singleton model"""
+    """
+    Application settings: one panchayat-wide row (ward empty) plus optional
+    per-ward rows overriding it
+    """
+    ward = models.OneToOneField(
+        Ward,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='app_settings',
+        help_text="Leave empty for the panchayat-wide defaults"
+    )
     voting_enabled = models.BooleanField(
         default=False,
         verbose_name="Enable Voting",
@@ -189,19 +361,47 @@ class AppSettings(models.Model):
         verbose_name_plural = 'Application Settings'
     
     def __str__(self):
-        return f"App Settings (Voting: {'Enabled' if self.voting_enabled else 'Disabled'})"
+        scope = self.ward or 'All wards'
+        return f"App Settings - {scope} (Voting: {'Enabled' if self.voting_enabled else 'Disabled'})"
     
-    def save(self, *args, **kwargs):
-        # Ensure only one instance exists
-        self.pk = 1
+    def save(self, *args, invalidate=True, **kwargs):
+        # Ensure only one panchayat-wide instance exists
+        if self.pk is None and self.ward_id is None:
+            self.pk = AppSettings.objects.filter(ward__isnull=True).values_list('pk', flat=True).first()
         super().save(*args, **kwargs)
+        # Other workers pick up the change on their next check (within the TTL)
+        if invalidate:
+            transaction.on_commit(self.invalidate_cache)
     
     def delete(self, *args, **kwargs):
-        # Prevent deletion
-        pass
+        # Prevent deletion of the defaults; ward overrides can be removed
+        if self.ward_id is not None:
+            super().delete(*args, **kwargs)
+            transaction.on_commit(self.invalidate_cache)
+    
+    @classmethod
+    def load(cls, ward=None):
+        """Settings for a ward (None = panchayat-wide), cached per process"""
+        rows = _app_settings_cache.get(cls._load_from_db)
+        return rows.get(getattr(ward, 'pk', ward)) or rows[None]
     
     @classmethod
-    def load(cls):
-        """Load or create the singleton settings instance"""
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+    def invalidate_cache(cls):
+        """Drop the cached settings in every worker"""
+        _app_settings_cache.invalidate()
+    
+    @classmethod
+    def _load_from_db(cls):
+        """{ward id (None = panchayat-wide): settings} in one query"""
+        rows = {obj.ward_id: obj for obj in cls.objects.all()}
+        if None not in rows:
+            # Only the first start writes the defaults; this runs inside a
+            # cache load, which must not invalidate the cache it is filling
+            rows[None] = cls(ward=None)
+            rows[None].save(invalidate=False)
+        return rows
+
+
+# Voting-enabled checks are served from process memory, revalidated against
+# the shared cache at most once per APP_SETTINGS_CACHE_TTL seconds
+_app_settings_cache = ProcessCache('app_settings', settings.APP_SETTINGS_CACHE_TTL)
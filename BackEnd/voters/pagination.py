@@ -0,0 +1,69 @@
+"""
+Pagination helpers for the large voters table.
+
+Counting every row of an unfiltered 200k-row table is a full scan on
+PostgreSQL. EstimatedCountPaginator answers those counts from the planner
+statistics in pg_class instead (kept current by autovacuum's ANALYZE);
+filtered lists, which the indexes narrow down, are still counted exactly.
+
+VoterCursorPagination pages by keyset (WHERE serial_no > last seen) rather
+than OFFSET, so the hundredth page of a thara's voters costs the same as the
+first and no COUNT is run at all.
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+# Below this many rows an exact count is cheap enough, and small tables are
+# the ones most likely to have stale statistics
+ESTIMATE_MIN_ROWS = 10000
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Planner estimate of a table's rows (summed over its partitions), or None
+    when there is no usable estimate (other databases, never analyzed).
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        # Partitions that were never analyzed report -1; empty ones (no
+        # pages) count as 0 rows, any other unknown voids the estimate
+        cursor.execute(
+            """
+            SELECT SUM(GREATEST(c.reltuples, 0)), bool_or(c.reltuples < 0 AND c.relpages > 0)
+            FROM pg_class c
+            WHERE c.relkind = 'r'
+              AND (c.oid = to_regclass(%s)
+                   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s)))
+            """,
+            [table, table]
+        )
+        total, unknown = cursor.fetchone()
+    if total is None or unknown:
+        return None
+    return int(total)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using estimated_row_count() for unfiltered querysets of large tables"""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.has_filters():
+            estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+                return estimate
+        return super().count
+
+
+class VoterCursorPagination(CursorPagination):
+    """Keyset pagination of voters in serial number order ({next, previous, results})"""
+    ordering = ('serial_no', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
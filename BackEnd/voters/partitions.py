@@ -0,0 +1,63 @@
+"""
+PostgreSQL partitioning of the voters table by ward.
+
+Migration 0010_partition_voters rebuilds `voters` as a table PARTITION BY
+LIST (ward_id) with one partition per ward (voters_ward_<ward id>), after
+0008 has assigned existing voters to a ward; the primary key becomes
+(id, ward_id) because PostgreSQL requires the partition key in every unique
+constraint. Queries filtering on ward_id are pruned to one partition and
+indexes are per partition, so a ward's lookups, counts and dashboard
+aggregates do not grow with the rest of the panchayat.
+
+A ward's partition is created when the ward is (voters.signals) and dropped
+when it is deleted. On other databases the voters table stays a plain table
+and these helpers do nothing.
+
+Indexes added by later migrations are created on every partition; they
+cannot use CREATE INDEX CONCURRENTLY on the partitioned parent.
+"""
+from django.db import connection
+from .models import Voter, Ward
+
+
+def partition_name(ward_id):
+    return f'{Voter._meta.db_table}_ward_{int(ward_id)}'
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)',
+            [Voter._meta.db_table]
+        )
+        return cursor.fetchone() is not None
+
+
+def create_partition(ward_id):
+    """Create the voters partition for a ward if it does not exist yet"""
+    if not is_partitioned():
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote(partition_name(ward_id))} '
+            f'PARTITION OF {quote(Voter._meta.db_table)} FOR VALUES IN ({int(ward_id)})'
+        )
+
+
+def drop_partition(ward_id):
+    """Drop a deleted ward's (empty) voters partition"""
+    if not is_partitioned():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(partition_name(ward_id))}')
+
+
+def ensure_partitions():
+    """Create any missing partitions (e.g. after wards were restored with raw SQL)"""
+    if not is_partitioned():
+        return
+    for ward_id in Ward.objects.values_list('id', flat=True):
+        create_partition(ward_id)
@@ -0,0 +1,174 @@
+"""
+Turnout projection per Level 2 thara and ward-wide.
+
+All non-deleted voters are loaded in one values_list query into NumPy arrays.
+Timed marks are binned into BIN_MINUTES slots since the poll opened and the
+cumulative curve of every bucket (each thara plus the whole ward, for all
+voters and for LDF supporters) is fitted at once with a weighted least
+squares line. Recent bins weigh more (half-life HALF_LIFE_MINUTES), so the
+slope is the current voting rate. The final figure is the current count plus
+that rate until the poll closes, capped at the voters who can still vote.
+
+The fitted parameters depend only on the data, so they are cached by voter
+data version and recomputed only after new writes; projecting them to the
+current time is arithmetic on the cached values.
+"""
+from django.conf import settings
+from django.utils import timezone
+from .filters import scope_voters_for_ward
+from .models import Volunteer, Voter
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BIN_MINUTES = 10
+HALF_LIFE_MINUTES = 60
+
+# Voters who cannot turn up at the booth any more
+UNREACHABLE_STATUSES = ['deceased', 'out_of_station']
+
+
+def poll_window(now=None):
+    """(opens, closes) as aware datetimes on the local date of now"""
+    now = timezone.localtime(now or timezone.now())
+    times = []
+    for value in (settings.POLL_OPENS_AT, settings.POLL_CLOSES_AT):
+        hour, minute = (int(part) for part in value.split(':'))
+        times.append(now.replace(hour=hour, minute=minute, second=0, microsecond=0))
+    return tuple(times)
+
+
+def _weighted_slopes(cumulative, x):
+    """Weighted least squares slope of each row of cumulative against x"""
+    weights = 0.5 ** ((x[-1] - x) / HALF_LIFE_MINUTES)
+    x_mean = (weights * x).sum() / weights.sum()
+    y_mean = (cumulative * weights).sum(axis=1) / weights.sum()
+    dx = x - x_mean
+    denominator = (weights * dx * dx).sum()
+    if denominator <= 0:
+        # A single point: average rate since the poll opened
+        return cumulative[:, -1] / x[-1]
+    slopes = ((cumulative - y_mean[:, None]) * (weights * dx)).sum(axis=1) / denominator
+    return np.maximum(slopes, 0.0)
+
+
+def fit_buckets(level2_ids, is_ldf, reachable, has_voted, minutes, elapsed):
+    """
+    Fitted parameters for every bucket: row i of the result arrays is the
+    bucket of bucket_ids[i]; the last row is the whole ward.
+    """
+    bucket_ids, buckets = np.unique(level2_ids, return_inverse=True)
+    bucket_count = len(bucket_ids) + 1
+    ward = np.full(len(buckets), bucket_count - 1)
+
+    def per_bucket(mask):
+        counts = np.bincount(buckets[mask], minlength=bucket_count - 1)
+        return np.append(counts, mask.sum())
+
+    params = {
+        'total': per_bucket(np.ones(len(buckets), dtype=bool)),
+        'voted': per_bucket(has_voted),
+        'not_voted_reachable': per_bucket(~has_voted & reachable),
+        'ldf_total': per_bucket(is_ldf),
+        'ldf_voted': per_bucket(has_voted & is_ldf),
+        'ldf_not_voted_reachable': per_bucket(~has_voted & reachable & is_ldf),
+    }
+
+    bin_count = int(np.ceil(elapsed / BIN_MINUTES)) if elapsed > 0 else 0
+    if bin_count == 0:
+        params['rate'] = np.zeros(bucket_count)
+        params['ldf_rate'] = np.zeros(bucket_count)
+        return bucket_ids, params
+
+    timed = has_voted & ~np.isnan(minutes) & (minutes >= 0) & (minutes < elapsed)
+    bins = (minutes[timed] // BIN_MINUTES).astype(np.int64)
+    # Bin ends, with the current (partial) bin ending now
+    x = (np.arange(bin_count) + 1.0) * BIN_MINUTES
+    x[-1] = elapsed
+
+    for prefix, mask in (('', timed), ('ldf_', timed & is_ldf)):
+        selected = mask[timed]
+        flat = np.concatenate([
+            buckets[mask] * bin_count + bins[selected],
+            ward[mask] * bin_count + bins[selected],
+        ])
+        counts = np.bincount(flat, minlength=bucket_count * bin_count).reshape(bucket_count, bin_count)
+        params[f'{prefix}rate'] = _weighted_slopes(np.cumsum(counts, axis=1).astype(float), x)
+    return bucket_ids, params
+
+
+def fit_projection(now=None, ward=None):
+    """Fitted parameters per Level 2 volunteer and for a ward (None = all wards; cacheable)"""
+    now = now or timezone.now()
+    opens, closes = poll_window(now)
+    elapsed = (min(now, closes) - opens).total_seconds() / 60
+
+    rows = list(
+        scope_voters_for_ward(Voter.objects.exclude(status='deleted'), ward).order_by()
+        .values_list('level2_volunteer_id', 'party', 'status', 'has_voted', 'time_voted')
+    )
+    level2_ids = np.array([row[0] or 0 for row in rows], dtype=np.int64)
+    is_ldf = np.array([row[1] == 'ldf' for row in rows], dtype=bool)
+    reachable = np.array([row[2] not in UNREACHABLE_STATUSES for row in rows], dtype=bool)
+    has_voted = np.array([row[3] for row in rows], dtype=bool)
+    minutes = np.array(
+        [(row[4] - opens).total_seconds() / 60 if row[4] else np.nan for row in rows],
+        dtype=float
+    )
+
+    bucket_ids, params = fit_buckets(level2_ids, is_ldf, reachable, has_voted, minutes, elapsed)
+
+    def bucket(index):
+        return {key: float(values[index]) if key.endswith('rate') else int(values[index])
+                for key, values in params.items()}
+
+    level2_volunteers = Volunteer.objects.filter(level='level2')
+    if ward is not None:
+        level2_volunteers = level2_volunteers.filter(ward=ward)
+    names = dict(level2_volunteers.values_list('id', 'name'))
+    return {
+        'fitted_at': now.isoformat(),
+        'ward': bucket(len(bucket_ids)),
+        'level2_volunteers': [
+            dict(bucket(index), id=int(volunteer_id), name=names.get(int(volunteer_id), ''))
+            for index, volunteer_id in enumerate(bucket_ids) if volunteer_id
+        ],
+    }
+
+
+def _project(bucket, minutes_left):
+    """Projected final figures for one bucket of fitted parameters"""
+    result = {}
+    for prefix in ('', 'ldf_'):
+        total = bucket[f'{prefix}total']
+        voted = bucket[f'{prefix}voted']
+        rate = bucket[f'{prefix}rate']
+        projected = voted + min(rate * minutes_left, bucket[f'{prefix}not_voted_reachable'])
+        result.update({
+            f'{prefix}total': total,
+            f'{prefix}voted': voted,
+            f'{prefix}voting_percentage': round(voted / total * 100, 2) if total else 0,
+            f'{prefix}rate_per_hour': round(rate * 60, 1),
+            f'{prefix}projected_voted': int(round(projected)),
+            f'{prefix}projected_percentage': round(projected / total * 100, 2) if total else 0,
+        })
+    return result
+
+
+def project(fitted, now=None):
+    """Project fitted parameters to poll close as of now"""
+    now = now or timezone.now()
+    opens, closes = poll_window(now)
+    minutes_left = max(0.0, (closes - max(now, opens)).total_seconds() / 60)
+    return {
+        'fitted_at': fitted['fitted_at'],
+        'poll_opens': opens.isoformat(),
+        'poll_closes': closes.isoformat(),
+        'minutes_left': round(minutes_left),
+        'ward': _project(fitted['ward'], minutes_left),
+        'level2_volunteers': [
+            dict(_project(bucket, minutes_left), id=bucket['id'], name=bucket['name'])
+            for bucket in fitted['level2_volunteers']
+        ],
+    }
@@ -0,0 +1,176 @@
+"""
+Read-replica routing.
+
+When a 'replica' database is configured, views wrapped with
+read_from_replica (dashboards, lists, the volunteer tree, exports) send
+their ORM reads to it; everything else, and every write, uses 'default'.
+
+Read-your-writes: ReplicaStickinessMiddleware pins a user to the primary for
+DATABASE_REPLICA_STICKY_SECONDS after any successful write request they
+make, so a volunteer who just marked a voter never reads a replica that has
+not caught up yet. Reads inside a transaction on the primary also stay on it.
+
+Shared caches keyed by a data version (cache.cached_by_version) are built
+on the replica too, except within the same window after the version bump:
+a replica that has not applied the write behind the bump would otherwise be
+cached, stale, under the new version for every user.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Database alias for reads in the current request (None = default)
+_read_alias = ContextVar('read_alias', default=None)
+
+
+# Threads running the async views' database work. Each keeps its own
+# persistent connection (CONN_MAX_AGE, CONN_HEALTH_CHECKS), so this bounds
+# the connections an ASGI worker holds.
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='async-db'
+)
+
+
+def db_sync_to_async(func):
+    """
+    sync_to_async on the database thread pool rather than the worker's one
+    shared sync thread, so concurrent async requests query in parallel. No
+    request signal reaches these threads, so each call ends the way a
+    request does: the thread's connections are closed only once obsolete or
+    unusable (CONN_MAX_AGE) and are health-checked again on next use.
+    """
+    def call(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False, executor=_db_executor)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def replica_may_lag(since):
+    """True if a write made at wall-clock time `since` may not be on the replica yet"""
+    return (
+        replica_configured()
+        and time.time() - since < settings.DATABASE_REPLICA_STICKY_SECONDS
+    )
+
+
+def _pin_key(user):
+    return f'replica_pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """Send this user's reads to the primary until the replica has caught up"""
+    cache.set(_pin_key(user), True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def _read_alias_for(request):
+    # Only pure reads; a write request must see the rows it is about to change
+    if not replica_configured() or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and cache.get(_pin_key(user)):
+        return None
+    return REPLICA_DB_ALIAS
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads inside the block to the primary, whatever the view chose"""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_from_replica(view):
+    """Route a view's reads to the replica (sync or async function views)"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            alias = await db_sync_to_async(_read_alias_for)(request)
+            token = _read_alias.set(alias)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(_read_alias_for(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Reads go to the alias chosen by read_from_replica; writes and migrations to default"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaStickinessMiddleware:
+    """Pin users to the primary for a while after each successful write request"""
+    sync_capable = True
+    async_capable = True
+
+    UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _should_pin(self, request, response):
+        user = getattr(request, 'user', None)
+        return (
+            replica_configured()
+            and request.method in self.UNSAFE_METHODS
+            and response.status_code < 400
+            and user is not None and user.is_authenticated
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self._should_pin(request, response):
+            pin_to_primary(request.user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if await db_sync_to_async(self._should_pin)(request, response):
+            await db_sync_to_async(pin_to_primary)(request.user)
+        return response
@@ -1,8 +1,45 @@
 from rest_framework import serializers
-from .models import User, Volunteer, Voter
+from .metrics import serializer_timer
+from .models import User, Ward, Volunteer, Voter, VoterEvent
+from .wards import get_ward
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Adds this serializer's time to the request's serializer metrics"""
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class CurrentWardDefault:
+    """
+    Default ward for new voters and volunteers: the requesting volunteer's
+    ward, else the only ward of a single-ward deployment
+    """
+    requires_context = True
+
+    def __call__(self, serializer_field):
+        request = serializer_field.context.get('request')
+        volunteer = getattr(getattr(request, 'user', None), 'volunteer_profile', None)
+        if volunteer is not None:
+            return volunteer.ward
+        ward = get_ward()
+        if ward is None:
+            raise serializers.ValidationError('A ward is required.')
+        return ward
+
+
+def validate_same_ward(attrs, instance):
+    """Volunteers can only be given voters of their own ward"""
+    ward = attrs.get('ward') or getattr(instance, 'ward', None)
+    for field in ('level1_volunteer', 'level2_volunteer', 'parent_volunteer'):
+        volunteer = attrs.get(field)
+        if volunteer is not None and ward is not None and volunteer.ward_id != ward.id:
+            raise serializers.ValidationError({field: 'Volunteer belongs to a different ward.'})
+    return attrs
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
         model = User
@@ -10,8 +47,9 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class VolunteerSerializer(serializers.ModelSerializer):
+class VolunteerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Volunteer model"""
+    ward = serializers.PrimaryKeyRelatedField(queryset=Ward.objects.all(), default=CurrentWardDefault())
     user_username = serializers.CharField(source='user.username', read_only=True)
     parent_volunteer_name = serializers.CharField(source='parent_volunteer.name', read_only=True)
     voter_count = serializers.SerializerMethodField()
@@ -19,12 +57,15 @@ class VolunteerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Volunteer
         fields = [
-            'id', 'volunteer_id', 'name', 'level',
+            'id', 'ward', 'volunteer_id', 'name', 'level',
             'parent_volunteer', 'parent_volunteer_name', 'user', 'user_username',
             'is_active', 'voter_count', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    def validate(self, attrs):
+        return validate_same_ward(attrs, self.instance)
+    
     def get_voter_count(self, obj):
         """Get count of voters assigned to this volunteer"""
         if obj.level == 'level1':
@@ -33,23 +74,27 @@ class VolunteerSerializer(serializers.ModelSerializer):
             return obj.level2_voters.count()
 
 
-class VoterListSerializer(serializers.ModelSerializer):
+class VoterListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Lightweight serializer for voter lists"""
+    ward = serializers.PrimaryKeyRelatedField(queryset=Ward.objects.all(), default=CurrentWardDefault())
     level1_volunteer_name = serializers.CharField(source='level1_volunteer.name', read_only=True)
     level2_volunteer_name = serializers.CharField(source='level2_volunteer.name', read_only=True)
     
     class Meta:
         model = Voter
         fields = [
-            'id', 'serial_no', 'name_en', 'name_ml', 'age', 'gender',
+            'id', 'ward', 'serial_no', 'name_en', 'name_ml', 'age', 'gender',
             'house_name_en', 'house_name_ml', 'sec_id',
             'level1_volunteer', 'level1_volunteer_name',
             'level2_volunteer', 'level2_volunteer_name',
             'status', 'party', 'has_voted', 'time_voted', 'phone_number'
         ]
+    
+    def validate(self, attrs):
+        return validate_same_ward(attrs, self.instance)
 
 
-class VoterDetailSerializer(serializers.ModelSerializer):
+class VoterDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Detailed serializer for individual voter"""
     level1_volunteer_name = serializers.CharField(source='level1_volunteer.name', read_only=True)
     level2_volunteer_name = serializers.CharField(source='level2_volunteer.name', read_only=True)
@@ -57,7 +102,7 @@ class VoterDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Voter
         fields = [
-            'id', 'serial_no', 'sec_id', 'category',
+            'id', 'ward', 'serial_no', 'sec_id', 'category',
             'name_en', 'name_ml',
             'guardian_name_en', 'guardian_name_ml',
             'house_name_en', 'house_name_ml',
@@ -67,18 +112,30 @@ class VoterDetailSerializer(serializers.ModelSerializer):
             'status', 'party', 'has_voted', 'time_voted', 'phone_number',
             'notes', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'serial_no', 'sec_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'ward', 'serial_no', 'sec_id', 'created_at', 'updated_at']
 
 
-class VoterUpdateSerializer(serializers.ModelSerializer):
+class VoterUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for updating voter tracking fields"""
     class Meta:
         model = Voter
         fields = ['status', 'party', 'has_voted', 'time_voted', 'phone_number', 'notes', 
                   'level1_volunteer', 'level2_volunteer']
+    
+    def validate(self, attrs):
+        return validate_same_ward(attrs, self.instance)
+
+
+class VoterEventSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for voter change log entries (delta sync)"""
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+    
+    class Meta:
+        model = VoterEvent
+        fields = ['id', 'voter', 'user', 'username', 'source', 'changes', 'created_at']
 
 
-class DashboardStatsSerializer(serializers.Serializer):
+class DashboardStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for dashboard statistics"""
     total_voters = serializers.IntegerField()
     voted_count = serializers.IntegerField()
@@ -102,7 +159,7 @@ class DashboardStatsSerializer(serializers.Serializer):
     level2_volunteer_stats = serializers.ListField()
 
 
-class VolunteerStatsSerializer(serializers.Serializer):
+class VolunteerStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for volunteer-specific statistics"""
     volunteer_id = serializers.IntegerField()
     volunteer_name = serializers.CharField()
@@ -0,0 +1,43 @@
+"""
+Signal handlers keeping derived voter caches in sync with writes made
+through model save()/delete(). Queryset .update() and bulk operations do not
+send signals; those code paths call invalidate_voter_data() themselves.
+
+Knock lists are patched from the voter event log instead, so that marking a
+voter does not throw away every volunteer's list. Volunteer stats are
+invalidated per volunteer, from both saves and the event log.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import events as voter_events, knock_list, lookups, partitions, volunteer_stats, wards
+from .cache import invalidate_voter_data
+from .models import Volunteer, Voter, Ward
+
+
+@receiver([post_save, post_delete], sender=Voter)
+@receiver([post_save, post_delete], sender=Volunteer)
+def voter_data_changed(sender, instance, **kwargs):
+    invalidate_voter_data(instance.ward_id)
+    if sender is Voter:
+        volunteer_stats.invalidate([instance.level1_volunteer_id, instance.level2_volunteer_id])
+    else:
+        volunteer_stats.invalidate([instance.id])
+        transaction.on_commit(lookups.invalidate_volunteers)
+
+
+@receiver(post_save, sender=Ward)
+def ward_saved(sender, instance, created, **kwargs):
+    if created:
+        partitions.create_partition(instance.id)
+    transaction.on_commit(wards.invalidate_cache)
+
+
+@receiver(post_delete, sender=Ward)
+def ward_deleted(sender, instance, **kwargs):
+    partitions.drop_partition(instance.id)
+    transaction.on_commit(wards.invalidate_cache)
+
+
+voter_events.subscribe(knock_list.apply_events)
+voter_events.subscribe(volunteer_stats.apply_events)
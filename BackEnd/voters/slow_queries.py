@@ -0,0 +1,219 @@
+"""
+Slow query capture.
+
+SlowQueryMiddleware times every query of a request, on any database alias
+and in any thread, through an execute wrapper on every connection (see
+metrics.install_query_hook). Queries slower than settings.SLOW_QUERY_THRESHOLD_MS
+are logged with their calling view (e.g. "VoterViewSet.list?has_voted,party")
+and handed to a background thread, which upserts a SlowQuery row per
+normalized fingerprint and view and, for SELECTs on Postgres, samples an
+EXPLAIN (ANALYZE, BUFFERS) plan, on the alias that ran the query, at most
+once per SLOW_QUERY_EXPLAIN_INTERVAL.
+Nothing beyond the timing runs on the request path.
+
+List the worst offenders with `python manage.py slow_queries`.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from .filters import VOTER_FILTER_PARAMS
+from .metrics import install_query_hook, registry
+from .wards import WARD_PARAM
+
+logger = logging.getLogger(__name__)
+
+_current_request = ContextVar('slow_query_request', default=None)
+_queue = queue.Queue(maxsize=1000)
+_worker = {'thread': None, 'pid': None}
+
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Fingerprintable form of a query: literals and IN lists collapsed"""
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()
+
+
+# Parameters that may appear in a view label; any others are dropped so
+# clients cannot mint unbounded SlowQuery rows and metric label values
+LABEL_PARAMS = frozenset(
+    VOTER_FILTER_PARAMS + (api_settings.SEARCH_PARAM, api_settings.ORDERING_PARAM, WARD_PARAM)
+)
+
+
+def view_label(request):
+    """Calling view, e.g. 'dashboard_stats' or 'VoterViewSet.list?has_voted,party'"""
+    if request is None:
+        return 'background'
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    func = match.func
+    cls = getattr(func, 'cls', None)
+    actions = getattr(func, 'actions', None)
+    if cls is not None and actions:
+        label = f'{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}'
+    elif cls is not None:
+        label = cls.__name__
+    else:
+        label = getattr(func, '__name__', match.view_name)
+    # Filter combination (known parameter names only, values vary)
+    params = sorted(key for key, value in request.GET.items() if value and key in LABEL_PARAMS)
+    if params:
+        label = f"{label}?{','.join(params)}"
+    return label[:200]
+
+
+def _jsonable_params(params):
+    try:
+        return json.loads(json.dumps(params, default=str))
+    except (TypeError, ValueError):
+        return None
+
+
+def _slow_query_wrapper(execute, sql, params, many, context):
+    request = _current_request.get()
+    if request is None:
+        # Outside a request (commands, the writer thread's own queries)
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS and not many:
+            _capture(request, sql, params, elapsed_ms, context['connection'].alias)
+
+
+def _capture(request, sql, params, elapsed_ms, alias):
+    view = view_label(request)
+    logger.warning('Slow query (%.1f ms) in %s: %s', elapsed_ms, view, sql[:500])
+    registry.inc('slow_queries_total', {'view': view})
+    _ensure_worker()
+    try:
+        _queue.put_nowait((sql, params, view, elapsed_ms, alias))
+    except queue.Full:
+        # Never block a request on the capture pipeline
+        pass
+
+
+def _ensure_worker():
+    """Start the background writer lazily (and again after a fork)"""
+    pid = os.getpid()
+    if _worker['pid'] == pid and _worker['thread'] is not None and _worker['thread'].is_alive():
+        return
+    thread = threading.Thread(target=_run_worker, name='slow-query-writer', daemon=True)
+    _worker['thread'] = thread
+    _worker['pid'] = pid
+    thread.start()
+
+
+def _run_worker():
+    while True:
+        item = _queue.get()
+        try:
+            close_old_connections()
+            store(*item)
+        except Exception:
+            logger.exception('Failed to store slow query')
+        finally:
+            _queue.task_done()
+
+
+def store(sql, params, view, elapsed_ms, alias='default'):
+    """Upsert the fingerprint row and sample an EXPLAIN plan if one is due"""
+    from .models import SlowQuery
+
+    normalized = normalize_sql(sql)
+    key = fingerprint(normalized)
+    sample_params = _jsonable_params(params)
+    slow_query, created = SlowQuery.objects.get_or_create(
+        fingerprint=key, view=view,
+        defaults={'normalized_sql': normalized, 'sample_sql': sql, 'sample_params': sample_params},
+    )
+    SlowQuery.objects.filter(pk=slow_query.pk).update(
+        count=F('count') + 1,
+        total_ms=F('total_ms') + elapsed_ms,
+        max_ms=Greatest(F('max_ms'), elapsed_ms),
+        sample_sql=sql,
+        sample_params=sample_params,
+        last_seen=timezone.now(),
+    )
+
+    explain_due = (
+        slow_query.explained_at is None
+        or timezone.now() - slow_query.explained_at > timedelta(seconds=settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+    )
+    if explain_due and sql.lstrip().upper().startswith('SELECT'):
+        plan = explain(sql, params, alias)
+        if plan:
+            SlowQuery.objects.filter(pk=slow_query.pk).update(explain_plan=plan, explained_at=timezone.now())
+
+
+def explain(sql, params, alias='default'):
+    """EXPLAIN (ANALYZE, BUFFERS) a SELECT in a rolled-back transaction (Postgres only)"""
+    from django.db import connections
+
+    explain_connection = connections[alias]
+    if explain_connection.vendor != 'postgresql':
+        return ''
+    with transaction.atomic(using=alias):
+        with explain_connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s', [settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS])
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        transaction.set_rollback(True, using=alias)
+    return plan
+
+
+class SlowQueryMiddleware:
+    """Time every query of the request and capture the slow ones"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_query_hook(_slow_query_wrapper)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
@@ -0,0 +1,288 @@
+"""
+Columnar binary snapshots of the ward database (dump_snapshot / load_snapshot).
+
+File layout:
+
+    b'VTSNAP01' | uint64 header length | JSON header | column buffers
+
+Every column is stored as NumPy buffers (int64 values, uint8 booleans and
+null masks, UTF-8 string data with int64 offsets, datetimes as int64
+microseconds since the epoch), each zlib-compressed on its own. The header
+lists the tables, their columns and buffer positions, and a SHA-256 checksum
+per table computed over the uncompressed buffers. load_snapshot checks the
+file against those checksums, restores with COPY on PostgreSQL (batched
+INSERTs elsewhere) and re-encodes the restored tables from the database to
+verify the round trip.
+"""
+import datetime
+import hashlib
+import io
+import json
+import struct
+import zlib
+from django.core.management.color import no_style
+from django.db import connection
+from . import partitions
+from .models import AppSettings, Household, User, Volunteer, Voter, Ward
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b'VTSNAP01'
+FORMAT_VERSION = 1
+
+# Restore order (referenced tables first)
+SNAPSHOT_MODELS = [User, Ward, Household, Volunteer, Voter, AppSettings]
+
+INSERT_BATCH_SIZE = 1000
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+_COLUMN_TYPES = {
+    'AutoField': 'int', 'BigAutoField': 'int', 'IntegerField': 'int',
+    'BigIntegerField': 'int', 'PositiveIntegerField': 'int', 'SmallIntegerField': 'int',
+    'ForeignKey': 'int', 'OneToOneField': 'int',
+    'BooleanField': 'bool',
+    'CharField': 'str', 'TextField': 'str', 'EmailField': 'str',
+    'DateTimeField': 'datetime',
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def model_columns(model):
+    """[(attname, column, type)] for a model's concrete fields"""
+    columns = []
+    for field in model._meta.concrete_fields:
+        kind = _COLUMN_TYPES.get(field.get_internal_type())
+        if kind is None:
+            raise SnapshotError(f'{model.__name__}.{field.name}: unsupported field type {field.get_internal_type()}')
+        columns.append((field.attname, field.column, kind))
+    return columns
+
+
+def encode_column(kind, values):
+    """{buffer name: ndarray} for a column of Python values"""
+    mask = np.fromiter((value is None for value in values), dtype=np.uint8, count=len(values))
+    buffers = {'mask': mask}
+    if kind == 'int':
+        buffers['values'] = np.fromiter((value or 0 for value in values), dtype=np.int64, count=len(values))
+    elif kind == 'bool':
+        buffers['values'] = np.fromiter((bool(value) for value in values), dtype=np.uint8, count=len(values))
+    elif kind == 'datetime':
+        # Integer arithmetic keeps microseconds exact
+        buffers['values'] = np.fromiter(
+            ((value - _EPOCH) // datetime.timedelta(microseconds=1) if value is not None else 0 for value in values),
+            dtype=np.int64, count=len(values)
+        )
+    else:
+        encoded = [(value or '').encode('utf-8') for value in values]
+        buffers['offsets'] = np.concatenate((
+            np.zeros(1, dtype=np.int64),
+            np.cumsum(np.fromiter((len(item) for item in encoded), dtype=np.int64, count=len(encoded))),
+        ))
+        buffers['data'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return buffers
+
+
+def decode_column(kind, buffers, rows):
+    """Python values for a column from its buffers"""
+    mask = buffers['mask'].astype(bool).tolist()
+    if kind == 'str':
+        offsets = buffers['offsets'].tolist()
+        data = buffers['data'].tobytes()
+        values = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+    elif kind == 'bool':
+        values = buffers['values'].astype(bool).tolist()
+    elif kind == 'datetime':
+        values = [_EPOCH + datetime.timedelta(microseconds=value) for value in buffers['values'].tolist()]
+    else:
+        values = buffers['values'].tolist()
+    return [None if is_null else value for value, is_null in zip(values, mask)]
+
+
+def _buffer_order(kind):
+    return ['mask', 'offsets', 'data'] if kind == 'str' else ['mask', 'values']
+
+
+def read_table(model):
+    """(row count, {attname: buffers}, checksum) for a model's table"""
+    columns = model_columns(model)
+    rows = list(
+        model._base_manager.order_by('pk')
+        .values_list(*[attname for attname, _, _ in columns])
+        .iterator(chunk_size=10000)
+    )
+    digest = hashlib.sha256()
+    encoded = {}
+    for index, (attname, _, kind) in enumerate(columns):
+        buffers = encode_column(kind, [row[index] for row in rows])
+        for name in _buffer_order(kind):
+            digest.update(buffers[name].tobytes())
+        encoded[attname] = buffers
+    return len(rows), encoded, digest.hexdigest()
+
+
+def dump(path):
+    """Write a snapshot of SNAPSHOT_MODELS to path; returns the header"""
+    header = {'format': FORMAT_VERSION, 'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(), 'tables': []}
+    blocks = []
+    offset = 0
+    for model in SNAPSHOT_MODELS:
+        rows, encoded, checksum = read_table(model)
+        table = {'model': model._meta.label, 'table': model._meta.db_table, 'rows': rows, 'checksum': checksum, 'columns': []}
+        for attname, column, kind in model_columns(model):
+            entry = {'attname': attname, 'column': column, 'type': kind, 'buffers': []}
+            for name in _buffer_order(kind):
+                array = encoded[attname][name]
+                compressed = zlib.compress(array.tobytes(), 1)
+                entry['buffers'].append({
+                    'name': name, 'dtype': array.dtype.str, 'offset': offset, 'length': len(compressed),
+                })
+                blocks.append(compressed)
+                offset += len(compressed)
+            table['columns'].append(entry)
+        header['tables'].append(table)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    return header
+
+
+def read(path):
+    """(header, {table: {attname: values}}) after checking every table's checksum"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f'{path} is not a voter snapshot')
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length))
+        body = f.read()
+    if header.get('format') != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {header.get('format')}")
+
+    tables = {}
+    for table in header['tables']:
+        digest = hashlib.sha256()
+        columns = {}
+        for column in table['columns']:
+            buffers = {}
+            for buffer in column['buffers']:
+                try:
+                    raw = zlib.decompress(body[buffer['offset']:buffer['offset'] + buffer['length']])
+                except zlib.error:
+                    raise SnapshotError(f"Column {table['table']}.{column['column']} is corrupt")
+                digest.update(raw)
+                buffers[buffer['name']] = np.frombuffer(raw, dtype=np.dtype(buffer['dtype']))
+            columns[column['attname']] = decode_column(column['type'], buffers, table['rows'])
+        if digest.hexdigest() != table['checksum']:
+            raise SnapshotError(f"Checksum mismatch in table {table['table']}: the snapshot file is corrupt")
+        tables[table['table']] = columns
+    return header, tables
+
+
+def dependent_tables():
+    """Tables outside the snapshot whose rows reference snapshot tables (cleared on restore)"""
+    snapshot_tables = {model._meta.db_table for model in SNAPSHOT_MODELS}
+    tables = []
+    for model in SNAPSHOT_MODELS:
+        related = [
+            relation.related_model._meta.db_table for relation in model._meta.related_objects
+            if getattr(relation.field, 'db_constraint', True)
+        ]
+        related += [field.remote_field.through._meta.db_table for field in model._meta.many_to_many]
+        tables += [table for table in related if table not in snapshot_tables and table not in tables]
+    return tables
+
+
+def _copy_text(value):
+    """A value in PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def _clear(tables):
+    quoted = ', '.join(connection.ops.quote_name(table) for table in tables)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'TRUNCATE {quoted}')
+        else:
+            for table in reversed(tables):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(table)}')
+
+
+def _insert(table, columns, rows):
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write('\t'.join(_copy_text(value) for value in row))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {quote(table)} ({column_list}) FROM STDIN', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(columns))
+            sql = f'INSERT INTO {quote(table)} ({column_list}) VALUES ({placeholders})'
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                cursor.executemany(sql, rows[start:start + INSERT_BATCH_SIZE])
+
+
+def restore(header, tables):
+    """
+    Replace the snapshot tables with the snapshot contents. Run inside a
+    transaction. Returns the dependent tables that were cleared.
+    """
+    models = {model._meta.label: model for model in SNAPSHOT_MODELS}
+    for table in header['tables']:
+        model = models.get(table['model'])
+        snapshot_columns = [(c['attname'], c['column'], c['type']) for c in table['columns']]
+        if model is None or snapshot_columns != model_columns(model):
+            raise SnapshotError(
+                f"Table {table['table']} in the snapshot does not match the current schema; "
+                'restore into a database migrated to the same version'
+            )
+
+    cleared = dependent_tables()
+    _clear([table['table'] for table in header['tables']] + cleared)
+    for table in header['tables']:
+        columns = tables[table['table']]
+        attnames = [column['attname'] for column in table['columns']]
+        rows = list(zip(*[columns[attname] for attname in attnames]))
+        _insert(table['table'], [column['column'] for column in table['columns']], rows)
+        if table['model'] == Ward._meta.label:
+            # Restored wards need their voters partitions before the voters go in
+            partitions.ensure_partitions()
+
+    # Continue id sequences after the restored rows
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), SNAPSHOT_MODELS):
+            cursor.execute(sql)
+    return cleared
+
+
+def verify(header):
+    """Table names whose restored contents do not match the snapshot checksums"""
+    models = {model._meta.label: model for model in SNAPSHOT_MODELS}
+    mismatched = []
+    for table in header['tables']:
+        rows, _, checksum = read_table(models[table['model']])
+        if rows != table['rows'] or checksum != table['checksum']:
+            mismatched.append(table['table'])
+    return mismatched
@@ -0,0 +1,17 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Volunteer list filters (VolunteerAutocompleteFilter): reload the
+    // changelist filtered on the picked volunteer, from the first page
+    $(document).on('change', 'select.voters-autocomplete-filter', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('p');
+        if (this.value) {
+            params.set(this.dataset.filterParam, this.value);
+        } else {
+            params.delete(this.dataset.filterParam);
+        }
+        window.location.search = params.toString();
+    });
+}
@@ -0,0 +1,151 @@
+"""
+Grouped voter statistics shared by the dashboard and volunteer endpoints.
+
+Counts are computed with conditional aggregates so a whole breakdown is a
+single query (or a single GROUP BY query for every volunteer at once)
+instead of one COUNT per figure.
+"""
+from django.db.models import Count, Q
+
+
+# Conditional aggregates for one group of voters
+VOTER_COUNT_AGGREGATES = {
+    'total': Count('id'),
+    'voted': Count('id', filter=Q(has_voted=True)),
+    'male_total': Count('id', filter=Q(gender='M')),
+    'female_total': Count('id', filter=Q(gender='F')),
+    'male_voted': Count('id', filter=Q(gender='M', has_voted=True)),
+    'female_voted': Count('id', filter=Q(gender='F', has_voted=True)),
+    'ldf_total': Count('id', filter=Q(party='ldf')),
+    'ldf_voted': Count('id', filter=Q(party='ldf', has_voted=True)),
+    'ldf_male_voted': Count('id', filter=Q(party='ldf', gender='M', has_voted=True)),
+    'ldf_female_voted': Count('id', filter=Q(party='ldf', gender='F', has_voted=True)),
+}
+
+EMPTY_COUNTS = {key: 0 for key in VOTER_COUNT_AGGREGATES}
+
+
+def percentage(part, whole):
+    """Percentage rounded to 2 places, 0 when the whole is empty"""
+    return round((part / whole * 100) if whole > 0 else 0, 2)
+
+
+def grouped_counts_queryset(voters, group_field):
+    """GROUP BY group_field with all count aggregates (default ordering cleared)"""
+    return (
+        voters.order_by()
+        .values(group_field)
+        .annotate(**VOTER_COUNT_AGGREGATES)
+    )
+
+
+def volunteer_stats_row(volunteer, counts):
+    """Dashboard row for a volunteer from its aggregated counts"""
+    counts = counts or EMPTY_COUNTS
+    total = counts['total']
+    voted = counts['voted']
+    return {
+        'id': volunteer.id,
+        'name': volunteer.name,
+        'total_voters': total,
+        'voted_count': voted,
+        'not_voted_count': total - voted,
+        'voting_percentage': percentage(voted, total),
+        'ldf_total': counts['ldf_total'],
+        'ldf_voted': counts['ldf_voted'],
+        'ldf_percentage': percentage(counts['ldf_voted'], counts['ldf_total']),
+        'ldf_male_voted': counts['ldf_male_voted'],
+        'ldf_female_voted': counts['ldf_female_voted'],
+    }
+
+
+def counts_summary(counts):
+    """Totals, voted, LDF and gender figures (with percentages) from aggregated counts"""
+    counts = counts or EMPTY_COUNTS
+    total = counts['total']
+    voted = counts['voted']
+    return {
+        'total_voters': total,
+        'voted_count': voted,
+        'not_voted_count': total - voted,
+        'voting_percentage': percentage(voted, total),
+        'ldf_total': counts['ldf_total'],
+        'ldf_voted': counts['ldf_voted'],
+        'ldf_percentage': percentage(counts['ldf_voted'], counts['ldf_total']),
+        'male_total': counts['male_total'],
+        'female_total': counts['female_total'],
+        'male_voted': counts['male_voted'],
+        'female_voted': counts['female_voted'],
+    }
+
+
+def _add_counts(target, counts):
+    for key in EMPTY_COUNTS:
+        target[key] += counts[key]
+    return target
+
+
+def volunteer_tree(volunteers, voters):
+    """
+    The parent_volunteer hierarchy with voter counts in two queries: one for
+    the volunteers and one GROUP BY (level2_volunteer, level1_volunteer).
+
+    Each node's `stats` covers the voters assigned to it directly; a Level 2
+    node's `rollup` also includes every voter of its Level 1 volunteers,
+    counting each voter once.
+    """
+    volunteers = list(volunteers.order_by('volunteer_id'))
+    rows = list(
+        voters.order_by()
+        .values('level2_volunteer_id', 'level1_volunteer_id')
+        .annotate(**VOTER_COUNT_AGGREGATES)
+    )
+
+    direct = {}
+    rollups = {}
+    ward = dict(EMPTY_COUNTS)
+    parents = {v.id: v.parent_volunteer_id for v in volunteers if v.level == 'level1'}
+    for row in rows:
+        _add_counts(ward, row)
+        level2_id = row['level2_volunteer_id']
+        level1_id = row['level1_volunteer_id']
+        for volunteer_id in (level1_id, level2_id):
+            if volunteer_id is not None:
+                _add_counts(direct.setdefault(volunteer_id, dict(EMPTY_COUNTS)), row)
+        # Roll the group up into its Level 2 and its Level 1's parent (once if both)
+        for supervisor_id in {level2_id, parents.get(level1_id)} - {None}:
+            _add_counts(rollups.setdefault(supervisor_id, dict(EMPTY_COUNTS)), row)
+
+    def node(volunteer):
+        return {
+            'id': volunteer.id,
+            'volunteer_id': volunteer.volunteer_id,
+            'name': volunteer.name,
+            'level': volunteer.level,
+            'is_active': volunteer.is_active,
+            'stats': counts_summary(direct.get(volunteer.id)),
+        }
+
+    level2_nodes = {}
+    unassigned = []
+    for volunteer in volunteers:
+        if volunteer.level == 'level2':
+            level2_nodes[volunteer.id] = dict(
+                node(volunteer),
+                rollup=counts_summary(rollups.get(volunteer.id)),
+                children=[],
+            )
+    for volunteer in volunteers:
+        if volunteer.level != 'level1':
+            continue
+        parent = level2_nodes.get(volunteer.parent_volunteer_id)
+        if parent is not None:
+            parent['children'].append(node(volunteer))
+        else:
+            unassigned.append(node(volunteer))
+
+    return {
+        'ward': counts_summary(ward),
+        'level2_volunteers': list(level2_nodes.values()),
+        'unassigned_level1_volunteers': unassigned,
+    }
@@ -1,3 +1,139 @@
-from django.test import TestCase
+import datetime
+from unittest import skipIf
+from django.test import SimpleTestCase
+from .assignment import partition_households
+from .demographics import DEFAULT_AGE_EDGES, age_bands, parse_age_edges
+from . import projection, snapshot
 
-# Create your tests here.
+np = snapshot.np
+
+
+class PartitionHouseholdsTests(SimpleTestCase):
+    """Level 1 balancing: contiguous runs of households with equal voter counts"""
+
+    def run_sizes(self, households, runs, volunteer_count):
+        sizes = [0] * volunteer_count
+        for (_, size), run in zip(households, runs):
+            sizes[run] += size
+        return sizes
+
+    def test_equal_households_split_evenly(self):
+        households = [(f'h{i}', 2) for i in range(12)]
+        runs = partition_households(households, 3)
+        self.assertEqual(self.run_sizes(households, runs, 3), [8, 8, 8])
+
+    def test_runs_are_contiguous_and_ordered(self):
+        households = [(f'h{i}', size) for i, size in enumerate([3, 1, 4, 1, 5, 9, 2, 6, 5, 3])]
+        runs = partition_households(households, 4)
+        self.assertEqual(runs, sorted(runs))
+        self.assertEqual(set(runs), {0, 1, 2, 3})
+
+    def test_every_run_within_half_a_household_of_its_share(self):
+        households = [(f'h{i}', size) for i, size in enumerate([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8])]
+        volunteer_count = 5
+        runs = partition_households(households, volunteer_count)
+        total = sum(size for _, size in households)
+        largest = max(size for _, size in households)
+        for size in self.run_sizes(households, runs, volunteer_count):
+            self.assertLessEqual(abs(size - total / volunteer_count), largest)
+
+    def test_one_run_per_household_keeps_households_together(self):
+        # Runs are assigned per household, so a household's voters never split
+        households = [('a', 5), ('b', 1), ('c', 1)]
+        runs = partition_households(households, 2)
+        self.assertEqual(len(runs), len(households))
+        self.assertEqual(runs, [0, 1, 1])
+
+    def test_more_volunteers_than_households(self):
+        runs = partition_households([('a', 2), ('b', 2)], 5)
+        self.assertEqual(len(runs), 2)
+        self.assertTrue(all(0 <= run < 5 for run in runs))
+
+    def test_empty_input(self):
+        self.assertEqual(partition_households([], 3), [])
+        self.assertEqual(partition_households([('a', 2)], 0), [])
+
+
+@skipIf(np is None, 'numpy is not installed')
+class SnapshotColumnTests(SimpleTestCase):
+    """encode_column / decode_column round trips"""
+
+    def round_trip(self, kind, values):
+        buffers = snapshot.encode_column(kind, values)
+        return snapshot.decode_column(kind, buffers, len(values))
+
+    def test_strings_keep_null_apart_from_empty(self):
+        values = ['Anil', None, '', 'ശ്രീ', 'a,b"c\n']
+        self.assertEqual(self.round_trip('str', values), values)
+
+    def test_integers_with_nulls(self):
+        values = [0, None, -5, 2 ** 40, 7]
+        self.assertEqual(self.round_trip('int', values), values)
+
+    def test_booleans_with_nulls(self):
+        values = [True, False, None, True]
+        self.assertEqual(self.round_trip('bool', values), values)
+
+    def test_datetimes_keep_microseconds(self):
+        utc = datetime.timezone.utc
+        values = [
+            datetime.datetime(2025, 12, 9, 7, 30, 15, 123456, tzinfo=utc),
+            None,
+            datetime.datetime(1969, 12, 31, 23, 59, 59, 999999, tzinfo=utc),
+            datetime.datetime(2025, 12, 9, 13, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+        ]
+        decoded = self.round_trip('datetime', values)
+        self.assertEqual(decoded, values)
+        self.assertEqual(decoded[0].microsecond, 123456)
+
+    def test_empty_column(self):
+        self.assertEqual(self.round_trip('str', []), [])
+
+
+class AgeBandTests(SimpleTestCase):
+
+    def test_default_edges(self):
+        self.assertEqual(parse_age_edges(''), list(DEFAULT_AGE_EDGES))
+        self.assertEqual(parse_age_edges(None), list(DEFAULT_AGE_EDGES))
+
+    def test_parse_edges(self):
+        self.assertEqual(parse_age_edges('18, 30,45,,60'), [18, 30, 45, 60])
+
+    def test_rejects_bad_edges(self):
+        for value in ['18,abc', '30,18', '18,18', '-1,20', '18,200']:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_age_edges(value)
+
+    def test_bands_cover_every_age(self):
+        bands = age_bands([18, 30, 60])
+        self.assertEqual([band['key'] for band in bands], ['<18', '18-29', '30-59', '60+'])
+        self.assertEqual(bands[0]['min'], None)
+        self.assertEqual(bands[-1]['max'], None)
+        for previous, band in zip(bands, bands[1:]):
+            self.assertEqual(band['min'], previous['max'] + 1)
+
+
+@skipIf(np is None, 'numpy is not installed')
+class WeightedSlopeTests(SimpleTestCase):
+
+    def test_linear_curves_give_their_rate(self):
+        x = np.arange(10, 130, 10, dtype=float)
+        cumulative = np.vstack([2.0 * x, 0.5 * x + 100])
+        np.testing.assert_allclose(projection._weighted_slopes(cumulative, x), [2.0, 0.5])
+
+    def test_recent_bins_weigh_more(self):
+        # Slow start, fast finish: the weighted slope leans to the recent rate
+        x = np.arange(10, 250, 10, dtype=float)
+        cumulative = np.where(x <= 120, x, 120 + 3 * (x - 120))[None, :]
+        slope = projection._weighted_slopes(cumulative, x)[0]
+        self.assertGreater(slope, 2.0)
+        self.assertLess(slope, 3.0)
+
+    def test_single_point_uses_average_rate(self):
+        slopes = projection._weighted_slopes(np.array([[30.0]]), np.array([10.0]))
+        np.testing.assert_allclose(slopes, [3.0])
+
+    def test_slopes_never_negative(self):
+        x = np.arange(10, 70, 10, dtype=float)
+        cumulative = (100 - x)[None, :]
+        self.assertEqual(projection._weighted_slopes(cumulative, x)[0], 0.0)
@@ -0,0 +1,207 @@
+"""
+Token-bucket throttling in the shared cache.
+
+Every throttled endpoint belongs to a scope (settings.THROTTLE_BUCKETS) with
+two buckets: one per user (per client IP when anonymous) and one shared by
+all users of the scope, which caps what the scope as a whole can ask of
+Postgres. A request takes a token from both or is rejected with 429 and a
+Retry-After of the time until both have refilled.
+
+Booth marking ('mark_voted') has the largest budget; dashboards and exports
+have small ones, so a client stuck polling or looping on an expensive
+endpoint is turned away before it can tie up the workers the booths need.
+
+With Redis both buckets are checked and debited by one Lua script, so
+concurrent requests on every worker see a consistent count. Other cache
+backends have no atomic read-modify-write; they fall back to a
+get/set under a per-process lock, which can let a few extra requests
+through when workers race but never rejects too many.
+
+A Redis failure never fails the request: the throttle logs it and lets the
+request through (fails open) until Redis is back.
+"""
+import logging
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache, caches
+from rest_framework.throttling import BaseThrottle
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'throttle'
+
+# KEYS: bucket keys; ARGV: now, then capacity and refill rate (tokens per
+# second) for each key. Takes one token from every bucket if each has one;
+# returns {allowed, seconds to wait, index of the first empty bucket}.
+_TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local states = {}
+local wait = 0
+local empty = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        local needed = (1 - tokens) / rate
+        if needed > wait then
+            wait = needed
+        end
+        if empty == 0 then
+            empty = i
+        end
+    end
+    states[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local tokens = states[i]
+    if empty == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+end
+return {empty == 0 and 1 or 0, tostring(wait), empty}
+"""
+
+_script = None
+_local_lock = threading.Lock()
+
+
+def _buckets(scope, ident):
+    """[(name, key, capacity, tokens per second)] for a scope, None if unthrottled"""
+    budget = settings.THROTTLE_BUCKETS.get(scope)
+    if budget is None:
+        return None
+    buckets = []
+    for name, key in (('user', f'{KEY_PREFIX}:{scope}:user:{ident}'), ('endpoint', f'{KEY_PREFIX}:{scope}:all')):
+        capacity, per_minute = budget[name]
+        buckets.append((name, key, float(capacity), per_minute / 60.0))
+    return buckets
+
+
+def _redis_client():
+    """Raw redis client behind the default cache, or None for other backends"""
+    from django.core.cache.backends.redis import RedisCache
+    backend = caches['default']
+    if not isinstance(backend, RedisCache):
+        return None
+    return backend, backend._cache.get_client(write=True)
+
+
+def _take_redis(backend, client, buckets, now):
+    global _script
+    if _script is None:
+        _script = client.register_script(_TOKEN_BUCKET_LUA)
+    keys = [backend.make_and_validate_key(key) for _, key, _, _ in buckets]
+    args = [repr(now)]
+    for _, _, capacity, rate in buckets:
+        args += [repr(capacity), repr(rate)]
+    allowed, wait, empty = _script(keys=keys, args=args, client=client)
+    return bool(allowed), float(wait), int(empty)
+
+
+def _take_local(buckets, now):
+    with _local_lock:
+        states = cache.get_many([key for _, key, _, _ in buckets])
+        refilled = []
+        wait = 0.0
+        empty = 0
+        for index, (_, key, capacity, rate) in enumerate(buckets, start=1):
+            tokens, ts = states.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+                empty = empty or index
+            refilled.append(tokens)
+        for (_, key, capacity, rate), tokens in zip(buckets, refilled):
+            if not empty:
+                tokens -= 1
+            cache.set(key, (tokens, now), math.ceil(capacity / rate) + 1)
+    return not empty, wait, empty
+
+
+def take_token(scope, ident):
+    """
+    Take a token from the scope's user and endpoint buckets.
+
+    Returns (allowed, seconds until a retry can succeed). Rejections are
+    counted in throttled_requests_total by scope and the bucket that was empty.
+    """
+    global _script
+    if not settings.THROTTLE_ENABLED:
+        return True, 0.0
+    buckets = _buckets(scope, ident)
+    if buckets is None:
+        return True, 0.0
+
+    now = time.time()
+    redis = _redis_client()
+    if redis is not None:
+        from redis.exceptions import RedisError
+        try:
+            allowed, wait, empty = _take_redis(*redis, buckets, now)
+        except RedisError:
+            # Registered again on the next call (e.g. after a Redis restart)
+            _script = None
+            logger.exception('Throttle check failed for scope %s; allowing the request', scope)
+            return True, 0.0
+    else:
+        allowed, wait, empty = _take_local(buckets, now)
+    if not allowed:
+        registry.inc('throttled_requests_total', {'scope': scope, 'bucket': buckets[empty - 1][0]})
+    return allowed, wait
+
+
+def client_ident(request, user=None):
+    """Bucket identity: the user's pk, else the client address (NUM_PROXIES aware)"""
+    user = user if user is not None else getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'u{user.pk}'
+    return f'ip{BaseThrottle().get_ident(request)}'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle over take_token().
+
+    The scope is the class's `scope`, else the view's `throttle_scopes`
+    entry for the current action, else the view's `throttle_scope`. Views
+    without a scope are not throttled.
+    """
+    scope = None
+
+    def get_scope(self, view):
+        if self.scope is not None:
+            return self.scope
+        action = getattr(view, 'action', None)
+        scopes = getattr(view, 'throttle_scopes', {})
+        if action in scopes:
+            return scopes[action]
+        return getattr(view, 'throttle_scope', None)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+        allowed, self._wait = take_token(scope, client_ident(request))
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class DashboardThrottle(TokenBucketThrottle):
+    scope = 'dashboard'
+
+
+class ExportThrottle(TokenBucketThrottle):
+    scope = 'export'
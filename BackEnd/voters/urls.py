@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, async_views
 
 # Create router for viewsets
 router = DefaultRouter()
@@ -10,6 +11,7 @@ router.register(r'volunteers', views.VolunteerViewSet, basename='volunteer')
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health-check'),
+    path('health/db/', views.db_connection_stats, name='db-connection-stats'),
     
     # Authentication endpoints
     path('auth/login/', views.login_view, name='login'),
@@ -20,9 +22,28 @@ urlpatterns = [
     # App settings
     path('settings/', views.app_settings_view, name='app-settings'),
     
+    # Prometheus metrics
+    path('metrics/', views.metrics_view, name='metrics'),
+    
     # Dashboard endpoints
     path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
+    path('dashboard/projection/', views.dashboard_projection, name='dashboard-projection'),
+    path('dashboard/demographics/', views.dashboard_demographics, name='dashboard-demographics'),
+    
+    # Voter roll export (XLSX)
+    path('export/voters/', views.export_voters, name='export-voters'),
     
     # Include router URLs
     path('', include(router.urls)),
 ]
+
+# Under ASGI the read-heavy endpoints are served by async views (same URLs,
+# same payloads); they must come before the sync routes to take precedence.
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path('health/', async_views.health_check, name='health-check'),
+        path('settings/', async_views.app_settings_view, name='app-settings'),
+        path('dashboard/stats/', async_views.dashboard_stats, name='dashboard-stats'),
+        path('voters/', async_views.voter_list, name='voter-list'),
+        path('voters/lookup/', async_views.voter_lookup, name='voter-lookup'),
+    ] + urlpatterns
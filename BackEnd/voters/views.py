@@ -1,14 +1,41 @@
+import datetime
+import itertools
+import json
+import os
+import tempfile
+import time
+
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings as django_settings
 from django.contrib.auth import authenticate, login, logout
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.db.models import Q, Count, Case, When, IntegerField
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
-from .models import User, Volunteer, Voter, AppSettings
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from .models import User, Volunteer, Voter, VoterEvent, AppSettings
+from . import (
+    assignment, dashboard, demographics, events as voter_events, exports, knock_list as knock_lists,
+    projection, volunteer_stats, voter_store,
+)
+from .cache import cached_by_version, voter_data_version
+from .filters import scope_voters_for_volunteer, scope_voters_for_ward, apply_voter_filters
+from .lookups import volunteer_for_user
+from .metrics import render_prometheus
+from .pagination import VoterCursorPagination
+from .routers import read_from_replica
+from .stats import volunteer_tree
+from .throttling import DashboardThrottle, ExportThrottle
+from .wards import request_ward, ward_key
 from .serializers import (
     UserSerializer, VolunteerSerializer, VoterListSerializer,
-    VoterDetailSerializer, VoterUpdateSerializer, DashboardStatsSerializer
+    VoterDetailSerializer, VoterUpdateSerializer, VoterEventSerializer
 )
 
 
@@ -65,6 +92,7 @@ def current_user_view(request):
             'volunteer_id': volunteer.volunteer_id,
             'name': volunteer.name,
             'level': volunteer.level,
+            'ward': volunteer.ward_id,
             'is_read_only': volunteer.level == 'level1'
         }
     else:
@@ -87,8 +115,9 @@ def csrf_token_view(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def app_settings_view(request):
-    """Get application settings"""
-    settings = AppSettings.load()
+    """Get application settings (a volunteer's own ward, or ?ward=<ward number>)"""
+    volunteer = volunteer_for_user(request.user)
+    settings = AppSettings.load(request_ward(volunteer, request.query_params))
     return Response({
         'voting_enabled': settings.voting_enabled,
         'updated_at': settings.updated_at
@@ -101,10 +130,71 @@ def health_check(request):
     """Health check endpoint for deployment platforms"""
     return Response({
         'status': 'healthy',
-        'service': 'Ward 14 Voting Tracker'
+        'service': django_settings.SERVICE_NAME
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def db_connection_stats(request):
+    """Persistent connection statistics for this worker and the database server - Admin only"""
+    if request.user.role != 'admin':
+        return Response(
+            {'detail': 'Connection statistics are only accessible to administrators.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    conn_max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+    connection_age = None
+    if connection.connection is not None and conn_max_age and connection.close_at is not None:
+        # close_at is set to connect time + CONN_MAX_AGE when the connection opens
+        connection_age = round(conn_max_age - (connection.close_at - time.monotonic()), 2)
+
+    server_connections = {}
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() GROUP BY 1"
+            )
+            server_connections = {state: count for state, count in cursor.fetchall()}
+
+    return Response({
+        'worker_pid': os.getpid(),
+        'conn_max_age': conn_max_age,
+        'conn_health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS', False),
+        'connection_open': connection.connection is not None,
+        'connection_age_seconds': connection_age,
+        'server_connections': server_connections,
+        'server_connections_total': sum(server_connections.values()),
+    })
+
+
+def metrics_view(request):
+    """Per-endpoint metrics for all workers in Prometheus text format"""
+    # Prometheus scrapes with a bearer token; admins can also view it when logged in
+    token = django_settings.METRICS_TOKEN
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(token) and constant_time_compare(auth_header, f'Bearer {token}')
+    user = request.user
+    if not token_ok and not (user.is_authenticated and user.role == 'admin'):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _ndjson_lines(queryset, serializer_class, chunk_size=500):
+    """Serialize a queryset as newline-delimited JSON, reading it with a server-side cursor"""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield ''.join(
+            json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + '\n'
+            for item in serializer_class(chunk, many=True).data
+        ).encode('utf-8')
+
+
 # Voter ViewSet
 class VoterViewSet(viewsets.ModelViewSet):
     """
@@ -119,6 +209,13 @@ class VoterViewSet(viewsets.ModelViewSet):
     search_fields = ['name_en', 'name_ml', 'serial_no', 'house_name_en', 'house_name_ml']
     ordering_fields = ['serial_no', 'name_en', 'age', 'has_voted']
     ordering = ['serial_no']
+    throttle_scope = 'voters'
+    # Booth marking draws on its own, larger budget
+    throttle_scopes = {
+        'update': 'mark_voted',
+        'partial_update': 'mark_voted',
+        'bulk_update_voted': 'mark_voted',
+    }
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -196,62 +293,89 @@ class VoterViewSet(viewsets.ModelViewSet):
             elif not new_has_voted and instance.has_voted:
                 serializer.validated_data['time_voted'] = None
         
-        serializer.save()
+        # Log the field deltas; the event is inserted after the update commits
+        changes = voter_events.diff_changes(instance, serializer.validated_data)
+        with transaction.atomic():
+            serializer.save()
+            voter_events.record(instance.id, changes, user=self.request.user, source='api')
     
     def get_queryset(self):
         queryset = Voter.objects.select_related('level1_volunteer', 'level2_volunteer')
         user = self.request.user
         
-        # Filter based on user role
-        if hasattr(user, 'volunteer_profile'):
-            volunteer = user.volunteer_profile
-            if volunteer.level == 'level1':
-                # Level 1 sees only their assigned voters
-                queryset = queryset.filter(level1_volunteer=volunteer)
-            elif volunteer.level == 'level2':
-                # Level 2 sees all voters assigned to them
-                queryset = queryset.filter(level2_volunteer=volunteer)
-        # Admin sees all voters (no filter)
-        
-        # Filter by voting status
-        has_voted = self.request.query_params.get('has_voted')
-        if has_voted is not None:
-            queryset = queryset.filter(has_voted=has_voted.lower() == 'true')
-        
-        # Filter by party
-        party = self.request.query_params.get('party')
-        if party:
-            queryset = queryset.filter(party=party)
-        
-        # Filter by status
-        voter_status = self.request.query_params.get('status')
-        if voter_status:
-            queryset = queryset.filter(status=voter_status)
-        
-        # Filter by volunteer
-        level1_volunteer = self.request.query_params.get('level1_volunteer')
-        if level1_volunteer:
-            queryset = queryset.filter(level1_volunteer_id=level1_volunteer)
-        
-        level2_volunteer = self.request.query_params.get('level2_volunteer')
-        if level2_volunteer:
-            queryset = queryset.filter(level2_volunteer_id=level2_volunteer)
+        # Filter based on user role (admin sees all voters, or one ward with ?ward=)
+        volunteer = volunteer_for_user(user)
+        queryset = scope_voters_for_volunteer(queryset, volunteer)
+        if volunteer is None:
+            queryset = scope_voters_for_ward(queryset, request_ward(None, self.request.query_params))
         
-        # Filter by gender
-        gender = self.request.query_params.get('gender')
-        if gender:
-            queryset = queryset.filter(gender=gender)
+        return apply_voter_filters(queryset, self.request.query_params)
+    
+    @method_decorator(read_from_replica)
+    def list(self, request, *args, **kwargs):
+        # The columnar store, when enabled, selects and orders the voters;
+        # only the page's rows are read from the database
+        ids = voter_store.ids_for_user(request.user, request.query_params)
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        page_ids = [int(voter_id) for voter_id in self.paginate_queryset(ids)]
+        voters = Voter.objects.select_related('level1_volunteer', 'level2_volunteer').in_bulk(page_ids)
+        page = [voters[voter_id] for voter_id in page_ids if voter_id in voters]
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """Look up a single voter by exact serial number (data entry)"""
+        serial_no = request.query_params.get('serial_no', '').strip()
+        if not serial_no.isdigit():
+            return Response(
+                {'message': 'A numeric serial_no is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Filter by age range
-        min_age = self.request.query_params.get('min_age')
-        if min_age:
-            queryset = queryset.filter(age__gte=min_age)
+        voter = self.get_queryset().filter(serial_no=int(serial_no)).first()
+        if voter is None:
+            return Response(
+                {'detail': 'Voter not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(VoterListSerializer(voter).data)
+    
+    @action(detail=False, methods=['get'])
+    def events(self, request):
+        """
+        Change log entries after ?since=<event id> for the voters this user can see.
+        Clients keep the returned last_id and poll with it to sync deltas.
+        Entries appear a few seconds after they are written (events.SETTLE_SECONDS),
+        once no entry with a lower id can still be committing.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(int(request.query_params.get('limit', 500)), 1000)
+        except ValueError:
+            return Response(
+                {'message': 'since and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if limit < 1:
+            return Response(
+                {'message': 'limit must be at least 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        max_age = self.request.query_params.get('max_age')
-        if max_age:
-            queryset = queryset.filter(age__lte=max_age)
+        events = voter_events.settled_events(VoterEvent.objects.select_related('user'), since)
+        volunteer = volunteer_for_user(request.user)
+        ward = request_ward(volunteer, request.query_params)
+        if volunteer is not None or ward is not None:
+            visible = scope_voters_for_ward(scope_voters_for_volunteer(Voter.objects.all(), volunteer), ward)
+            events = events.filter(voter_id__in=visible.values('id'))
+        events = list(events.order_by('id')[:limit])
         
-        return queryset
+        return Response({
+            'events': VoterEventSerializer(events, many=True).data,
+            'last_id': events[-1].id if events else since,
+            'has_more': len(events) == limit,
+        })
     
     @action(detail=False, methods=['post'])
     def bulk_update_voted(self, request):
@@ -265,7 +389,18 @@ class VoterViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        updated = Voter.objects.filter(id__in=voter_ids).update(has_voted=has_voted)
+        try:
+            has_voted = Voter._meta.get_field('has_voted').to_python(has_voted)
+        except ValidationError:
+            return Response(
+                {'message': 'has_voted must be true or false'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        volunteer = getattr(request.user, 'volunteer_profile', None)
+        ward = request_ward(volunteer, request.query_params)
+        voters = scope_voters_for_ward(Voter.objects.filter(id__in=voter_ids), ward)
+        
+        updated = voter_events.set_voted(voters, has_voted, user=request.user, source='bulk')
         
         return Response({
             'message': f'Updated {updated} voters',
@@ -283,10 +418,18 @@ class VolunteerViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'user__username']
     ordering_fields = ['volunteer_id', 'name', 'level', 'created_at']
     ordering = ['volunteer_id']
+    throttle_scope = 'voters'
+    throttle_scopes = {'tree': 'dashboard', 'stats': 'stats'}
     
     def get_queryset(self):
         queryset = Volunteer.objects.select_related('parent_volunteer', 'user')
         
+        # Volunteers see their own ward; admin and overview users pick one with ?ward=
+        volunteer = volunteer_for_user(self.request.user)
+        ward = request_ward(volunteer, self.request.query_params)
+        if ward is not None:
+            queryset = queryset.filter(ward=ward)
+        
         # Filter by level
         level = self.request.query_params.get('level')
         if level:
@@ -298,16 +441,141 @@ class VolunteerViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=is_active.lower() == 'true')
         
         return queryset
-    
+
+    @method_decorator(read_from_replica)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    @method_decorator(read_from_replica)
+    def tree(self, request):
+        """
+        Volunteer hierarchy with per-volunteer and rolled-up voter stats.
+        Admin/overview users get every ward (or one with ?ward=); volunteers
+        get their own subtree.
+        """
+        volunteer = volunteer_for_user(request.user)
+        ward = request_ward(volunteer, request.query_params)
+        tree = cached_by_version(voter_data_version(ward), f'volunteer_tree:{ward_key(ward)}', lambda: volunteer_tree(
+            Volunteer.objects.filter(ward=ward) if ward is not None else Volunteer.objects.all(),
+            scope_voters_for_ward(Voter.objects.exclude(status='deleted'), ward)
+        ))
+        if request.user.role in ['admin', 'overview']:
+            return Response(tree)
+
+        if volunteer is not None:
+            for level2_node in tree['level2_volunteers']:
+                if level2_node['id'] == volunteer.id:
+                    return Response(level2_node)
+                for level1_node in level2_node['children']:
+                    if level1_node['id'] == volunteer.id:
+                        return Response(level1_node)
+            for level1_node in tree['unassigned_level1_volunteers']:
+                if level1_node['id'] == volunteer.id:
+                    return Response(level1_node)
+        return Response(
+            {'detail': 'No volunteer profile linked to this user.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    @action(detail=False, methods=['post'], url_path='balance-level1')
+    def balance_level1(self, request):
+        """
+        Rebalance Level 1 assignments within Level 2 tharas - Admin only.
+        Body: {"level2_volunteers": [ids] (default all), "dry_run": bool}
+        """
+        if request.user.role != 'admin':
+            return Response(
+                {'detail': 'Only administrators can rebalance volunteer assignments.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        level2_volunteers = Volunteer.objects.filter(level='level2', is_active=True)
+        ward = request_ward(None, request.query_params)
+        if ward is not None:
+            level2_volunteers = level2_volunteers.filter(ward=ward)
+        level2_ids = request.data.get('level2_volunteers')
+        if level2_ids is not None and (
+            not isinstance(level2_ids, list)
+            or not all(isinstance(volunteer_id, int) and not isinstance(volunteer_id, bool) for volunteer_id in level2_ids)
+        ):
+            return Response(
+                {'detail': 'level2_volunteers must be a list of volunteer ids.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if level2_ids:
+            level2_volunteers = level2_volunteers.filter(id__in=level2_ids)
+        dry_run = str(request.data.get('dry_run', False)).lower() in ['true', '1']
+
+        summaries = assignment.balance_level1(level2_volunteers, dry_run=dry_run)
+        return Response({
+            'dry_run': dry_run,
+            'moved_count': sum(summary['moved_count'] for summary in summaries),
+            'tharas': summaries,
+        })
+
+    @action(detail=True, methods=['get'], url_path='knock-list')
+    def knock_list(self, request, pk=None):
+        """Not-yet-voted supporters of this volunteer, by household in walking order"""
+        volunteer = self.get_object()
+        party = request.query_params.get('party', 'ldf')
+        if party not in dict(Voter.PARTY_CHOICES):
+            return Response(
+                {'detail': f'Unknown party: {party}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = knock_lists.get_knock_list(volunteer, party)
+        return Response({
+            'volunteer_id': volunteer.id,
+            'volunteer_name': volunteer.name,
+            'party': party,
+            **data,
+        })
+
     @action(detail=True, methods=['get'])
+    @method_decorator(read_from_replica)
+    def households(self, request, pk=None):
+        """Households of this volunteer's voters with member and voted counts"""
+        volunteer = self.get_object()
+        voters = scope_voters_for_volunteer(Voter.objects.exclude(status='deleted'), volunteer)
+
+        rows = (
+            voters.filter(household__isnull=False)
+            .order_by('household__house_no', 'household__house_name_en')
+            .values('household_id', 'household__house_no', 'household__house_name_en', 'household__house_name_ml')
+            .annotate(member_count=Count('id'), voted_count=Count('id', filter=Q(has_voted=True)))
+        )
+        households = [{
+            'id': row['household_id'],
+            'house_no': row['household__house_no'],
+            'house_name_en': row['household__house_name_en'],
+            'house_name_ml': row['household__house_name_ml'],
+            'member_count': row['member_count'],
+            'voted_count': row['voted_count'],
+            'not_voted_count': row['member_count'] - row['voted_count'],
+        } for row in rows]
+
+        return Response({
+            'volunteer_id': volunteer.id,
+            'volunteer_name': volunteer.name,
+            'household_count': len(households),
+            'fully_voted_count': sum(1 for h in households if h['not_voted_count'] == 0),
+            'households': households,
+        })
+
+    @action(detail=True, methods=['get'])
+    @method_decorator(read_from_replica)
     def voters(self, request, pk=None):
-        """Get all voters assigned to this volunteer"""
+        """
+        Voters assigned to this volunteer in serial number order, a page at a
+        time ({next, previous, results}; follow `next` for the following
+        page). With ?stream=ndjson every matching voter is streamed instead,
+        one JSON object per line.
+        """
         volunteer = self.get_object()
-        
-        if volunteer.level == 'level1':
-            voters = Voter.objects.filter(level1_volunteer=volunteer)
-        else:
-            voters = Voter.objects.filter(level2_volunteer=volunteer)
+        voters = scope_voters_for_volunteer(
+            Voter.objects.select_related('level1_volunteer', 'level2_volunteer'), volunteer
+        )
         
         # Apply filters
         has_voted = request.query_params.get('has_voted')
@@ -322,35 +590,32 @@ class VolunteerViewSet(viewsets.ModelViewSet):
         if voter_status:
             voters = voters.filter(status=voter_status)
         
-        serializer = VoterListSerializer(voters, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('stream') == 'ndjson':
+            # The body is produced after this view returns; bind the database
+            # chosen by read_from_replica now
+            voters = voters.order_by(*VoterCursorPagination.ordering).using(voters.db)
+            return StreamingHttpResponse(
+                _ndjson_lines(voters, VoterListSerializer), content_type='application/x-ndjson'
+            )
+        
+        # No view: the viewset's ordering fields are the volunteers', not the voters'
+        paginator = VoterCursorPagination()
+        page = paginator.paginate_queryset(voters, request)
+        serializer = VoterListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
-        """Get statistics for this volunteer"""
+        """Totals, voted, LDF and gender figures for this volunteer's voters (deleted excluded)"""
         volunteer = self.get_object()
-        
-        if volunteer.level == 'level1':
-            voters = Voter.objects.filter(level1_volunteer=volunteer)
-        else:
-            voters = Voter.objects.filter(level2_volunteer=volunteer)
-        
-        total = voters.count()
-        voted = voters.filter(has_voted=True).count()
-        
-        return Response({
-            'volunteer_id': volunteer.id,
-            'volunteer_name': volunteer.name,
-            'total_voters': total,
-            'voted_count': voted,
-            'not_voted_count': total - voted,
-            'voting_percentage': round((voted / total * 100) if total > 0 else 0, 2)
-        })
+        return Response(volunteer_stats.get_stats(volunteer))
 
 
 # Dashboard Views
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+@read_from_replica
 def dashboard_stats(request):
     """Get overall dashboard statistics - Admin and Overview users only"""
     # Only admin and overview users can access dashboard
@@ -359,116 +624,89 @@ def dashboard_stats(request):
             {'detail': 'Dashboard is only accessible to administrators and overview users.'},
             status=status.HTTP_403_FORBIDDEN
         )
-    # Exclude deleted voters from all counts
-    active_voters = Voter.objects.exclude(status='deleted')
-    total_voters = active_voters.count()
-    voted_count = active_voters.filter(has_voted=True).count()
-    not_voted_count = total_voters - voted_count
-    voting_percentage = round((voted_count / total_voters * 100) if total_voters > 0 else 0, 2)
-    
-    # Gender breakdown for all voters
-    male_total = active_voters.filter(gender='M').count()
-    female_total = active_voters.filter(gender='F').count()
-    male_voted = active_voters.filter(gender='M', has_voted=True).count()
-    female_voted = active_voters.filter(gender='F', has_voted=True).count()
-    
-    # Party-wise stats
-    party_stats = {}
-    for party_code, party_name in Voter.PARTY_CHOICES:
-        count = Voter.objects.filter(party=party_code, has_voted=True).count()
-        party_stats[party_code] = {
-            'name': party_name,
-            'voted_count': count
-        }
-    
-    # Status-wise stats (exclude deleted from display)
-    status_stats = {}
-    for status_code, status_name in Voter.STATUS_CHOICES:
-        if status_code != 'deleted':  # Don't show deleted in status stats
-            count = Voter.objects.filter(status=status_code).count()
-            status_stats[status_code] = {
-                'name': status_name,
-                'count': count
-            }
-    
-    # Level 1 volunteer stats
-    level1_volunteers = Volunteer.objects.filter(level='level1', is_active=True)
-    level1_stats = []
-    for volunteer in level1_volunteers:
-        # Exclude deleted voters
-        voters = Voter.objects.filter(level1_volunteer=volunteer).exclude(status='deleted')
-        total = voters.count()
-        voted = voters.filter(has_voted=True).count()
-        
-        # LDF specific stats
-        ldf_voters = voters.filter(party='ldf')
-        ldf_total = ldf_voters.count()
-        ldf_voted = ldf_voters.filter(has_voted=True).count()
-        
-        # LDF gender breakdown
-        ldf_male_voted = ldf_voters.filter(gender='M', has_voted=True).count()
-        ldf_female_voted = ldf_voters.filter(gender='F', has_voted=True).count()
-        
-        level1_stats.append({
-            'id': volunteer.id,
-            'name': volunteer.name,
-            'total_voters': total,
-            'voted_count': voted,
-            'not_voted_count': total - voted,
-            'voting_percentage': round((voted / total * 100) if total > 0 else 0, 2),
-            'ldf_total': ldf_total,
-            'ldf_voted': ldf_voted,
-            'ldf_percentage': round((ldf_voted / ldf_total * 100) if ldf_total > 0 else 0, 2),
-            'ldf_male_voted': ldf_male_voted,
-            'ldf_female_voted': ldf_female_voted
-        })
-    
-    # Level 2 volunteer stats
-    level2_volunteers = Volunteer.objects.filter(level='level2', is_active=True)
-    level2_stats = []
-    for volunteer in level2_volunteers:
-        # Exclude deleted voters
-        voters = Voter.objects.filter(level2_volunteer=volunteer).exclude(status='deleted')
-        total = voters.count()
-        voted = voters.filter(has_voted=True).count()
-        
-        # LDF specific stats
-        ldf_voters = voters.filter(party='ldf')
-        ldf_total = ldf_voters.count()
-        ldf_voted = ldf_voters.filter(has_voted=True).count()
-        
-        # LDF gender breakdown
-        ldf_male_voted = ldf_voters.filter(gender='M', has_voted=True).count()
-        ldf_female_voted = ldf_voters.filter(gender='F', has_voted=True).count()
-        
-        level2_stats.append({
-            'id': volunteer.id,
-            'name': volunteer.name,
-            'total_voters': total,
-            'voted_count': voted,
-            'not_voted_count': total - voted,
-            'voting_percentage': round((voted / total * 100) if total > 0 else 0, 2),
-            'ldf_total': ldf_total,
-            'ldf_voted': ldf_voted,
-            'ldf_percentage': round((ldf_voted / ldf_total * 100) if ldf_total > 0 else 0, 2),
-            'ldf_male_voted': ldf_male_voted,
-            'ldf_female_voted': ldf_female_voted
-        })
-    
-    data = {
-        'total_voters': total_voters,
-        'voted_count': voted_count,
-        'not_voted_count': not_voted_count,
-        'voting_percentage': voting_percentage,
-        'male_total': male_total,
-        'female_total': female_total,
-        'male_voted': male_voted,
-        'female_voted': female_voted,
-        'party_stats': party_stats,
-        'status_stats': status_stats,
-        'level1_volunteer_stats': level1_stats,
-        'level2_volunteer_stats': level2_stats,
-    }
-    
-    serializer = DashboardStatsSerializer(data)
-    return Response(serializer.data)
+    # Every ward, or one with ?ward=<ward number>
+    ward = request_ward(None, request.query_params)
+    return Response(dashboard.dashboard_snapshot(ward))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+@read_from_replica
+def dashboard_projection(request):
+    """Projected final turnout per Level 2 volunteer and ward-wide - Admin and Overview users only"""
+    if request.user.role not in ['admin', 'overview']:
+        return Response(
+            {'detail': 'Dashboard is only accessible to administrators and overview users.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if projection.np is None:
+        return Response(
+            {'detail': 'Turnout projection requires NumPy to be installed.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    ward = request_ward(None, request.query_params)
+    # Refit after new marks, or every few minutes so the rate tracks quiet spells
+    fitted = cached_by_version(
+        voter_data_version(ward), f'turnout_projection:{ward_key(ward)}',
+        lambda: projection.fit_projection(ward=ward), timeout=300
+    )
+    return Response(projection.project(fitted))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+@read_from_replica
+def dashboard_demographics(request):
+    """
+    Turnout by age band x gender x party, ward-wide and per Level 2 volunteer -
+    Admin and Overview users only. ?age_bins=18,30,45,60 sets the bands' lower edges.
+    """
+    if request.user.role not in ['admin', 'overview']:
+        return Response(
+            {'detail': 'Dashboard is only accessible to administrators and overview users.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    try:
+        edges = demographics.parse_age_edges(request.query_params.get('age_bins', ''))
+    except ValueError as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    ward = request_ward(None, request.query_params)
+    return Response(demographics.demographics(ward, edges))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([ExportThrottle])
+@read_from_replica
+def export_voters(request):
+    """
+    The voter roll as an XLSX download - Admin users only.
+    ?ward=<number> limits it to one ward, ?by_thara=true gives each Level 2
+    volunteer a sheet.
+    """
+    if request.user.role != 'admin':
+        return Response(
+            {'detail': 'Only administrators can export the voter roll.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    if exports.openpyxl is None:
+        return Response(
+            {'detail': 'Export requires openpyxl to be installed.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    ward = request_ward(None, request.query_params)
+    by_thara = request.query_params.get('by_thara', '').lower() == 'true'
+
+    # Built in a temporary file (deleted when the response closes it), then streamed
+    output = tempfile.TemporaryFile()
+    rows, elapsed = exports.write_roll(
+        output, scope_voters_for_ward(Voter.objects.exclude(status='deleted'), ward), split_by_thara=by_thara
+    )
+    output.seek(0)
+    filename = f"voters-{ward.number if ward is not None else 'all'}-{datetime.date.today().isoformat()}.xlsx"
+    response = FileResponse(output, as_attachment=True, filename=filename)
+    response['X-Export-Rows'] = str(rows)
+    response['X-Export-Rows-Per-Second'] = f'{rows / max(elapsed, 1e-6):.0f}'
+    return response
@@ -0,0 +1,88 @@
+"""
+Per-volunteer voter statistics for the volunteer pages.
+
+A volunteer's totals, voted, LDF and gender figures come from one
+conditional-aggregate query over their non-deleted voters and are kept in
+the shared cache under a per-volunteer version, so Level 1 pages polling
+their stats are served from one cache read while nothing changes.
+
+The version is bumped when one of the volunteer's voters changes: model
+saves and deletes (voters.signals) and every committed batch of voter events
+(voters.events.subscribe), which covers bulk and admin marks and names the
+previous volunteer of a reassigned voter. Bulk rewrites that bypass both
+(imports, snapshot loads) call invalidate_all().
+"""
+from django.core.cache import cache
+from .cache import bump_version, bump_versions_on_commit, get_version
+from .filters import scope_voters_for_volunteer
+from .models import Voter
+from .stats import VOTER_COUNT_AGGREGATES, counts_summary
+
+STATS_TIMEOUT = 60 * 60
+
+# Voter changes that move a volunteer's figures
+STATS_FIELDS = ['has_voted', 'party', 'status', 'level1_volunteer', 'level2_volunteer']
+
+
+def _stats_version(volunteer_id):
+    return f'volunteer_stats:{volunteer_id}'
+
+
+def build_stats(volunteer):
+    """The volunteer's figures from a single aggregate query"""
+    counts = (
+        scope_voters_for_volunteer(Voter.objects.exclude(status='deleted'), volunteer)
+        .order_by()
+        .aggregate(**VOTER_COUNT_AGGREGATES)
+    )
+    return {
+        'volunteer_id': volunteer.id,
+        'volunteer_name': volunteer.name,
+        **counts_summary(counts),
+    }
+
+
+def get_stats(volunteer):
+    """The volunteer's figures, from the shared cache while their voters are unchanged"""
+    key = (
+        f'volunteer_stats:{volunteer.id}:'
+        f'{get_version(_stats_version(volunteer.id))}:{get_version("volunteer_stats")}'
+    )
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_stats(volunteer)
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def invalidate(volunteer_ids):
+    """Rebuild these volunteers' stats once the current transaction commits"""
+    bump_versions_on_commit(
+        _stats_version(volunteer_id) for volunteer_id in volunteer_ids if volunteer_id is not None
+    )
+
+
+def apply_events(events):
+    """Invalidate the stats of every volunteer a committed batch of voter events touched"""
+    voter_ids = set()
+    volunteer_ids = set()
+    for event in events:
+        if not any(field in event.changes for field in STATS_FIELDS):
+            continue
+        voter_ids.add(event.voter_id)
+        for field in ('level1_volunteer', 'level2_volunteer'):
+            if field in event.changes:
+                volunteer_ids.update(event.changes[field])
+
+    if voter_ids:
+        for level1_id, level2_id in Voter.objects.filter(id__in=voter_ids).values_list(
+            'level1_volunteer_id', 'level2_volunteer_id'
+        ):
+            volunteer_ids.update((level1_id, level2_id))
+    for volunteer_id in volunteer_ids - {None}:
+        bump_version(_stats_version(volunteer_id))
+
+
+def invalidate_all():
+    """Rebuild every volunteer's stats on its next read"""
+    bump_version('volunteer_stats')
@@ -0,0 +1,316 @@
+"""
+Per-worker columnar voter store (settings.VOTER_STORE_ENABLED).
+
+Each worker keeps the voters' tracking columns in NumPy arrays sorted by
+voter id: party, status and gender as int8 codes (position in the model's
+choices + 1, 0 = unrecognised), has_voted as bool, age as int16, and ward,
+volunteer and household ids as int32 (0 = none). A few hundred thousand
+voters take a few megabytes.
+
+Voter list filters (the volunteer and ward scopes plus apply_voter_filters)
+and the dashboard counts become boolean masks over these arrays. Lists then
+read only the page's rows from the database, which stays the source of
+truth for everything shown; requests the store cannot answer (search,
+ordering by name) go to the database as before.
+
+Freshness: get_store() compares the shared voter data version with the one
+it last saw and, after a write, re-reads only the rows whose updated_at is
+past its watermark (less a margin for transactions that commit late). Bulk
+writers that do not touch updated_at (imports, snapshot loads) call
+invalidate_all() for a full reload, and every VOTER_STORE_RELOAD_SECONDS a
+worker reloads anyway to drop deleted rows.
+"""
+import datetime
+import threading
+import time
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.settings import api_settings
+from .cache import VOTER_DATA, bump_version, get_version
+from .lookups import volunteer_for_user
+from .models import Voter
+from .wards import request_ward
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STORE_VERSION = 'voter_store'
+
+# Rows re-read behind the watermark: a transaction that commits late carries
+# an updated_at older than rows already seen
+WATERMARK_MARGIN = datetime.timedelta(seconds=30)
+
+CODED_COLUMNS = {
+    'party': Voter.PARTY_CHOICES,
+    'status': Voter.STATUS_CHOICES,
+    'gender': Voter.GENDER_CHOICES,
+}
+CODES = {
+    field: {code: index for index, (code, _) in enumerate(choices, start=1)}
+    for field, choices in CODED_COLUMNS.items()
+}
+ID_COLUMNS = ['ward_id', 'level1_volunteer_id', 'level2_volunteer_id', 'household_id']
+FIELDS = ['id', 'serial_no', 'age', 'has_voted', 'updated_at', *CODED_COLUMNS, *ID_COLUMNS]
+
+# Ordering fields the store can sort by
+ORDERING_COLUMNS = {'serial_no', 'age', 'has_voted'}
+
+_lock = threading.Lock()
+_store = None
+
+
+def _build_columns(rows):
+    """({column: array sorted by id}, latest updated_at) from values_list rows in FIELDS order"""
+    values = dict(zip(FIELDS, zip(*rows))) if rows else {field: () for field in FIELDS}
+    columns = {
+        'id': np.array(values['id'], dtype=np.int64),
+        'serial_no': np.array(values['serial_no'], dtype=np.int32),
+        'age': np.array(values['age'], dtype=np.int16),
+        'has_voted': np.array(values['has_voted'], dtype=bool),
+    }
+    for field in CODED_COLUMNS:
+        codes = CODES[field]
+        columns[field] = np.array([codes.get(value, 0) for value in values[field]], dtype=np.int8)
+    for field in ID_COLUMNS:
+        columns[field] = np.array([value or 0 for value in values[field]], dtype=np.int32)
+    order = np.argsort(columns['id'], kind='stable')
+    columns = {name: array[order] for name, array in columns.items()}
+    return columns, max(values['updated_at'], default=None)
+
+
+class VoterColumns:
+    """One immutable snapshot of the columns; a refresh builds a new one"""
+
+    def __init__(self, columns, watermark, data_version, store_version, by_serial=None, loaded_at=None):
+        self.columns = columns
+        self.size = len(columns['id'])
+        self.watermark = watermark
+        self.data_version = data_version
+        self.store_version = store_version
+        # Time of the last full load
+        self.loaded_at = loaded_at if loaded_at is not None else time.monotonic()
+        # Positions in serial number order (the lists' default ordering)
+        self.by_serial = by_serial if by_serial is not None else np.lexsort((columns['id'], columns['serial_no']))
+
+    def code(self, field, value):
+        """Stored code of a choice value (-1, matching nothing, when unknown)"""
+        return CODES[field].get(value, -1)
+
+    def with_changes(self, rows, data_version):
+        """
+        A copy with the given rows' columns replaced, or None when a row is
+        not in the store (a new voter, which needs a full reload)
+        """
+        changed, watermark = _build_columns(rows)
+        if not len(changed['id']):
+            return VoterColumns(
+                self.columns, self.watermark, data_version, self.store_version, self.by_serial, self.loaded_at
+            )
+        ids = self.columns['id']
+        positions = np.searchsorted(ids, changed['id'])
+        if positions.max() >= self.size or not (ids[positions] == changed['id']).all():
+            return None
+        columns = {}
+        for name, array in self.columns.items():
+            if name != 'id' and not (array[positions] == changed[name]).all():
+                array = array.copy()
+                array[positions] = changed[name]
+            columns[name] = array
+        by_serial = self.by_serial if columns['serial_no'] is self.columns['serial_no'] else None
+        return VoterColumns(
+            columns, max(self.watermark, watermark), data_version, self.store_version, by_serial, self.loaded_at
+        )
+
+    def scope_mask(self, volunteer, ward):
+        """Voters a volunteer (or, for admins, a ward; None = all) can see"""
+        columns = self.columns
+        if volunteer is not None:
+            mask = columns['ward_id'] == volunteer.ward_id
+            if volunteer.level == 'level1':
+                return mask & (columns['level1_volunteer_id'] == volunteer.id)
+            if volunteer.level == 'level2':
+                return mask & (columns['level2_volunteer_id'] == volunteer.id)
+            return np.ones(self.size, dtype=bool)
+        if ward is not None:
+            return columns['ward_id'] == ward.id
+        return np.ones(self.size, dtype=bool)
+
+    def filter_mask(self, mask, params):
+        """
+        mask narrowed by the voter list parameters, as apply_voter_filters
+        does; None when a parameter is malformed (the database reports it)
+        """
+        columns = self.columns
+        has_voted = params.get('has_voted')
+        if has_voted is not None:
+            mask = mask & (columns['has_voted'] == (has_voted.lower() == 'true'))
+        for field in CODED_COLUMNS:
+            value = params.get(field)
+            if value:
+                mask = mask & (columns[field] == self.code(field, value))
+        for param, column in (
+            ('level1_volunteer', 'level1_volunteer_id'),
+            ('level2_volunteer', 'level2_volunteer_id'),
+            ('household', 'household_id'),
+        ):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    return None
+                mask = mask & (columns[column] == int(value))
+        for param, compare in (('min_age', np.greater_equal), ('max_age', np.less_equal)):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    return None
+                mask = mask & compare(columns['age'], int(value))
+        return mask
+
+    def ordered_ids(self, mask, ordering):
+        """Ids of the masked voters sorted by ordering terms ('-' for descending)"""
+        columns = self.columns
+        if list(ordering) == ['serial_no']:
+            positions = self.by_serial[mask[self.by_serial]]
+        else:
+            positions = np.flatnonzero(mask)
+            # lexsort sorts by its last key first; ties end in id order
+            keys = [columns['id'][positions]]
+            for term in reversed(ordering):
+                values = columns[term.lstrip('-')][positions].astype(np.int64)
+                keys.append(-values if term.startswith('-') else values)
+            positions = positions[np.lexsort(keys)]
+        return columns['id'][positions]
+
+    def counts(self, mask):
+        """
+        {aggregate: boolean mask} mirroring stats.VOTER_COUNT_AGGREGATES
+        """
+        columns = self.columns
+        voted = mask & columns['has_voted']
+        male = columns['gender'] == self.code('gender', 'M')
+        female = columns['gender'] == self.code('gender', 'F')
+        ldf = columns['party'] == self.code('party', 'ldf')
+        return {
+            'total': mask,
+            'voted': voted,
+            'male_total': mask & male,
+            'female_total': mask & female,
+            'male_voted': voted & male,
+            'female_voted': voted & female,
+            'ldf_total': mask & ldf,
+            'ldf_voted': voted & ldf,
+            'ldf_male_voted': voted & ldf & male,
+            'ldf_female_voted': voted & ldf & female,
+        }
+
+    def voter_counts(self, mask):
+        """Totals like aggregate(**VOTER_COUNT_AGGREGATES)"""
+        return {name: int(selected.sum()) for name, selected in self.counts(mask).items()}
+
+    def grouped_voter_counts(self, mask, column):
+        """{group id: counts} like grouped_counts_queryset(), without the empty (0) group"""
+        groups = self.columns[column]
+        length = int(groups.max()) + 1 if self.size else 1
+        sums = {
+            name: np.bincount(groups[selected], minlength=length)
+            for name, selected in self.counts(mask).items()
+        }
+        return {
+            int(group): {name: int(values[group]) for name, values in sums.items()}
+            for group in np.flatnonzero(sums['total'])
+            if group != 0
+        }
+
+    def value_counts(self, mask, field):
+        """{choice value: count} of a coded column among the masked voters"""
+        counts = np.bincount(self.columns[field][mask], minlength=len(CODES[field]) + 1)
+        return {value: int(counts[code]) for value, code in CODES[field].items()}
+
+
+def _voter_rows(queryset):
+    return list(queryset.using(DEFAULT_DB_ALIAS).order_by().values_list(*FIELDS).iterator(chunk_size=10000))
+
+
+def _load(data_version, store_version):
+    # Read the primary: the store must not trail a replica's lag
+    columns, watermark = _build_columns(_voter_rows(Voter.objects.all()))
+    return VoterColumns(columns, watermark, data_version, store_version)
+
+
+def _refresh(store, data_version):
+    if store.watermark is None:
+        return _load(data_version, store.store_version)
+    rows = _voter_rows(Voter.objects.filter(updated_at__gte=store.watermark - WATERMARK_MARGIN))
+    refreshed = store.with_changes(rows, data_version)
+    if refreshed is None:
+        return _load(data_version, store.store_version)
+    return refreshed
+
+
+def get_store():
+    """The worker's store, brought up to date with the voter data; None when disabled"""
+    global _store
+    if np is None or not settings.VOTER_STORE_ENABLED:
+        return None
+    data_version = get_version(VOTER_DATA)
+    store_version = get_version(STORE_VERSION)
+
+    def loaded(store):
+        return (
+            store is not None
+            and store.store_version == store_version
+            and time.monotonic() - store.loaded_at < settings.VOTER_STORE_RELOAD_SECONDS
+        )
+
+    def current(store):
+        return loaded(store) and store.data_version == data_version
+
+    store = _store
+    if current(store):
+        return store
+    with _lock:
+        # Another thread may have refreshed it while this one waited
+        store = _store
+        if current(store):
+            return store
+        if loaded(store):
+            store = _refresh(store, data_version)
+        else:
+            store = _load(data_version, store_version)
+        _store = store
+    return store
+
+
+def invalidate_all():
+    """Reload every worker's store in full (after writes that bypass updated_at)"""
+    bump_version(STORE_VERSION)
+
+
+def matching_ids(volunteer, ward, params):
+    """
+    Ids of the voters a list request selects, in its order, or None when the
+    store is off or cannot answer the request (search, ordering by name)
+    """
+    if params.get(api_settings.SEARCH_PARAM):
+        return None
+    ordering = [
+        term.strip() for term in params.get(api_settings.ORDERING_PARAM, '').split(',')
+        if term.strip()
+    ]
+    if any(term.lstrip('-') not in ORDERING_COLUMNS for term in ordering):
+        return None
+    store = get_store()
+    if store is None:
+        return None
+    mask = store.filter_mask(store.scope_mask(volunteer, ward), params)
+    if mask is None:
+        return None
+    return store.ordered_ids(mask, ordering or ['serial_no'])
+
+
+def ids_for_user(user, params):
+    """matching_ids() for a user's voter list, scoped as VoterViewSet.get_queryset scopes it"""
+    volunteer = volunteer_for_user(user)
+    ward = request_ward(None, params) if volunteer is None else None
+    return matching_ids(volunteer, ward, params)
@@ -0,0 +1,77 @@
+"""
+Ward scoping.
+
+Every voter and volunteer belongs to one ward. Volunteers only ever see
+their own ward; admin and overview users see the whole panchayat or narrow
+a request to one ward with ?ward=<ward number>. Filtering voters on ward
+lets PostgreSQL read only that ward's partition (see voters.partitions), so
+per-ward requests cost the same however many wards the deployment holds.
+"""
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from .cache import ProcessCache
+from .models import Ward
+
+WARD_PARAM = 'ward'
+
+# Wards change a handful of times per election; every request resolves its
+# ward from this per-process copy
+_ward_cache = ProcessCache('wards', settings.APP_SETTINGS_CACHE_TTL)
+
+
+def _load_wards():
+    wards = list(Ward.objects.all())
+    return {
+        'by_id': {ward.id: ward for ward in wards},
+        'by_number': {ward.number: ward for ward in wards},
+    }
+
+
+def _wards():
+    return _ward_cache.get(_load_wards)
+
+
+def invalidate_cache():
+    _ward_cache.invalidate()
+
+
+def all_ward_ids():
+    return list(_wards()['by_id'])
+
+
+def ward_by_id(ward_id):
+    return _wards()['by_id'].get(ward_id)
+
+
+def get_ward(number=None):
+    """
+    Ward by number; without a number, the only ward of a single-ward
+    deployment. None if there is no such ward.
+    """
+    wards = _wards()['by_number']
+    if number is not None:
+        return wards.get(int(number))
+    if len(wards) == 1:
+        return next(iter(wards.values()))
+    return None
+
+
+def request_ward(volunteer, params):
+    """
+    Ward a request is scoped to (None = all wards): the volunteer's own ward,
+    else the ?ward= number for admin and overview users
+    """
+    if volunteer is not None:
+        return ward_by_id(volunteer.ward_id)
+    number = (params.get(WARD_PARAM) or '').strip()
+    if not number:
+        return None
+    ward = get_ward(number) if number.isdigit() else None
+    if ward is None:
+        raise NotFound(f'Unknown ward: {number}')
+    return ward
+
+
+def ward_key(ward):
+    """Cache key segment for a ward scope"""
+    return str(ward.id) if ward is not None else 'all'
@@ -0,0 +1,96 @@
+"""
+Start-up warm-up for the gunicorn workers (voting_tracker/gunicorn_conf.py).
+
+With preload_app the master imports the application once and preload()
+finishes the job before any worker is forked: it imports every module a
+first request would otherwise import lazily (URLconf, views, serializers,
+commands, NumPy and openpyxl), renders each ward's dashboard snapshot into
+the shared cache and closes its database connections so no worker inherits
+a socket. Each worker then runs warm_worker() right after the fork to open
+its persistent connection(s) and load its per-process caches (AppSettings,
+wards, volunteer map, voter store), so the first request it serves costs
+what the hundredth does.
+"""
+import importlib
+import logging
+import pkgutil
+import time
+from django.core.cache import close_caches
+from django.db import DatabaseError, close_old_connections, connections
+from django.urls import get_resolver
+from . import dashboard, lookups, voter_store, wards
+from .models import AppSettings
+
+logger = logging.getLogger(__name__)
+
+# Imported by a few endpoints only (projection, exports); optional here
+OPTIONAL_MODULES = ['numpy', 'openpyxl']
+
+
+def _timed(timings, name, func):
+    start = time.perf_counter()
+    result = func()
+    timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def import_app_modules():
+    """Import the URLconf and every voters module except migrations and tests"""
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    package = importlib.import_module('voters')
+    for module in pkgutil.walk_packages(package.__path__, 'voters.'):
+        if '.migrations' in module.name or module.name.endswith('.tests'):
+            continue
+        importlib.import_module(module.name)
+    for name in OPTIONAL_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def render_dashboards():
+    """Dashboard snapshots for every ward and for all wards together"""
+    dashboard.dashboard_snapshot(None)
+    for ward_id in wards.all_ward_ids():
+        dashboard.dashboard_snapshot(wards.ward_by_id(ward_id))
+
+
+def _connect():
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def preload():
+    """Run in the gunicorn master before the workers fork; returns timings in ms"""
+    timings = {}
+    _timed(timings, 'imports', import_app_modules)
+    try:
+        _timed(timings, 'dashboards', render_dashboards)
+    except DatabaseError:
+        # A database that is not up yet must not keep the server from starting
+        logger.exception('Dashboard pre-render failed')
+    finally:
+        connections.close_all()
+        close_caches()
+    return timings
+
+
+def warm_worker():
+    """Run in each worker right after the fork; returns timings in ms"""
+    timings = {}
+    try:
+        _timed(timings, 'connect', _connect)
+        _timed(timings, 'app_settings', AppSettings.load)
+        _timed(timings, 'wards', wards.all_ward_ids)
+        _timed(timings, 'volunteers', lookups.volunteer_map)
+        _timed(timings, 'voter_store', voter_store.get_store)
+        _timed(timings, 'dashboards', render_dashboards)
+    except DatabaseError:
+        logger.exception('Worker warm-up failed')
+    finally:
+        # Keep the connections only where they persist (CONN_MAX_AGE > 0)
+        close_old_connections()
+    return timings
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "voting_tracker.settings_droplet")
+# Route read-heavy endpoints to the async views (see voters/async_views.py)
+os.environ.setdefault("ASYNC_READ_VIEWS", "True")
 
 application = get_asgi_application()
@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration (deployment/5-start-backend.sh):
+
+    gunicorn voting_tracker.wsgi:application -c python:voting_tracker.gunicorn_conf
+
+The application is loaded once in the master and warmed before the workers
+fork; each worker then opens its database connection and fills its
+in-process caches before it accepts requests (see voters/warmup.py).
+GUNICORN_WARMUP=False starts cold instead, which is what
+`manage.py benchmark_startup` compares against.
+
+The master also maintains the metrics snapshots in METRICS_DIR (see
+voters/metrics.py): it clears them on start and folds each exited worker's
+snapshot into the retired total.
+"""
+import os
+from decouple import config
+
+# Same default as wsgi.py/asgi.py; the metrics hooks read settings in the master
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "voting_tracker.settings_droplet")
+
+bind = config('GUNICORN_BIND', default='127.0.0.1:8000')
+workers = config('GUNICORN_WORKERS', default=3, cast=int)
+timeout = config('GUNICORN_TIMEOUT', default=120, cast=int)
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
+
+WARMUP = config('GUNICORN_WARMUP', default=True, cast=bool)
+preload_app = WARMUP
+
+
+def _format(timings):
+    return ', '.join(f'{name} {ms:.0f}ms' for name, ms in timings.items())
+
+
+def on_starting(server):
+    """Master, before the workers start: drop metrics of earlier runs"""
+    from voters import metrics
+    metrics.clear_snapshots()
+
+
+def child_exit(server, worker):
+    from voters import metrics
+    metrics.retire_snapshot(worker.pid)
+
+
+def when_ready(server):
+    """Master, after the app is loaded and before the first fork"""
+    if not WARMUP:
+        return
+    from voters import warmup
+    server.log.info('Preloaded application: %s', _format(warmup.preload()))
+
+
+def post_fork(server, worker):
+    if not WARMUP:
+        return
+    from voters import warmup
+    server.log.info('Worker %s warmed up: %s', worker.pid, _format(warmup.warm_worker()))
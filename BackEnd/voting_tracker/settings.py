@@ -46,12 +46,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "voters.metrics.MetricsMiddleware",
+    "voters.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "voters.routers.ReplicaStickinessMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -80,6 +83,11 @@ WSGI_APPLICATION = "voting_tracker.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+def _conn_max_age(value):
+    """Seconds, or None for DATABASE_CONN_MAX_AGE=none (unlimited persistent connections)"""
+    return None if str(value).strip().lower() == 'none' else int(value)
+
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -88,9 +96,40 @@ DATABASES = {
         "PASSWORD": config('DATABASE_PASSWORD', default=''),
         "HOST": config('DATABASE_HOST', default='localhost'),
         "PORT": config('DATABASE_PORT', default='5432'),
+        # Persistent connections: each gunicorn worker keeps its connection open
+        # for CONN_MAX_AGE seconds instead of reconnecting on every request.
+        # 0 restores per-request connections, "none" keeps them open forever.
+        "CONN_MAX_AGE": config('DATABASE_CONN_MAX_AGE', default=60, cast=_conn_max_age),
+        "CONN_HEALTH_CHECKS": config('DATABASE_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Optional read replica (voters/routers.py): dashboards, lists, the volunteer
+# tree and exports read from it. DATABASE_REPLICA_HOST adds a streaming
+# replica of the default database; DATABASE_REPLICA_SQLITE points at an
+# SQLite stand-in for local testing (e.g. a database restored with
+# load_snapshot).
+if config('DATABASE_REPLICA_HOST', default=''):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": config('DATABASE_REPLICA_HOST'),
+        "PORT": config('DATABASE_REPLICA_PORT', default=DATABASES["default"]["PORT"]),
+        # Guard against accidental writes even if routing is bypassed
+        "OPTIONS": {"options": "-c default_transaction_read_only=on"},
+        "TEST": {"MIRROR": "default"},
+    }
+elif config('DATABASE_REPLICA_SQLITE', default=''):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": config('DATABASE_REPLICA_SQLITE'),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["voters.routers.ReplicaRouter"]
+
+# After a write, the user's reads stay on the primary this long (replication lag margin)
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -149,8 +188,100 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'voters.throttling.TokenBucketThrottle',
+    ],
 }
 
+# Cache shared by all gunicorn workers (version keys for cross-worker
+# invalidation, throttling, replica pins, knock lists). Set REDIS_URL to use
+# Redis (requires the `redis` package). Without it a file-based cache on
+# local disk is shared by the workers of a single host: for development only,
+# since it scans its directory on every write and has no atomic operations.
+# The deployed settings warn at startup when they run on it with DEBUG off.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+            # Django's default of 300 entries would cull version tokens and
+            # knock list markers at random under normal load; a culled token
+            # only forces a rebuild, but keep them all in the cache
+            "OPTIONS": {
+                "MAX_ENTRIES": config('CACHE_MAX_ENTRIES', default=20000, cast=int),
+                "CULL_FREQUENCY": 4,
+            },
+        }
+    }
+
+# Seconds a worker serves AppSettings from memory before revalidating its
+# version against the shared cache; bounds how long a voting toggle takes
+# to reach every worker.
+APP_SETTINGS_CACHE_TTL = config('APP_SETTINGS_CACHE_TTL', default=1.0, cast=float)
+
+# Serve the read-heavy endpoints (dashboard, settings, health, voter list and
+# lookup) with async views. asgi.py turns this on when running under ASGI.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Threads per ASGI worker running the async views' database work; each holds
+# one persistent database connection
+ASYNC_DB_THREADS = config('ASYNC_DB_THREADS', default=8, cast=int)
+
+# Per-worker columnar voter store (voters/voter_store.py, needs NumPy): voter
+# list filters and dashboard counts are answered from in-memory arrays kept
+# fresh from updated_at. Each worker also reloads it in full every
+# VOTER_STORE_RELOAD_SECONDS to drop deleted voters.
+VOTER_STORE_ENABLED = config('VOTER_STORE_ENABLED', default=False, cast=bool)
+VOTER_STORE_RELOAD_SECONDS = config('VOTER_STORE_RELOAD_SECONDS', default=600, cast=int)
+
+# Per-endpoint metrics (voters/metrics.py). Each worker snapshots its counters
+# to METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds; /api/metrics/
+# sums them. Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>"
+# (admin sessions are always allowed).
+METRICS_DIR = config(
+    'METRICS_DIR',
+    default='/dev/shm/voting_tracker_metrics' if Path('/dev/shm').is_dir() else str(BASE_DIR / 'metrics')
+)
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Slow query capture (voters/slow_queries.py): queries slower than the
+# threshold are logged and fingerprinted, and a sampled EXPLAIN (ANALYZE,
+# BUFFERS) plan is stored at most once per interval per fingerprint.
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+SLOW_QUERY_EXPLAIN_INTERVAL = config('SLOW_QUERY_EXPLAIN_INTERVAL', default=600, cast=int)
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = config('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', default=5000, cast=int)
+
+# Token-bucket throttling (voters/throttling.py), kept in the shared cache.
+# Each scope has a bucket per user and one shared by all its users, given as
+# (burst capacity, sustained requests per minute). Booth marking gets the
+# largest budget; dashboards and exports are cut off first. Turn off with
+# THROTTLE_ENABLED=False (e.g. for load_test runs).
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_BUCKETS = {
+    'mark_voted': {'user': (60, 120), 'endpoint': (600, 6000)},
+    'voters': {'user': (30, 120), 'endpoint': (300, 3000)},
+    'dashboard': {'user': (10, 30), 'endpoint': (40, 240)},
+    # Per-volunteer stats, polled by every Level 1 page and served from the cache
+    'stats': {'user': (10, 30), 'endpoint': (300, 3000)},
+    'export': {'user': (2, 2), 'endpoint': (4, 6)},
+}
+
+# Name reported by the health check
+SERVICE_NAME = config('SERVICE_NAME', default='Voting Tracker')
+
+# Polling hours (local time) used by the turnout projection
+POLL_OPENS_AT = config('POLL_OPENS_AT', default='07:00')
+POLL_CLOSES_AT = config('POLL_CLOSES_AT', default='18:00')
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # Vite default port
@@ -4,7 +4,9 @@ For HTTPS deployment on Ubuntu droplet with Let's Encrypt SSL
 Domain: vote-tracker.in
 """
 from .settings import *
+from .settings import _conn_max_age
 import os
+import warnings
 from pathlib import Path
 
 # Build paths
@@ -28,6 +30,15 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-produc
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=False, cast=bool)
 
+# The file-based fallback cache cannot carry polling-day load (see settings.py);
+# warn rather than fail, so deployments without Redis still start
+if not DEBUG and not REDIS_URL:
+    warnings.warn(
+        'REDIS_URL is not set: falling back to the file-based cache, which is '
+        'slow under load and loses concurrent updates. Point REDIS_URL at a '
+        'shared Redis for polling day.'
+    )
+
 # Allowed hosts for production
 ALLOWED_HOSTS = [
     'vote-tracker.in',
@@ -46,9 +57,22 @@ DATABASES = {
         'PASSWORD': config('POSTGRES_PASSWORD', default='voting_secure_pass'),
         'HOST': 'localhost',
         'PORT': '5432',
+        # Reuse each gunicorn worker's connection across requests
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=60, cast=_conn_max_age),
+        'CONN_HEALTH_CHECKS': config('DATABASE_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Optional streaming read replica (see voters/routers.py)
+if config('DATABASE_REPLICA_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': config('DATABASE_REPLICA_HOST'),
+        'PORT': config('DATABASE_REPLICA_PORT', default='5432'),
+        'OPTIONS': {'options': '-c default_transaction_read_only=on'},
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # Static files - use absolute path relative to BASE_DIR
 STATIC_ROOT = str(BASE_DIR / 'staticfiles')
 STATIC_URL = '/static/'
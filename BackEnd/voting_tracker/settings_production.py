@@ -2,7 +2,9 @@
 Production settings for Ward 14 Voting Tracker
 """
 from .settings import *
+from .settings import _conn_max_age
 import os
+import warnings
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-change-this-in-production')
@@ -10,10 +12,21 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-change-this-in-produc
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 
+# The file-based fallback cache cannot carry polling-day load (see settings.py);
+# warn rather than fail, so deployments without Redis still start
+if not DEBUG and not os.environ.get('REDIS_URL'):
+    warnings.warn(
+        'REDIS_URL is not set: falling back to the file-based cache, which is '
+        'slow under load and loses concurrent updates. Point REDIS_URL at a '
+        'shared Redis for polling day.'
+    )
+
 ALLOWED_HOSTS = ['*', 'hemangsrr-voting-tracker-2mmez.ondigitalocean.app', 'localhost', '127.0.0.1']
 
 # Add WhiteNoise middleware for static file serving
 MIDDLEWARE = [
+    "voters.metrics.MetricsMiddleware",
+    "voters.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Add WhiteNoise here
     "corsheaders.middleware.CorsMiddleware",
@@ -21,6 +34,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "voters.routers.ReplicaStickinessMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -34,6 +48,8 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'voting_secure_pass'),
         'HOST': 'localhost',
         'PORT': '5432',
+        'CONN_MAX_AGE': _conn_max_age(os.environ.get('DATABASE_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DATABASE_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes', 'on'),
     }
 }
 
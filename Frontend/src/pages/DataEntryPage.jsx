@@ -81,14 +81,16 @@ export const DataEntryPage = () => {
     setMessage(null);
 
     try {
-      // Search for voter by serial number
-      const searchResponse = await votersAPI.getAll({ 
-        search: serialNo.trim(),
-        page_size: 100 
-      });
-      
-      const voters = searchResponse.data.results || searchResponse.data;
-      const voter = voters.find(v => v.serial_no === parseInt(serialNo.trim()));
+      // Look up voter by exact serial number
+      let voter = null;
+      try {
+        const lookupResponse = await votersAPI.lookup(serialNo.trim());
+        voter = lookupResponse.data;
+      } catch (lookupErr) {
+        if (lookupErr.response?.status !== 404) {
+          throw lookupErr;
+        }
+      }
 
       if (!voter) {
         setMessage(language === 'en' 
@@ -34,8 +34,16 @@ export const VolunteerVotersPage = () => {
       const params = {
         has_voted: filterVoted !== 'all' ? filterVoted === 'voted' : undefined,
       };
-      const votersResponse = await volunteersAPI.getVoters(id, params);
-      setVoters(votersResponse.data);
+      // The list is cursor-paginated; follow `next` until every page is loaded
+      let allVoters = [];
+      let cursor;
+      do {
+        const votersResponse = await volunteersAPI.getVoters(id, { ...params, cursor, page_size: 500 });
+        allVoters = allVoters.concat(votersResponse.data.results);
+        const next = votersResponse.data.next;
+        cursor = next ? new URL(next).searchParams.get('cursor') : null;
+      } while (cursor);
+      setVoters(allVoters);
       
       setError(null);
     } catch (err) {
@@ -65,6 +65,7 @@ export const votersAPI = {
   getById: (id) => api.get(`/voters/${id}/`),
   update: (id, data) => api.patch(`/voters/${id}/`, data),
   search: (query) => api.get('/voters/', { params: { search: query } }),
+  lookup: (serialNo) => api.get('/voters/lookup/', { params: { serial_no: serialNo } }),
 };
 
 // Volunteers APIs
@@ -22,6 +22,7 @@ sudo apt-get install -y \
     libpq-dev \
     postgresql \
     postgresql-contrib \
+    redis-server \
     nginx \
     screen \
     git \
@@ -28,7 +28,7 @@ pip install --upgrade pip
 # Install Python dependencies
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
-pip install gunicorn
+pip install gunicorn uvicorn
 
 # Create .env file for production
 echo "Creating .env file..."
@@ -39,6 +39,9 @@ ALLOWED_HOSTS=*
 POSTGRES_DB=voting_tracker_db
 POSTGRES_USER=voting_admin
 POSTGRES_PASSWORD=voting_secure_pass
+DATABASE_CONN_MAX_AGE=60
+DATABASE_CONN_HEALTH_CHECKS=True
+REDIS_URL=redis://127.0.0.1:6379/0
 EOF
 
 # Run migrations
@@ -69,6 +72,7 @@ PYEOF
 echo "Importing voters from CSV files..."
 if [ -f "$PROJECT_ROOT/Chuduvalathur Ward List/VotersList_Ward14_en.csv" ] && [ -f "$PROJECT_ROOT/Chuduvalathur Ward List/VotersList_Ward14_ml.csv" ]; then
     python manage.py import_voters \
+        --ward 14 \
         --en-file "$PROJECT_ROOT/Chuduvalathur Ward List/VotersList_Ward14_en.csv" \
         --ml-file "$PROJECT_ROOT/Chuduvalathur Ward List/VotersList_Ward14_ml.csv"
     echo "Voter import completed"
@@ -13,6 +13,20 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
 BACKEND_DIR="$PROJECT_ROOT/BackEnd"
 
+# SERVER_MODE=asgi serves the app with uvicorn workers so the async read
+# endpoints (dashboard, settings, voter list/lookup) can hold many concurrent
+# polling clients open. Default is the sync WSGI workers.
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+if [ "$SERVER_MODE" = "asgi" ]; then
+    APP_ARGS="voting_tracker.asgi:application --worker-class uvicorn.workers.UvicornWorker"
+else
+    APP_ARGS="voting_tracker.wsgi:application"
+fi
+
+# Bind address, workers and timeouts are in BackEnd/voting_tracker/gunicorn_conf.py;
+# the app is preloaded and each worker warmed up before it takes requests
+# (GUNICORN_WARMUP=False to start cold).
+
 # Kill existing backend screen if it exists
 if screen -list | grep -q "backend"; then
     echo "Stopping existing backend screen..."
@@ -20,17 +34,11 @@ if screen -list | grep -q "backend"; then
 fi
 
 # Start backend in screen
-echo "Starting backend in screen session 'backend'..."
+echo "Starting backend ($SERVER_MODE) in screen session 'backend'..."
 screen -dmS backend bash -c "
     cd $BACKEND_DIR
     source venv/bin/activate
-    gunicorn voting_tracker.wsgi:application \
-        --bind 127.0.0.1:8000 \
-        --workers 3 \
-        --timeout 120 \
-        --access-logfile - \
-        --error-logfile - \
-        --log-level info
+    gunicorn $APP_ARGS -c python:voting_tracker.gunicorn_conf
 "
 
 # Wait a moment for the server to start
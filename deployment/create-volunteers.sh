@@ -31,10 +31,14 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voting_tracker.settings_droplet
 django.setup()
 
 from django.contrib.auth import get_user_model
-from voters.models import Volunteer
+from voters.models import Volunteer, Ward
 
 User = get_user_model()
 
+# Ward the volunteers belong to
+WARD_NUMBER = 14
+ward, _ = Ward.objects.get_or_create(number=WARD_NUMBER, defaults={'name': f'Ward {WARD_NUMBER}'})
+
 print("\n" + "="*50)
 print("Creating Level 2 Volunteers (TH)")
 print("="*50)
@@ -65,6 +69,7 @@ for i in range(1, 6):
     
     # Create or get volunteer
     volunteer, vol_created = Volunteer.objects.get_or_create(
+        ward=ward,
         volunteer_id=volunteer_id,
         defaults={
             'user': user,
@@ -99,7 +104,7 @@ for i in range(1, 16):
     supervisor_id = 201 + ((i - 1) // 3)
     
     try:
-        parent_volunteer = Volunteer.objects.get(volunteer_id=supervisor_id)
+        parent_volunteer = Volunteer.objects.get(ward=ward, volunteer_id=supervisor_id)
     except Volunteer.DoesNotExist:
         print(f"  Warning: Supervisor {supervisor_id} not found for {name}")
         parent_volunteer = None
@@ -123,6 +128,7 @@ for i in range(1, 16):
     
     # Create or get volunteer
     volunteer, vol_created = Volunteer.objects.get_or_create(
+        ward=ward,
         volunteer_id=volunteer_id,
         defaults={
             'user': user,